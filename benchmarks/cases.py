@@ -0,0 +1,144 @@
+import os
+import numpy as np
+from database.connection_manager import get_connection_manager
+from database.commercial_rates_data import CommercialRatesData
+from database.location_data import LocationData
+from database.residential_rates_data import ResidentialRatesData
+from database.solar_hours_data import SolarHoursData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from models.gdmto_rate import GdmtoRate
+from models.residential_rate import ResidentialRate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+from calculations.portfolio_runner import PortfolioRunner
+from benchmarks.fixture import generate_customers, write_customers
+
+CITY = 'Mexicali'
+COMMERCIAL_END_YEAR_MONTH = '2024-07'
+RESIDENTIAL_END_YEAR_MONTH = '2024-12'
+COMMERCIAL_CONSUMPTION = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+RESIDENTIAL_CONSUMPTION = [300, 280, 310, 350, 420, 600, 720, 750, 640, 450, 320, 300]
+DEMAND = [12] * 12
+POWER_FACTOR = [92] * 12
+
+# Shared DAOs and models for one fixture, each case builds what it times on top of them
+class BenchmarkContext:
+    def __init__(self, db_path, directory):
+        self.db_path = db_path
+        self.directory = directory
+        self._connection_manager = connection_manager = get_connection_manager(db_path)
+        self.solar_hours_data = SolarHoursData(connection_manager=connection_manager)
+        self.location_data = LocationData(connection_manager=connection_manager)
+        self.residential_rates_data = ResidentialRatesData(connection_manager=connection_manager)
+        self.pdbt_rate_data = CommercialRatesData("PDBT", connection_manager=connection_manager)
+        self.gdmto_rate_data = CommercialRatesData("GDMTO", connection_manager=connection_manager)
+        self.location = self.create_location()
+        self.pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+
+    def close(self):
+        self._connection_manager.close()
+
+    def create_location(self):
+        return Location(CITY, self.solar_hours_data, self.location_data)
+
+    def create_pv_system(self, pv_module_count=12):
+        return PVSystem(self.pv_module, pv_module_count, 0.85, self.location)
+
+def location_construction(context):
+    return context.create_location
+
+def residential_rate_construction(context):
+    return lambda: ResidentialRate(context.location, RESIDENTIAL_END_YEAR_MONTH, context.residential_rates_data)
+
+def pdbt_rate_construction(context):
+    return lambda: PdbtRate(context.location, COMMERCIAL_END_YEAR_MONTH, context.pdbt_rate_data)
+
+def gdmto_rate_construction(context):
+    return lambda: GdmtoRate(context.location, COMMERCIAL_END_YEAR_MONTH, context.gdmto_rate_data)
+
+# Rates fetch their charges on the first bill, this is the full cold cost of quoting with a new rate
+def pdbt_rate_first_bill(context):
+    def run():
+        location = context.create_location()
+        return PdbtRate(location, COMMERCIAL_END_YEAR_MONTH, context.pdbt_rate_data).calculate_monthly_payments(COMMERCIAL_CONSUMPTION)
+    return run
+
+def residential_monthly_payments(context):
+    rate = ResidentialRate(context.location, RESIDENTIAL_END_YEAR_MONTH, context.residential_rates_data)
+    return lambda: rate.calculate_monthly_payments(RESIDENTIAL_CONSUMPTION)
+
+def pdbt_monthly_payments(context):
+    rate = PdbtRate(context.location, COMMERCIAL_END_YEAR_MONTH, context.pdbt_rate_data)
+    return lambda: rate.calculate_monthly_payments(COMMERCIAL_CONSUMPTION)
+
+def gdmto_monthly_payments(context):
+    rate = GdmtoRate(context.location, COMMERCIAL_END_YEAR_MONTH, context.gdmto_rate_data)
+    return lambda: rate.calculate_monthly_payments(COMMERCIAL_CONSUMPTION, demand=DEMAND, power_factor=POWER_FACTOR)
+
+def pv_system_production(context):
+    def run():
+        pv_system = context.create_pv_system()
+        pv_system.calculate_monthly_energy_production(COMMERCIAL_END_YEAR_MONTH)
+        return pv_system.calculate_lifetime_production(COMMERCIAL_END_YEAR_MONTH)
+    return run
+
+# A fresh calculator per call so every stage is computed, not read from its cache
+def calculator_pipeline(context):
+    rate = PdbtRate(context.location, COMMERCIAL_END_YEAR_MONTH, context.pdbt_rate_data)
+    def run():
+        calculator = SolarSavingsCalculator(rate, context.create_pv_system(), COMMERCIAL_CONSUMPTION)
+        calculator.calculate_offset()
+        calculator.calculate_cash_flow()
+        calculator.calculate_payback_period()
+        return calculator.calculate_environmental_impact()
+    return run
+
+def batch_portfolio_10k(context):
+    rate = PdbtRate(context.location, COMMERCIAL_END_YEAR_MONTH, context.pdbt_rate_data)
+    rng = np.random.default_rng(0)
+    pv_module_counts = rng.integers(2, 40, 10000)
+    consumption = np.round(np.array(COMMERCIAL_CONSUMPTION) * rng.uniform(0.5, 2, (10000, 1)))
+    pv_system = context.create_pv_system()
+    def run():
+        calculator = BatchSolarSavingsCalculator.from_pv_system(rate, pv_system, consumption, pv_module_counts)
+        calculator.calculate_offset()
+        calculator.calculate_roi()
+        calculator.calculate_payback_period()
+        return calculator.calculate_environmental_impact()
+    return run
+
+def portfolio_runner_2k(context):
+    input_path = write_customers(os.path.join(context.directory, 'portfolio.jsonl'), generate_customers(2000))
+    output_path = os.path.join(context.directory, 'quotes.jsonl')
+    runner = PortfolioRunner(output_path, context.db_path, workers=1)
+    return lambda: runner.run(input_path, resume=False)
+
+# Fixed work outside the package shaped like the cases, small dicts and 12 month arrays; its time tracks how fast the
+# machine runs at the moment
+def calibration(context):
+    def run():
+        total = 0.0
+        for i in range(100):
+            charges = {"month": i % 12, "energy": 0.588 + i * 0.001, "supplier": 53.58}
+            payments = np.round(np.full(12, charges["energy"]) * np.arange(1, 13) + charges["supplier"], 2)
+            total += float(payments.sum()) + sum(value * 1.05 for value in payments.tolist())
+        return total
+    return run
+
+CASES = {
+    'location_construction': location_construction,
+    'residential_rate_construction': residential_rate_construction,
+    'pdbt_rate_construction': pdbt_rate_construction,
+    'gdmto_rate_construction': gdmto_rate_construction,
+    'pdbt_rate_first_bill': pdbt_rate_first_bill,
+    'residential_monthly_payments': residential_monthly_payments,
+    'pdbt_monthly_payments': pdbt_monthly_payments,
+    'gdmto_monthly_payments': gdmto_monthly_payments,
+    'pv_system_production': pv_system_production,
+    'calculator_pipeline': calculator_pipeline,
+    'batch_portfolio_10k': batch_portfolio_10k,
+    'portfolio_runner_2k': portfolio_runner_2k,
+}
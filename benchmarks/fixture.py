@@ -0,0 +1,55 @@
+import json
+import os
+import numpy as np
+from database.db_setup import setup_database
+
+FIXTURE_NAME = 'benchmark.sqlite3'
+# (city, rate, end_year_month) groups covered by the CSV data, Tijuana's residential rate 1A has no energy tiers
+PORTFOLIO_GROUPS = [
+    ('Mexicali', 'PDBT', '2024-07'),
+    ('Mexicali', 'GDMTO', '2024-07'),
+    ('Mexicali', 'residential', '2024-12'),
+    ('San Felipe', 'PDBT', '2024-07'),
+    ('San Felipe', 'residential', '2024-12'),
+    ('Tijuana', 'PDBT', '2024-07'),
+]
+# Solar hours are stored for different tilt angles in each city
+TILT_ANGLES = {'Mexicali': [17, 32], 'San Felipe': [16, 31], 'Tijuana': [17, 32]}
+
+# Built from the CSVs in data/ so timings don't depend on the state of the local database
+def build_fixture(directory):
+    db_path = os.path.join(directory, FIXTURE_NAME)
+    if not setup_database(db_path):
+        raise RuntimeError(f"Benchmark fixture {db_path} could not be populated")
+    return db_path
+
+def generate_customers(count, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(len(PORTFOLIO_GROUPS), size=count)
+    customers = []
+    for i, group in enumerate(groups.tolist()):
+        city, rate, end_year_month = PORTFOLIO_GROUPS[group]
+        base_consumption = rng.uniform(200, 800) if rate == 'residential' else rng.uniform(800, 4000)
+        customer = {
+            "customer_id": f"customer-{i}",
+            "city": city,
+            "rate": rate,
+            "end_year_month": end_year_month,
+            "consumption": np.round(base_consumption * rng.uniform(0.7, 1.3, 12)).tolist(),
+            "pv_module_capacity": 0.45,
+            "tilt_angle": int(rng.choice(TILT_ANGLES[city])),
+            "module_efficiency": 0.95,
+            "pv_module_count": int(rng.integers(2, 40)),
+            "system_efficiency": 0.85,
+        }
+        if rate == 'GDMTO':
+            customer["demand"] = rng.integers(5, 30, 12).tolist()
+            customer["power_factor"] = np.round(rng.uniform(85, 99, 12), 1).tolist()
+        customers.append(customer)
+    return customers
+
+def write_customers(path, customers):
+    with open(path, 'w') as file:
+        for customer in customers:
+            file.write(json.dumps(customer) + '\n')
+    return path
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from benchmarks.cases import CASES, BenchmarkContext, calibration
+from benchmarks.fixture import build_fixture
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 5
+CALIBRATION = 'calibration'
+
+def select_cases(names=None):
+    if not names:
+        return list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases {unknown}, available cases are {list(CASES)}")
+    return names
+
+# Each repeat runs a case enough times to last at least 0.2s. Repeats go round robin over the cases and the calibration
+# case, so a burst of other load costs every case one repeat at most and the best repeat is left undisturbed.
+# How far the median repeat is above the best one is the noise of the case in this run.
+def time_cases(runs, repeat=DEFAULT_REPEAT):
+    timers = {name: timeit.Timer(run) for name, run in runs.items()}
+    numbers = {name: timer.autorange()[0] for name, timer in timers.items()}
+    timings = {name: [] for name in timers}
+    for _ in range(repeat):
+        for name, timer in timers.items():
+            timings[name].append(timer.timeit(numbers[name]) / numbers[name])
+
+    results = {}
+    noise = {}
+    for name, seconds in timings.items():
+        seconds.sort()
+        results[name] = seconds[0]
+        noise[name] = seconds[len(seconds) // 2] / seconds[0] - 1
+    return results, noise
+
+def run_benchmarks(names=None, repeat=DEFAULT_REPEAT):
+    names = select_cases(names)
+    with tempfile.TemporaryDirectory() as directory:
+        context = BenchmarkContext(build_fixture(directory), directory)
+        try:
+            runs = {name: CASES[name](context) for name in names}
+            runs[CALIBRATION] = calibration(context)
+            return time_cases(runs, repeat)
+        finally:
+            context.close()
+
+def load_baselines(path=BASELINES_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)["results"]
+
+def save_baselines(results, path=BASELINES_PATH):
+    baselines = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {name: results[name] for name in sorted(results)},
+    }
+    with open(path, 'w') as file:
+        json.dump(baselines, file, indent=2)
+        file.write('\n')
+
+# Baselines are scaled by how much slower or faster the calibration case ran than when they were stored, and a case
+# is only compared beyond the threshold or its own noise in this run, whichever is larger
+def compare(results, baselines, threshold=DEFAULT_THRESHOLD, noise=None):
+    if not threshold >= 0:
+        raise ValueError("Threshold must be a non-negative number")
+    noise = noise or {}
+    scale = results[CALIBRATION] / baselines[CALIBRATION] if results.get(CALIBRATION) and baselines.get(CALIBRATION) else 1.0
+
+    report = []
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if name == CALIBRATION:
+            report.append({"name": name, "seconds": seconds, "baseline": baseline, "ratio": scale if baseline else None, "status": "calibration"})
+            continue
+
+        ratio = seconds / (baseline * scale) if baseline else None
+        tolerance = max(threshold, noise.get(name, 0))
+        if ratio is None:
+            status = "new"
+        elif ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "faster"
+        else:
+            status = "ok"
+        report.append({"name": name, "seconds": seconds, "baseline": baseline, "ratio": ratio, "status": status})
+    return report
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def format_report(report, threshold=DEFAULT_THRESHOLD):
+    width = max([len(row["name"]) for row in report] + [4])
+    lines = [f"{'case':<{width}}  {'current':>10}  {'baseline':>10}  {'ratio':>6}  status"]
+    for row in report:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        lines.append(f"{row['name']:<{width}}  {_format_seconds(row['seconds']):>10}  {_format_seconds(row['baseline']):>10}  "
+                     f"{ratio:>6}  {row['status']}")
+    regressions = sum(row["status"] == "regression" for row in report)
+    lines.append(f"{regressions} regressions above {threshold:.0%} of baseline")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the quoting pipeline against a generated SQLite fixture")
+    parser.add_argument("cases", nargs="*", help="Cases to run, all of them by default")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Slowdown ratio above baseline reported as a regression")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--update-baselines", action="store_true", help="Store this run as the new baselines")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 when a case regresses; timings are noisy, so only on a quiet machine")
+    args = parser.parse_args(argv)
+
+    results, noise = run_benchmarks(args.cases, args.repeat)
+    report = compare(results, load_baselines(args.baselines), args.threshold, noise)
+    print(format_report(report, args.threshold))
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.update_baselines:
+        save_baselines(dict(load_baselines(args.baselines), **results), args.baselines)
+        return 0
+    return 1 if args.fail_on_regression and any(row["status"] == "regression" for row in report) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
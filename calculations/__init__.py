@@ -1,2 +1,10 @@
 from .solar_calculator import SolarSavingsCalculator
-from .environmental_impact_calculator import EnvironmentalImpactCalculator
\ No newline at end of file
+from .environmental_impact_calculator import EnvironmentalImpactCalculator
+from .batch_calculator import BatchSolarSavingsCalculator
+from .system_optimizer import SystemSizeOptimizer
+from .net_metering import NetMeteringEngine
+from .monte_carlo import MonteCarloSimulator
+from .sensitivity import SensitivityAnalyzer
+from .hourly_simulation import HourlySimulator
+from .savings_report import SavingsReport
+from .portfolio_impact import EmissionFactorTable, PortfolioImpactCalculator
\ No newline at end of file
@@ -0,0 +1,294 @@
+from time import perf_counter
+import numpy as np
+from utils.instrumentation import get_instrumentation, CACHE, STAGE
+from utils.array_utils import round_array, sequential_sum
+from models.pv_system import PVSystem
+from models.rate import Rate
+from models.gdmto_rate import GdmtoRate
+from calculations.environmental_impact_calculator import EnvironmentalImpactCalculator
+from calculations.net_metering import NetMeteringEngine
+from utils.date_utils import generate_days_in_month
+from models.production_profile import ProductionProfile, get_production_profile
+from calculations.financial_metrics import npv, irr, lcoe
+from calculations.savings_report import SavingsReport
+from utils.projections import accumulate, project_lifetime_production, project_current_payments, project_new_lifetime_payments
+
+class BatchSolarSavingsCalculator:
+    DEFAULT_COST_PER_KW = 20000
+
+    def __init__(self, rate, monthly_production, current_monthly_consumption, system_size, lifespan=25, annual_degradation=0.005,
+                 net_metering=None, **kwargs):
+        self._rate = self._validate_rate(rate)
+        self._net_metering = self._validate_net_metering(net_metering or NetMeteringEngine())
+        monthly_production = self._validate_monthly_values(monthly_production, "monthly_production")
+        current_monthly_consumption = self._validate_monthly_values(current_monthly_consumption, "current_monthly_consumption")
+        system_size = self._validate_positive(system_size, "system_size")
+        annual_degradation = np.asarray(annual_degradation, dtype=float)
+        self._lifespan = self._validate_lifespan(lifespan)
+
+        try:
+            self._count = np.broadcast(monthly_production[..., 0], current_monthly_consumption[..., 0], system_size, annual_degradation).size
+        except ValueError:
+            raise ValueError("Batch inputs must have the same number of rows")
+
+        shape = (self._count, 12)
+        self._monthly_production = np.broadcast_to(monthly_production, shape)
+        self._current_monthly_consumption = np.broadcast_to(current_monthly_consumption, shape)
+        self._system_size = np.broadcast_to(system_size, (self._count,))
+        self._annual_degradation = np.broadcast_to(annual_degradation, (self._count,))
+        self._extra_params = {key: np.broadcast_to(np.asarray(value), shape) for key, value in kwargs.items()} if isinstance(rate, GdmtoRate) else {}
+        self._cache = {}
+
+    @classmethod
+    def from_pv_system(cls, rate, pv_system, current_monthly_consumption, pv_module_counts=None, net_metering=None, **kwargs):
+        if not isinstance(rate, Rate):
+            raise ValueError("The rate object must have an instance of Rate or its subclass")
+        if not isinstance(pv_system, PVSystem):
+            raise ValueError("pv_system must be an instance of PVSystem")
+
+        pv_module = pv_system.pv_module
+        pv_module_counts = pv_system.pv_module_count if pv_module_counts is None else pv_module_counts
+        pv_module_counts = np.asarray(pv_module_counts)
+        if not np.issubdtype(pv_module_counts.dtype, np.integer) or not (pv_module_counts > 0).all():
+            raise ValueError("pv module counts must be integers greater than 0")
+
+        system_size = pv_module.capacity * pv_module_counts.astype(float)
+        profile = get_production_profile(pv_system.location, pv_module.tilt_angle, rate._end_year_month)
+        monthly_production = profile.scale(system_size, pv_module.efficiency, pv_system.efficiency)
+        return cls(rate, monthly_production, current_monthly_consumption, system_size,
+                   lifespan=pv_module.lifespan, annual_degradation=pv_module.annual_degradation, net_metering=net_metering, **kwargs)
+
+    @staticmethod
+    def calculate_monthly_production(system_size, solar_hours, end_year_month, module_efficiency, system_efficiency):
+        profile = ProductionProfile(solar_hours, generate_days_in_month(end_year_month))
+        return profile.scale(system_size, module_efficiency, system_efficiency)
+
+    def _validate_rate(self, value):
+        if not isinstance(value, Rate):
+            raise ValueError("The rate object must have an instance of Rate or its subclass")
+        return value
+
+    def _validate_net_metering(self, value):
+        if not isinstance(value, NetMeteringEngine):
+            raise ValueError("net_metering must be an instance of NetMeteringEngine")
+        return value
+
+    def _validate_monthly_values(self, values, name):
+        values = np.asarray(values, dtype=float)
+        if values.ndim not in (1, 2) or values.shape[-1] != 12:
+            raise ValueError(f"{name} must have 12 items per row")
+        if not (values >= 0).all():
+            raise ValueError(f"All items in {name} must be positive numbers")
+        return values
+
+    def _validate_positive(self, values, name):
+        values = np.asarray(values, dtype=float)
+        if not (values > 0).all():
+            raise ValueError(f"{name} must be greater than 0")
+        return values
+
+    def _validate_lifespan(self, value):
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError("Lifespan must be an integer greater than 0")
+        return value
+
+    def _cached(self, key, calculate):
+        instrumentation = get_instrumentation()
+        if instrumentation is None:
+            if key not in self._cache:
+                self._cache[key] = calculate()
+            return self._cache[key]
+
+        event_name = f"BatchSolarSavingsCalculator.{key if isinstance(key, str) else key[0]}"
+        hit = key in self._cache
+        instrumentation.record(CACHE, event_name, hit)
+        if not hit:
+            start = perf_counter()
+            self._cache[key] = calculate()
+            instrumentation.record(STAGE, event_name, perf_counter() - start)
+        return self._cache[key]
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @property
+    def monthly_production(self):
+        return self._monthly_production
+
+    @property
+    def current_monthly_consumption(self):
+        return self._current_monthly_consumption
+
+    @property
+    def system_size(self):
+        return self._system_size
+
+    def calculate_offset(self):
+        return self._cached('offset', self._calculate_offset)
+
+    def _calculate_offset(self):
+        current_annual_consumption = sequential_sum(self._current_monthly_consumption)
+        annual_energy_production = sequential_sum(self._monthly_production)
+        # Rows without consumption are fully offset
+        offset = np.divide(annual_energy_production, current_annual_consumption, where=current_annual_consumption != 0,
+                           out=np.ones(np.broadcast(annual_energy_production, current_annual_consumption).shape))
+        return round_array(offset, 2)
+
+    def calculate_new_monthly_consumption(self):
+        return self._cached('new_monthly_consumption', self._calculate_new_monthly_consumption)
+
+    def _calculate_new_monthly_consumption(self):
+        return self._net_metering.calculate_new_consumption(self._current_monthly_consumption, self._monthly_production)
+
+    def calculate_monthly_energy_savings(self):
+        return self._current_monthly_consumption - self.calculate_new_monthly_consumption()
+
+    def calculate_lifetime_production(self):
+        return self._cached('lifetime_production', self._calculate_lifetime_production)
+
+    def _calculate_lifetime_production(self):
+        annual_production = sequential_sum(self._monthly_production)
+        return project_lifetime_production(annual_production, self._annual_degradation, self._lifespan)
+
+    def calculate_new_lifetime_consumption(self):
+        return self._cached('new_lifetime_consumption', self._calculate_new_lifetime_consumption)
+
+    def _calculate_new_lifetime_consumption(self):
+        annual_consumption = sequential_sum(self._current_monthly_consumption)
+        new_lifetime_consumption = round_array(annual_consumption[:, None] - self.calculate_lifetime_production(), 2)
+        offset = self.calculate_offset()
+        return np.where(offset[:, None] < 1, new_lifetime_consumption, np.maximum(new_lifetime_consumption, 0))
+
+    def calculate_yearly_energy_savings(self, cumulative=False):
+        yearly_energy_savings = self._cached('yearly_energy_savings', self._calculate_yearly_energy_savings)
+        if not cumulative:
+            return yearly_energy_savings
+        return self._cached('cumulative_energy_savings', lambda: accumulate(yearly_energy_savings))
+
+    def _calculate_yearly_energy_savings(self):
+        current_annual_consumption = sequential_sum(self._current_monthly_consumption)
+        return current_annual_consumption[:, None] - self.calculate_new_lifetime_consumption()
+
+    def calculate_current_monthly_payment(self):
+        return self._cached('current_monthly_payment', lambda: self._calculate_payments(self._current_monthly_consumption))
+
+    def calculate_new_monthly_payment(self):
+        return self._cached('new_monthly_payment', lambda: self._calculate_payments(self.calculate_new_monthly_consumption()))
+
+    def _calculate_payments(self, monthly_consumptions):
+        payments = self._rate.calculate_batch_monthly_payments(monthly_consumptions, **self._extra_params)
+        return np.asarray(payments, dtype=float)
+
+    def calculate_monthly_payment_savings(self):
+        return self.calculate_current_monthly_payment() - self.calculate_new_monthly_payment()
+
+    def calculate_new_lifetime_payments(self, annual_inflation=0.05):
+        key = ('new_lifetime_payments', np.asarray(annual_inflation).tobytes())
+        return self._cached(key, lambda: self._calculate_new_lifetime_payments(annual_inflation))
+
+    def _calculate_new_lifetime_payments(self, annual_inflation):
+        year_1_consumption = sequential_sum(self.calculate_new_monthly_consumption())
+        year_1_payment = round_array(sequential_sum(self.calculate_new_monthly_payment()), 2)
+        year_1_fix_charge_payment = sequential_sum(self._calculate_payments(np.zeros((self._count, 12))))
+        new_lifetime_consumption = self.calculate_new_lifetime_consumption()
+        return project_new_lifetime_payments(year_1_payment, year_1_fix_charge_payment, year_1_consumption,
+                                             new_lifetime_consumption, annual_inflation)
+
+    def calculate_yearly_payments_savings(self, annual_inflation=0.05):
+        key = ('yearly_payments_savings', np.asarray(annual_inflation).tobytes())
+        return self._cached(key, lambda: self._calculate_yearly_payments_savings(annual_inflation))
+
+    def _calculate_yearly_payments_savings(self, annual_inflation):
+        current_annual_payment = sequential_sum(self.calculate_current_monthly_payment())
+        new_lifetime_payments = self.calculate_new_lifetime_payments(annual_inflation)
+        current_lifetime_payments = project_current_payments(current_annual_payment, annual_inflation, self._lifespan)
+        return round_array(current_lifetime_payments - new_lifetime_payments, 2)
+
+    def calculate_installation_cost(self, cost_per_kw=None):
+        cost_per_kw = self.DEFAULT_COST_PER_KW if cost_per_kw is None else self._validate_positive(cost_per_kw, "Cost per kW")
+        return cost_per_kw * self._system_size
+
+    def calculate_cash_flow(self, cost_per_kw=None, cumulative=False, annual_inflation=0.05):
+        key = ('cash_flow', np.asarray(cost_per_kw, dtype=float).tobytes(), np.asarray(annual_inflation).tobytes())
+        cash_flows = self._cached(key, lambda: self._calculate_cash_flow(cost_per_kw, annual_inflation))
+        if not cumulative:
+            return cash_flows
+        return self._cached(('cumulative',) + key[1:], lambda: round_array(accumulate(cash_flows), 2))
+
+    def _calculate_cash_flow(self, cost_per_kw, annual_inflation):
+        initial_outflow = -self.calculate_installation_cost(cost_per_kw)
+        yearly_payments_savings = self.calculate_yearly_payments_savings(annual_inflation)
+        return np.hstack([np.broadcast_to(initial_outflow, (self._count,))[:, None], yearly_payments_savings])
+
+    def calculate_roi(self, cost_per_kw=None, annual_inflation=0.05):
+        cash_flows = self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation)
+        total_investment = -cash_flows[:, 0]
+        total_returns = sequential_sum(cash_flows[:, 1:])
+        return round_array((total_returns - total_investment) / total_investment, 2)
+
+    def calculate_npv(self, discount_rate, cost_per_kw=None, annual_inflation=0.05):
+        return round_array(npv(self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation), discount_rate), 2)
+
+    # Rows without an IRR are NaN
+    def calculate_irr(self, cost_per_kw=None, annual_inflation=0.05):
+        return round_array(irr(self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation)), 4)
+
+    def calculate_lcoe(self, discount_rate, cost_per_kw=None, annual_om_cost=0):
+        return round_array(lcoe(self.calculate_installation_cost(cost_per_kw), self.calculate_lifetime_production(),
+                                discount_rate, annual_om_cost), 4)
+
+    # Rows that never pay back are NaN
+    def calculate_payback_period(self, cost_per_kw=None, annual_inflation=0.05):
+        cumulative_cash_flows = self.calculate_cash_flow(cost_per_kw, cumulative=True, annual_inflation=annual_inflation)
+        positive = cumulative_cash_flows >= 0
+        has_payback = positive.any(axis=1)
+        first_positive_cashflow_year = positive.argmax(axis=1)
+        last_negative_cashflow_year = first_positive_cashflow_year - 1
+
+        rows = np.arange(self._count)
+        first_positive_cashflow = cumulative_cash_flows[rows, first_positive_cashflow_year]
+        last_negative_cashflow = cumulative_cash_flows[rows, last_negative_cashflow_year]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractional_year = -last_negative_cashflow / (first_positive_cashflow - last_negative_cashflow)
+        payback_period = round_array(last_negative_cashflow_year + fractional_year, 2)
+        return np.where(has_payback, payback_period, np.nan)
+
+    def calculate_environmental_impact(self):
+        total_energy_savings = sequential_sum(self.calculate_yearly_energy_savings())
+        if not (total_energy_savings >= 0).all():
+            raise ValueError("energy_saved_kwh must be a non-negative value")
+
+        co2_saved = round_array(total_energy_savings * EnvironmentalImpactCalculator._KG_CO2_PER_KWH, 2)
+        trees_planted = round_array(co2_saved * EnvironmentalImpactCalculator._TREES_PLANTED_PER_KG_CO2, 2)
+        return {
+            "kg_co2_saved": co2_saved,
+            "trees_planted": trees_planted
+        }
+
+    # One SavingsReport per row, fields are stacked into a single matrix so each report is built from one copy
+    def generate_reports(self, cost_per_kw=None, annual_inflation=0.05):
+        environmental_impact = self.calculate_environmental_impact()
+        scalars = [
+            self._system_size,
+            self.calculate_offset(),
+            self.calculate_roi(cost_per_kw, annual_inflation),
+            self.calculate_payback_period(cost_per_kw, annual_inflation),
+            self.calculate_irr(cost_per_kw, annual_inflation),
+            environmental_impact["kg_co2_saved"],
+            environmental_impact["trees_planted"],
+        ]
+        series = [
+            self._current_monthly_consumption,
+            self.calculate_new_monthly_consumption(),
+            self.calculate_current_monthly_payment(),
+            self.calculate_new_monthly_payment(),
+            self.calculate_yearly_energy_savings(),
+            self.calculate_yearly_payments_savings(annual_inflation),
+            self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation),
+        ]
+        rows = np.asarray(np.column_stack([np.broadcast_to(values, (self._count,)) for values in scalars] + series), dtype=float)
+        return SavingsReport.from_rows(rows, self._lifespan)
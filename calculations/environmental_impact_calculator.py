@@ -2,31 +2,46 @@ class EnvironmentalImpactCalculator:
     _KG_CO2_PER_KWH = 0.458
     _TREES_PLANTED_PER_KG_CO2 = 0.001
 
-    def __init__(self, energy_saved_kwh, kg_co2_per_kwh=0.458, trees_planted_per_kg_co2 = 0.001):
+    def __init__(self, energy_saved_kwh, kg_co2_per_kwh=_KG_CO2_PER_KWH, trees_planted_per_kg_co2=_TREES_PLANTED_PER_KG_CO2):
         self._energy_saved_kwh = self._validate_energy_saved_kwh(energy_saved_kwh)
-        
+        self._kg_co2_per_kwh = self._validate_factor(kg_co2_per_kwh, "kg_co2_per_kwh")
+        self._trees_planted_per_kg_co2 = self._validate_factor(trees_planted_per_kg_co2, "trees_planted_per_kg_co2")
+
     def _validate_energy_saved_kwh(self, value):
         if not value >= 0:
             raise ValueError("energy_saved_kwh must be a non-negative value")
         return value
+
+    def _validate_factor(self, value, name):
+        if not (isinstance(value, (int, float)) and value >= 0):
+            raise ValueError(f"{name} must be a non-negative number")
+        return value
     
     @property
     def energy_saved_kwh(self):
         return self._energy_saved_kwh
     
-    energy_saved_kwh.setter
+    @energy_saved_kwh.setter
     def energy_saved_kwh(self, value):
         self._energy_saved_kwh = self._validate_energy_saved_kwh(value)
 
+    @property
+    def kg_co2_per_kwh(self):
+        return self._kg_co2_per_kwh
+
+    @property
+    def trees_planted_per_kg_co2(self):
+        return self._trees_planted_per_kg_co2
+
     def calculate_co2_emission_saved(self):
-        co2_emissions_saved = round(self._energy_saved_kwh * self._KG_CO2_PER_KWH, 2)
+        co2_emissions_saved = round(self._energy_saved_kwh * self._kg_co2_per_kwh, 2)
         return co2_emissions_saved
     
     def calculate_trees_planted(self, co2_emissions_saved=None):
         if co2_emissions_saved is None:
             co2_emissions_saved = self.calculate_co2_emission_saved()
         
-        trees_planted = round(co2_emissions_saved *  self._TREES_PLANTED_PER_KG_CO2, 2)
+        trees_planted = round(co2_emissions_saved *  self._trees_planted_per_kg_co2, 2)
 
         return trees_planted
     
\ No newline at end of file
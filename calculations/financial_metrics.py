@@ -0,0 +1,97 @@
+import numpy as np
+from utils.array_utils import sequential_sum
+
+# IRR is searched between these rates, the upper bound grows until it brackets a root or passes the limit
+IRR_LOWER_BOUND = -0.99
+IRR_UPPER_BOUND = 1.0
+IRR_UPPER_LIMIT = 1e6
+
+def _validate_cash_flows(cash_flows):
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    if cash_flows.ndim not in (1, 2) or cash_flows.shape[-1] < 2:
+        raise ValueError("Cash flows must have at least 2 periods per row")
+    return cash_flows
+
+def _validate_discount_rate(discount_rate):
+    discount_rate = np.asarray(discount_rate, dtype=float)
+    if not (discount_rate > -1).all():
+        raise ValueError("Discount rate must be greater than -1")
+    return discount_rate
+
+def discount_factors(discount_rate, periods, first_period=0):
+    discount_rate = np.asarray(discount_rate, dtype=float)
+    return (1 + discount_rate)[..., None] ** -np.arange(first_period, first_period + periods)
+
+# Cash flow 0 is the installation, cash flow t is received at the end of year t
+def npv(cash_flows, discount_rate):
+    cash_flows = _validate_cash_flows(cash_flows)
+    discount_rate = _validate_discount_rate(discount_rate)
+    return sequential_sum(cash_flows * discount_factors(discount_rate, cash_flows.shape[-1]))
+
+# Present value as a polynomial in 1 / (1 + rate), evaluated with its derivative by Horner's rule without any powers.
+# Cash flows come one period per row so every step reads contiguous memory.
+def _present_value(flows_by_period, rate):
+    discount = 1 / (1 + rate)
+    value = np.zeros(len(rate))
+    derivative = np.zeros(len(rate))
+    for period_flows in flows_by_period[::-1]:
+        derivative = derivative * discount + value
+        value = value * discount + period_flows
+    return value, -derivative * discount ** 2
+
+# Newton steps on every row at once, a step that leaves the row's sign-change bracket is replaced by bisection.
+# Rows without a sign change in the bracket have no IRR and are NaN; with several sign changes one root is returned.
+def irr(cash_flows, tol=1e-10, max_iterations=100):
+    cash_flows = _validate_cash_flows(cash_flows)
+    flows = np.ascontiguousarray(np.atleast_2d(cash_flows).T)
+    rows = flows.shape[1]
+
+    low = np.full(rows, IRR_LOWER_BOUND)
+    high = np.full(rows, IRR_UPPER_BOUND)
+    value_low = _present_value(flows, low)[0]
+    value_high = _present_value(flows, high)[0]
+    while True:
+        expand = (np.sign(value_low) == np.sign(value_high)) & (high < IRR_UPPER_LIMIT)
+        if not expand.any():
+            break
+        high[expand] = high[expand] * 10
+        value_high[expand] = _present_value(flows[:, expand], high[expand])[0]
+
+    has_root = np.sign(value_low) != np.sign(value_high)
+    rate = np.full(rows, 0.1)
+    active = np.flatnonzero(has_root)
+
+    for _ in range(max_iterations):
+        if len(active) == 0:
+            break
+        active_flows = flows if len(active) == rows else flows[:, active]
+        value, derivative = _present_value(active_flows, rate[active])
+        # Keep the root bracketed: the side with the same sign as the lower bound moves up
+        same_side = np.sign(value) == np.sign(value_low[active])
+        low[active] = np.where(same_side, rate[active], low[active])
+        value_low[active] = np.where(same_side, value, value_low[active])
+        high[active] = np.where(same_side, high[active], rate[active])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = rate[active] - value / derivative
+        inside = np.isfinite(newton) & (newton > low[active]) & (newton < high[active])
+        next_rate = np.where(inside, newton, (low[active] + high[active]) / 2)
+
+        converged = (np.abs(next_rate - rate[active]) <= tol * (1 + np.abs(rate[active]))) | (value == 0)
+        rate[active] = np.where(value == 0, rate[active], next_rate)
+        active = active[~converged]
+
+    result = np.where(has_root, rate, np.nan)
+    return result if cash_flows.ndim == 2 else result[0]
+
+# Levelized cost of energy: discounted costs over discounted production, production of year t is discounted t periods
+def lcoe(installation_cost, lifetime_production, discount_rate, annual_om_cost=0):
+    lifetime_production = np.asarray(lifetime_production, dtype=float)
+    discount_rate = _validate_discount_rate(discount_rate)
+    factors = discount_factors(discount_rate, lifetime_production.shape[-1], first_period=1)
+    discounted_om_costs = np.asarray(annual_om_cost, dtype=float)[..., None] * factors
+    discounted_om_costs = np.broadcast_to(discounted_om_costs, np.broadcast_shapes(discounted_om_costs.shape, lifetime_production.shape))
+    discounted_costs = np.asarray(installation_cost, dtype=float) + sequential_sum(discounted_om_costs)
+    discounted_production = sequential_sum(lifetime_production * factors)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(discounted_production > 0, discounted_costs / discounted_production, np.nan)
@@ -0,0 +1,42 @@
+import numpy as np
+from utils.array_utils import round_array
+from utils.date_utils import generate_days_in_month
+from utils.hourly_profiles import billing_hours, validate_hourly_values, aggregate_monthly
+
+class HourlySimulator:
+    def __init__(self, end_year_month):
+        self._end_year_month = end_year_month
+        self._days_in_month = generate_days_in_month(end_year_month)
+
+    @property
+    def end_year_month(self):
+        return self._end_year_month
+
+    @property
+    def hours(self):
+        return billing_hours(self._days_in_month)
+
+    def aggregate_monthly(self, hourly_values, name="hourly_values"):
+        return aggregate_monthly(validate_hourly_values(hourly_values, self._days_in_month, name), self._days_in_month)
+
+    # Energy produced and used in the same hour never reaches the meter, only the rest is imported or exported
+    def simulate(self, hourly_consumption, hourly_production):
+        hourly_consumption = validate_hourly_values(hourly_consumption, self._days_in_month, "hourly_consumption")
+        hourly_production = validate_hourly_values(hourly_production, self._days_in_month, "hourly_production")
+        self_consumption = np.minimum(hourly_consumption, hourly_production)
+
+        monthly_consumption = aggregate_monthly(hourly_consumption, self._days_in_month)
+        monthly_production = aggregate_monthly(hourly_production, self._days_in_month)
+        monthly_self_consumption = aggregate_monthly(self_consumption, self._days_in_month)
+        annual_production = monthly_production.sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self_consumption_ratio = np.where(annual_production > 0, monthly_self_consumption.sum(axis=-1) / annual_production, 0)
+
+        return {
+            "monthly_consumption": round_array(monthly_consumption, 2),
+            "monthly_production": round_array(monthly_production, 2),
+            "monthly_self_consumption": round_array(monthly_self_consumption, 2),
+            "monthly_imports": round_array(monthly_consumption - monthly_self_consumption, 2),
+            "monthly_exports": round_array(monthly_production - monthly_self_consumption, 2),
+            "self_consumption_ratio": round_array(self_consumption_ratio, 4),
+        }
@@ -0,0 +1,140 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils.array_utils import round_array, sequential_sum
+from models.pv_system import PVSystem
+from models.production_profile import get_production_profile
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+
+# Module level so process pool workers can unpickle it
+def _simulate_chunk(simulator, seed_sequence, draws):
+    return simulator.simulate(draws, np.random.default_rng(seed_sequence))
+
+class MonteCarloSimulator:
+    METRICS = ['offset', 'lifetime_savings', 'roi', 'payback_period']
+    PERCENTILES = [10, 50, 90]
+    # Standard deviations used when a distribution is not given
+    DEFAULT_INFLATION = (0.05, 0.01)
+    DEFAULT_DEGRADATION_STD = 0.001
+    DEFAULT_EFFICIENCY_STD = 0.02
+    DEFAULT_SOLAR_HOURS_STD = 0.05
+    CHUNK_SIZE = 5000
+
+    def __init__(self, rate, pv_system, current_monthly_consumption, cost_per_kw=None, inflation=None, degradation=None,
+                 efficiency=None, solar_hours_std=None, net_metering=None, **kwargs):
+        pv_system = self._validate_pv_system(pv_system)
+        pv_module = pv_system.pv_module
+        self._rate = rate
+        self._current_monthly_consumption = current_monthly_consumption
+        self._cost_per_kw = cost_per_kw
+        self._net_metering = net_metering
+        self._extra_params = kwargs
+
+        self._inflation = self._validate_distribution(inflation or self.DEFAULT_INFLATION, "inflation")
+        self._degradation = self._validate_distribution(degradation or (pv_module.annual_degradation, self.DEFAULT_DEGRADATION_STD), "degradation")
+        self._efficiency = self._validate_distribution(efficiency or (pv_system.efficiency, self.DEFAULT_EFFICIENCY_STD), "efficiency")
+        self._solar_hours_std = self._validate_std(self.DEFAULT_SOLAR_HOURS_STD if solar_hours_std is None else solar_hours_std, "solar_hours_std")
+
+        # Only plain values are kept from the PV system so the simulator pickles cheaply to pool workers
+        profile = get_production_profile(pv_system.location, pv_module.tilt_angle, rate._end_year_month)
+        if not profile.available:
+            raise ValueError("Solar hours data is not available for the system location and tilt")
+        self._solar_hours = profile.solar_hours
+        self._days_in_month = profile.days_in_month
+        self._system_size = pv_system.system_size
+        self._module_efficiency = pv_module.efficiency
+        self._lifespan = pv_module.lifespan
+
+    def _validate_pv_system(self, value):
+        if not isinstance(value, PVSystem):
+            raise ValueError("pv_system must be an instance of PVSystem")
+        return value
+
+    def _validate_std(self, value, name):
+        if not (isinstance(value, (int, float)) and value >= 0):
+            raise ValueError(f"{name} standard deviation must be a non-negative number")
+        return float(value)
+
+    def _validate_distribution(self, value, name):
+        if not (isinstance(value, (tuple, list)) and len(value) == 2):
+            raise ValueError(f"{name} must be a (mean, standard deviation) pair")
+        mean, std = value
+        if not isinstance(mean, (int, float)):
+            raise ValueError(f"{name} mean must be a number")
+        return float(mean), self._validate_std(std, name)
+
+    def _validate_draws(self, value):
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError("Draws must be an integer greater than 0")
+        return value
+
+    def _validate_workers(self, value):
+        if value is not None and not (isinstance(value, int) and value > 0):
+            raise ValueError("Workers must be an integer greater than 0")
+        return value
+
+    def sample(self, draws, rng):
+        inflation = rng.normal(*self._inflation, draws)
+        degradation = np.clip(rng.normal(*self._degradation, draws), 0, 1)
+        efficiency = np.clip(rng.normal(*self._efficiency, draws), 0.1, 1)
+        solar_hours_factor = np.clip(rng.normal(1, self._solar_hours_std, (draws, 12)), 0, None)
+        return {
+            "inflation": inflation,
+            "degradation": degradation,
+            "efficiency": efficiency,
+            "solar_hours": self._solar_hours * solar_hours_factor,
+        }
+
+    def evaluate(self, samples):
+        # Same operation order as PVSystem.calculate_monthly_energy_production, one row per draw
+        monthly_production = round_array(self._system_size * samples["solar_hours"] * self._days_in_month
+                                         * self._module_efficiency * samples["efficiency"][:, None], 2)
+        calculator = BatchSolarSavingsCalculator(self._rate, monthly_production, self._current_monthly_consumption, self._system_size,
+                                                 lifespan=self._lifespan, annual_degradation=samples["degradation"],
+                                                 net_metering=self._net_metering, **self._extra_params)
+        inflation = samples["inflation"]
+        return {
+            "offset": calculator.calculate_offset(),
+            "lifetime_savings": round_array(sequential_sum(calculator.calculate_yearly_payments_savings(inflation)), 2),
+            "roi": calculator.calculate_roi(self._cost_per_kw, inflation),
+            "payback_period": calculator.calculate_payback_period(self._cost_per_kw, inflation),
+        }
+
+    def simulate(self, draws, rng):
+        return self.evaluate(self.sample(self._validate_draws(draws), rng))
+
+    # Draws are split in chunks with their own seed, results only depend on the seed and not on the worker count
+    def run(self, draws=1000, seed=None, workers=None):
+        draws = self._validate_draws(draws)
+        workers = self._validate_workers(workers)
+        chunk_sizes = [min(self.CHUNK_SIZE, draws - start) for start in range(0, draws, self.CHUNK_SIZE)]
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+        if workers is None or workers == 1 or len(chunk_sizes) == 1:
+            results = [_simulate_chunk(self, seed_sequence, size) for seed_sequence, size in zip(seed_sequences, chunk_sizes)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_simulate_chunk, [self] * len(chunk_sizes), seed_sequences, chunk_sizes))
+
+        metrics = {metric: np.concatenate([result[metric] for result in results]) for metric in self.METRICS}
+        return self.summarize(metrics)
+
+    # Draws whose offset, savings or ROI is not finite can't be ranked, they are counted and every statistic uses the rest
+    def summarize(self, metrics):
+        values = {metric: np.asarray(metrics[metric], dtype=float) for metric in self.METRICS}
+        valid = np.logical_and.reduce([np.isfinite(values[metric]) for metric in self.METRICS if metric != "payback_period"])
+        summary = {"draws": len(valid), "invalid_draws": int(np.count_nonzero(~valid))}
+        for metric in self.METRICS:
+            metric_values = values[metric][valid]
+            # A draw that never pays back counts as the longest payback, the percentile is None when it falls on one
+            if metric == "payback_period":
+                summary["payback_probability"] = round(float(np.mean(~np.isnan(metric_values))), 4) if len(metric_values) else None
+                metric_values = np.where(np.isnan(metric_values), np.inf, metric_values)
+            if len(metric_values):
+                percentiles = np.percentile(metric_values, self.PERCENTILES, method='lower')
+            else:
+                percentiles = [np.inf] * len(self.PERCENTILES)
+            summary[metric] = {f"p{percentile}": None if np.isinf(value) else round(float(value), 2)
+                               for percentile, value in zip(self.PERCENTILES, percentiles)}
+            finite = metric_values[np.isfinite(metric_values)]
+            summary[metric]["mean"] = round(float(finite.mean()), 2) if len(finite) else None
+        return summary
@@ -0,0 +1,80 @@
+import numpy as np
+from utils.array_utils import round_array
+
+class NetMeteringEngine:
+    def __init__(self, carry_over=True, expiry_months=None):
+        self._carry_over = carry_over
+        self._expiry_months = self._validate_expiry_months(expiry_months)
+
+    def _validate_expiry_months(self, value):
+        if value is not None and not (isinstance(value, int) and 1 <= value <= 12):
+            raise ValueError("Expiry months must be an integer between 1 and 12")
+        return value
+
+    def _validate_monthly_values(self, values, name):
+        values = np.asarray(values, dtype=float)
+        if values.ndim not in (1, 2) or values.shape[-1] != 12:
+            raise ValueError(f"{name} must have 12 items per row")
+        return values
+
+    @property
+    def carry_over(self):
+        return self._carry_over
+
+    @property
+    def expiry_months(self):
+        return self._expiry_months
+
+    # Works on a single 12 month profile or on N x 12 arrays, one vectorized step per month
+    def calculate_new_consumption(self, monthly_consumption, monthly_production):
+        monthly_consumption = self._validate_monthly_values(monthly_consumption, "monthly_consumption")
+        monthly_production = self._validate_monthly_values(monthly_production, "monthly_production")
+        shape = np.broadcast_shapes(monthly_consumption.shape, monthly_production.shape)
+        consumption = np.broadcast_to(monthly_consumption, shape).reshape(-1, 12)
+        production = np.broadcast_to(monthly_production, shape).reshape(-1, 12)
+
+        if self._expiry_months is None:
+            new_consumption, energy_bank = self._net_with_bank(consumption, production)
+        else:
+            new_consumption, energy_bank = self._net_with_expiring_bank(consumption, production)
+
+        # Credit in the bank at the end of the period is a forfeit when there is no carry over or credit expires
+        if self._carry_over and self._expiry_months is None:
+            new_consumption = self._apply_carry_over(new_consumption, energy_bank)
+
+        return new_consumption.reshape(shape)
+
+    def _net_with_bank(self, consumption, production):
+        new_consumption = np.zeros(consumption.shape)
+        energy_bank = np.zeros(consumption.shape[0])
+        for month in range(12):
+            net_energy = production[:, month] - consumption[:, month] + energy_bank
+            surplus = net_energy >= 0
+            new_consumption[:, month] = np.where(surplus, 0, round_array(np.abs(net_energy), 2))
+            energy_bank = np.where(surplus, net_energy, 0)
+        return new_consumption, energy_bank
+
+    # Credits are kept by age and used oldest first, a credit older than expiry_months is dropped
+    def _net_with_expiring_bank(self, consumption, production):
+        new_consumption = np.zeros(consumption.shape)
+        credits_by_age = np.zeros((consumption.shape[0], self._expiry_months))
+        for month in range(12):
+            needed_energy = consumption[:, month] - production[:, month]
+            for age in reversed(range(self._expiry_months)):
+                used_credit = np.clip(needed_energy, 0, credits_by_age[:, age])
+                credits_by_age[:, age] -= used_credit
+                needed_energy = needed_energy - used_credit
+            new_consumption[:, month] = np.where(needed_energy > 0, round_array(needed_energy, 2), 0)
+            credits_by_age[:, 1:] = credits_by_age[:, :-1].copy()
+            credits_by_age[:, 0] = np.maximum(-needed_energy, 0)
+        return new_consumption, credits_by_age.sum(axis=1)
+
+    # Leftover credit covers the earliest months with consumption; bank before each month is
+    # the leftover minus every earlier month, accumulated left to right like a running balance
+    def _apply_carry_over(self, new_consumption, energy_bank):
+        balances = np.subtract.accumulate(np.column_stack([energy_bank, new_consumption]), axis=1)
+        bank_before_month = balances[:, :-1]
+        active = (bank_before_month > 0) & (new_consumption > 0)
+        covered = active & (new_consumption <= bank_before_month)
+        partial = active & ~covered
+        return np.where(covered, 0, np.where(partial, round_array(new_consumption - bank_before_month, 2), new_consumption))
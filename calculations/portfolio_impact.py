@@ -0,0 +1,129 @@
+import numpy as np
+from utils.array_utils import round_array, sequential_sum
+from calculations.environmental_impact_calculator import EnvironmentalImpactCalculator
+
+class EmissionFactorTable:
+    def __init__(self, factors=None, default=EnvironmentalImpactCalculator._KG_CO2_PER_KWH):
+        self._default = self._validate_factor(default, "Default emission factor")
+        factors = self._validate_factors(factors or {})
+        # Region ids are TEXT in the locations table, keys are compared as strings so '1' and 1 are the same region
+        self._rows = {str(region_id): row for row, region_id in enumerate(factors)}
+        years = sorted({year for region_factors in factors.values() for year in region_factors})
+        self._first_year = years[0] if years else 0
+        all_years = np.arange(self._first_year, years[-1] + 1 if years else 1)
+
+        # Dense region x year matrix, the last row holds the default for regions outside the table.
+        # A year missing from a region takes the closest earlier year, years before its first one take the first.
+        self._table = np.full((len(factors) + 1, len(all_years)), float(self._default))
+        for row, region_factors in enumerate(factors.values()):
+            region_years = np.array(sorted(region_factors))
+            region_values = np.array([region_factors[year] for year in region_years], dtype=float)
+            self._table[row] = region_values[np.clip(np.searchsorted(region_years, all_years, side='right') - 1, 0, None)]
+        self._table.setflags(write=False)
+
+    @classmethod
+    def from_records(cls, records, default=EnvironmentalImpactCalculator._KG_CO2_PER_KWH):
+        factors = {}
+        for region_id, year, kg_co2_per_kwh in records:
+            factors.setdefault(region_id, {})[year] = kg_co2_per_kwh
+        return cls(factors, default)
+
+    def _validate_factor(self, value, name):
+        if not (isinstance(value, (int, float)) and value >= 0):
+            raise ValueError(f"{name} must be a non-negative number")
+        return value
+
+    def _validate_factors(self, values):
+        if not isinstance(values, dict):
+            raise ValueError("Emission factors must be a dictionary of {region_id: {year: kg_co2_per_kwh}}")
+
+        for region_id, region_factors in values.items():
+            if not (isinstance(region_factors, dict) and region_factors):
+                raise ValueError(f"Emission factors of region {region_id} must be a non-empty dictionary of {{year: kg_co2_per_kwh}}")
+            for year, factor in region_factors.items():
+                if not isinstance(year, int):
+                    raise ValueError("Emission factor years must be integers")
+                self._validate_factor(factor, f"Emission factor of region {region_id} in {year}")
+        return values
+
+    @property
+    def default(self):
+        return self._default
+
+    def lookup(self, region_ids, years):
+        years = np.asarray(years)
+        region_ids = np.asarray(region_ids, dtype=object)
+        unique_region_ids, inverse = np.unique(region_ids.astype(str), return_inverse=True)
+        rows = np.array([self._rows.get(region_id, len(self._rows)) for region_id in unique_region_ids.tolist()], dtype=int)
+        columns = np.clip(years - self._first_year, 0, self._table.shape[1] - 1)
+        return self._table[rows[inverse.reshape(region_ids.shape)][..., None], columns]
+
+class PortfolioImpactCalculator:
+    def __init__(self, emission_factors=None, trees_planted_per_kg_co2=EnvironmentalImpactCalculator._TREES_PLANTED_PER_KG_CO2):
+        self._emission_factors = self._validate_emission_factors(emission_factors or EmissionFactorTable())
+        self._trees_planted_per_kg_co2 = self._validate_trees_planted_per_kg_co2(trees_planted_per_kg_co2)
+
+    def _validate_emission_factors(self, value):
+        if not isinstance(value, EmissionFactorTable):
+            raise ValueError("emission_factors must be an instance of EmissionFactorTable")
+        return value
+
+    def _validate_trees_planted_per_kg_co2(self, value):
+        if not (isinstance(value, (int, float)) and value >= 0):
+            raise ValueError("trees_planted_per_kg_co2 must be a non-negative number")
+        return value
+
+    def _validate_yearly_energy_savings(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 2 or values.shape[1] == 0:
+            raise ValueError("Yearly energy savings must have one row of yearly values per system")
+        if not (sequential_sum(values) >= 0).all():
+            raise ValueError("energy_saved_kwh must be a non-negative value")
+        return values
+
+    def _validate_rows(self, values, count, name):
+        if values.ndim > 1 or (values.ndim == 1 and len(values) != count):
+            raise ValueError(f"{name} must be a single value or one value per system")
+        return np.broadcast_to(values, (count,))
+
+    def _validate_start_year(self, values, count):
+        values = np.asarray(values)
+        if not np.issubdtype(values.dtype, np.integer):
+            raise ValueError("Start year must be an integer")
+        return self._validate_rows(values, count, "Start year")
+
+    @property
+    def emission_factors(self):
+        return self._emission_factors
+
+    # Column t of a row is the energy saved in start_year + t, it is weighted by the row region's factor for that year
+    def calculate(self, yearly_energy_savings, region_ids, start_year):
+        yearly_energy_savings = self._validate_yearly_energy_savings(yearly_energy_savings)
+        count, lifespan = yearly_energy_savings.shape
+        region_ids = self._validate_rows(np.asarray(region_ids, dtype=object), count, "Region ids")
+        start_year = self._validate_start_year(start_year, count)
+
+        years = start_year[:, None] + np.arange(lifespan)
+        yearly_co2_saved = yearly_energy_savings * self._emission_factors.lookup(region_ids, years)
+        kg_co2_saved = round_array(sequential_sum(yearly_co2_saved), 2)
+        trees_planted = round_array(kg_co2_saved * self._trees_planted_per_kg_co2, 2)
+
+        region_keys, region_index = np.unique(region_ids.astype(str), return_inverse=True)
+        region_co2_saved = np.bincount(region_index, weights=kg_co2_saved, minlength=len(region_keys))
+        region_systems = np.bincount(region_index, minlength=len(region_keys))
+        first_year = int(years.min())
+        year_co2_saved = np.bincount((years - first_year).ravel(), weights=yearly_co2_saved.ravel())
+
+        total_kg_co2_saved = round(float(np.sum(kg_co2_saved)), 2)
+        return {
+            "kg_co2_saved": kg_co2_saved,
+            "trees_planted": trees_planted,
+            "total_kg_co2_saved": total_kg_co2_saved,
+            "total_trees_planted": round(total_kg_co2_saved * self._trees_planted_per_kg_co2, 2),
+            "by_region": {region_id: {
+                "systems": int(region_systems[i]),
+                "kg_co2_saved": round(float(region_co2_saved[i]), 2),
+                "trees_planted": round(float(region_co2_saved[i]) * self._trees_planted_per_kg_co2, 2),
+            } for i, region_id in enumerate(region_keys.tolist())},
+            "by_year": {first_year + i: round(float(value), 2) for i, value in enumerate(year_co2_saved.tolist())},
+        }
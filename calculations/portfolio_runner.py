@@ -0,0 +1,278 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from database.tariff_snapshot import TariffSnapshot
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.production_profile import get_production_profile
+from models.rate_factory import create_rate, validate_rate_type
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+from utils.array_utils import round_array, sequential_sum
+import config
+
+MONTHLY_FIELDS = ['consumption', 'demand', 'power_factor']
+DEFAULT_BATCH_SIZE = 500
+
+# Loaded once per run, or per worker process by the pool initializer, every batch of the same group reuses the location and rate
+_snapshot = None
+_tariffs = None
+
+def read_customers(path):
+    for row in _read_rows(path):
+        yield _parse_record(row)
+
+# Rows are parsed by the caller so one malformed line fails only its own customer
+def _read_rows(path):
+    with open(path, newline='') as file:
+        if path.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield line
+        else:
+            yield from csv.DictReader(file)
+
+def _parse_record(row):
+    record = json.loads(row) if isinstance(row, str) else _parse_csv_row(row)
+    if not isinstance(record, dict):
+        raise ValueError("Customer record must be a JSON object")
+    return record
+
+# CSV files have one column per month: consumption_1 ... consumption_12, same for demand and power_factor
+def _parse_csv_row(row):
+    monthly_prefixes = tuple(f"{field}_" for field in MONTHLY_FIELDS)
+    record = {key: value for key, value in row.items() if value not in (None, '') and not key.startswith(monthly_prefixes)}
+    for field in MONTHLY_FIELDS:
+        values = [row.get(f"{field}_{month}") for month in range(1, 13)]
+        if any(value not in (None, '') for value in values):
+            record[field] = values
+    return record
+
+def _monthly_values(values, name, cast=float):
+    if not (isinstance(values, list) and len(values) == 12):
+        raise ValueError(f"{name} must contain 12 items")
+    return [cast(value) for value in values]
+
+def normalize_customer(record, row_number):
+    try:
+        customer = {
+            "customer_id": str(record.get("customer_id") or row_number),
+            "city": record["city"],
+            "rate": validate_rate_type(record["rate"]),
+            "end_year_month": record["end_year_month"],
+            "consumption": _monthly_values(record["consumption"], "consumption"),
+            "pv_module_capacity": float(record["pv_module_capacity"]),
+            "tilt_angle": int(record["tilt_angle"]),
+            "module_efficiency": float(record["module_efficiency"]),
+            "pv_module_count": int(record["pv_module_count"]),
+            "system_efficiency": float(record["system_efficiency"]),
+            "lifespan": int(record.get("lifespan", 25)),
+            "annual_degradation": float(record.get("annual_degradation", 0.005)),
+        }
+        if customer["rate"] == 'GDMTO':
+            customer["demand"] = _monthly_values(record["demand"], "demand", int)
+            customer["power_factor"] = _monthly_values(record["power_factor"], "power_factor")
+    except KeyError as e:
+        raise ValueError(f"Missing field {e}")
+    except TypeError as e:
+        raise ValueError(str(e))
+    return customer
+
+def group_key(customer):
+    return customer["city"], customer["rate"], customer["end_year_month"], customer["lifespan"]
+
+def _get_tariff(snapshot, tariffs, city, rate_type, end_year_month):
+    key = (city, rate_type, end_year_month)
+    if key not in tariffs:
+        location = Location(city, snapshot.solar_hours_data, snapshot.location_data)
+        if location.region_id is None:
+            raise ValueError(f"Location {city} is not available")
+        tariffs[key] = location, create_rate(rate_type, location, end_year_month, snapshot)
+    return tariffs[key]
+
+def _error_result(customer_id, error):
+    return {"customer_id": customer_id, "error": str(error)}
+
+def _quote_customers(location, rate, customers, cost_per_kw, annual_inflation):
+    monthly_production = []
+    system_size = []
+    for customer in customers:
+        pv_module = PVModule(customer["pv_module_capacity"], customer["tilt_angle"], customer["module_efficiency"],
+                             customer["lifespan"], customer["annual_degradation"])
+        pv_system = PVSystem(pv_module, customer["pv_module_count"], customer["system_efficiency"], location)
+        profile = get_production_profile(location, pv_module.tilt_angle, rate._end_year_month)
+        if not profile.available:
+            raise ValueError(f"Solar hours data is not available for a tilt angle of {pv_module.tilt_angle}")
+        monthly_production.append(profile.scale(pv_system.system_size, pv_module.efficiency, pv_system.efficiency))
+        system_size.append(pv_system.system_size)
+
+    extra_params = {field: [customer[field] for customer in customers] for field in ['demand', 'power_factor'] if field in customers[0]}
+    calculator = BatchSolarSavingsCalculator(rate, np.array(monthly_production), [customer["consumption"] for customer in customers],
+                                             system_size, lifespan=customers[0]["lifespan"],
+                                             annual_degradation=[customer["annual_degradation"] for customer in customers], **extra_params)
+    yearly_payments_savings = calculator.calculate_yearly_payments_savings(annual_inflation)
+    lifetime_savings = round_array(sequential_sum(yearly_payments_savings), 2)
+    offset = calculator.calculate_offset()
+    roi = calculator.calculate_roi(cost_per_kw, annual_inflation)
+    payback_period = calculator.calculate_payback_period(cost_per_kw, annual_inflation)
+
+    # Output lines are strict JSON, a customer with a NaN or infinite result gets an error record instead
+    finite = np.isfinite(np.column_stack([system_size, offset, yearly_payments_savings[:, 0], lifetime_savings, roi])).all(axis=1)
+    return [{
+        "customer_id": customer["customer_id"],
+        "city": customer["city"],
+        "rate": customer["rate"],
+        "end_year_month": customer["end_year_month"],
+        "system_size": float(system_size[i]),
+        "offset": float(offset[i]),
+        "year_1_savings": float(yearly_payments_savings[i, 0]),
+        "lifetime_savings": float(lifetime_savings[i]),
+        "roi": float(roi[i]),
+        "payback_period": None if np.isnan(payback_period[i]) else float(payback_period[i]),
+    } if finite[i] else _error_result(customer["customer_id"], "Quote has values that are not finite") for i, customer in enumerate(customers)]
+
+# One invalid customer fails the whole batch, the batch is then quoted one customer at a time to isolate it
+def quote_batch(snapshot, tariffs, customers, cost_per_kw=None, annual_inflation=0.05):
+    try:
+        location, rate = _get_tariff(snapshot, tariffs, customers[0]["city"], customers[0]["rate"], customers[0]["end_year_month"])
+        return _quote_customers(location, rate, customers, cost_per_kw, annual_inflation)
+    except ValueError as e:
+        if len(customers) == 1:
+            return [_error_result(customers[0]["customer_id"], e)]
+        return [result for customer in customers for result in quote_batch(snapshot, tariffs, [customer], cost_per_kw, annual_inflation)]
+
+def init_worker(db_path):
+    global _snapshot, _tariffs
+    _snapshot, _tariffs = TariffSnapshot(db_path), {}
+
+def quote_batch_in_worker(customers, cost_per_kw, annual_inflation):
+    return quote_batch(_snapshot, _tariffs, customers, cost_per_kw, annual_inflation)
+
+class PortfolioRunner:
+    def __init__(self, output_path, db_path=config.DATABASE_PATH, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                 cost_per_kw=None, annual_inflation=0.05):
+        self._output_path = output_path
+        self._checkpoint_path = output_path + '.checkpoint'
+        self._db_path = db_path
+        self._workers = self._validate_positive_int(workers, "Workers") if workers is not None else None
+        self._batch_size = self._validate_positive_int(batch_size, "Batch size")
+        self._cost_per_kw = cost_per_kw
+        self._annual_inflation = annual_inflation
+        self._counts = {"quoted": 0, "failed": 0, "skipped": 0}
+
+    def _validate_positive_int(self, value, name):
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError(f"{name} must be an integer greater than 0")
+        return value
+
+    @property
+    def checkpoint_path(self):
+        return self._checkpoint_path
+
+    def _read_checkpoint(self, input_path):
+        if not os.path.exists(self._checkpoint_path) or not os.path.exists(self._output_path):
+            return None
+        with open(self._checkpoint_path) as file:
+            checkpoint = json.load(file)
+        if checkpoint["input_path"] != os.path.abspath(input_path):
+            raise ValueError(f"Checkpoint {self._checkpoint_path} belongs to {checkpoint['input_path']}")
+        return checkpoint
+
+    # Lines past the checkpointed size may be partial writes from a crash, only complete batches are kept
+    def _resume(self, checkpoint):
+        with open(self._output_path, 'r+b') as file:
+            file.truncate(checkpoint["output_size"])
+        with open(self._output_path) as file:
+            return {json.loads(line)["customer_id"] for line in file}
+
+    def _write_checkpoint(self, output, input_path):
+        output.flush()
+        os.fsync(output.fileno())
+        temporary_path = self._checkpoint_path + '.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump({"input_path": os.path.abspath(input_path), "output_size": output.tell()}, file)
+        os.replace(temporary_path, self._checkpoint_path)
+
+    def _write_results(self, output, input_path, results):
+        for result in results:
+            self._counts["failed" if "error" in result else "quoted"] += 1
+            output.write(json.dumps(result) + '\n')
+        self._write_checkpoint(output, input_path)
+
+    def _batches(self, input_path, completed, output):
+        groups = {}
+        for row_number, row in enumerate(_read_rows(input_path), start=1):
+            try:
+                record, error = _parse_record(row), None
+            except ValueError as e:
+                record, error = {}, e
+            customer_id = str(record.get("customer_id") or row_number)
+            if customer_id in completed:
+                self._counts["skipped"] += 1
+                continue
+            if error is None:
+                try:
+                    customer = normalize_customer(record, row_number)
+                except ValueError as e:
+                    error = e
+            if error is not None:
+                self._write_results(output, input_path, [_error_result(customer_id, error)])
+                continue
+
+            batch = groups.setdefault(group_key(customer), [])
+            batch.append(customer)
+            if len(batch) == self._batch_size:
+                yield groups.pop(group_key(customer))
+        yield from groups.values()
+
+    def run(self, input_path, resume=True):
+        self._counts = {"quoted": 0, "failed": 0, "skipped": 0}
+        checkpoint = self._read_checkpoint(input_path) if resume else None
+        completed = self._resume(checkpoint) if checkpoint else set()
+
+        with open(self._output_path, 'a' if checkpoint else 'w') as output:
+            self._write_checkpoint(output, input_path)
+            if self._workers is None or self._workers == 1:
+                snapshot, tariffs = TariffSnapshot(self._db_path), {}
+                for batch in self._batches(input_path, completed, output):
+                    self._write_results(output, input_path, quote_batch(snapshot, tariffs, batch, self._cost_per_kw, self._annual_inflation))
+            else:
+                self._run_pool(input_path, completed, output)
+
+        os.remove(self._checkpoint_path)
+        return dict(self._counts)
+
+    # At most two batches per worker are in flight so the input keeps streaming instead of loading at once
+    def _run_pool(self, input_path, completed, output):
+        pending = set()
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=init_worker, initargs=(self._db_path,)) as executor:
+            for batch in self._batches(input_path, completed, output):
+                pending.add(executor.submit(quote_batch_in_worker, batch, self._cost_per_kw, self._annual_inflation))
+                if len(pending) >= 2 * self._workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._write_results(output, input_path, future.result())
+            for future in pending:
+                self._write_results(output, input_path, future.result())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quote a portfolio of customers from a CSV or JSONL file")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--db-path", default=config.DATABASE_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--cost-per-kw", type=float, default=None)
+    parser.add_argument("--annual-inflation", type=float, default=0.05)
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args(argv)
+
+    runner = PortfolioRunner(args.output_path, args.db_path, args.workers, args.batch_size, args.cost_per_kw, args.annual_inflation)
+    counts = runner.run(args.input_path, resume=not args.no_resume)
+    print(f"Quoted {counts['quoted']} customers, {counts['failed']} failed, {counts['skipped']} already quoted")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import json
+import math
+import struct
+import sys
+from array import array
+from functools import lru_cache
+import numpy as np
+
+SCALAR_FIELDS = ('system_size', 'offset', 'roi', 'payback_period', 'irr', 'kg_co2_saved', 'trees_planted')
+# Scalars without a value (no payback, no IRR) are None, and NaN in binary form
+OPTIONAL_FIELDS = ('payback_period', 'irr')
+_OPTIONAL_INDEXES = tuple(SCALAR_FIELDS.index(field) for field in OPTIONAL_FIELDS)
+MONTHLY_FIELDS = ('current_monthly_consumption', 'new_monthly_consumption', 'current_monthly_payment', 'new_monthly_payment')
+LIFETIME_FIELDS = ('yearly_energy_savings', 'yearly_payments_savings')
+SERIES_FIELDS = MONTHLY_FIELDS + LIFETIME_FIELDS + ('cash_flow',)
+FIELDS = SCALAR_FIELDS + SERIES_FIELDS
+MONTHS = 12
+
+# Binary layout: version and lifespan, then every field as little-endian doubles in FIELDS order
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<BH')
+
+def _series_length(field, lifespan):
+    if field in MONTHLY_FIELDS:
+        return MONTHS
+    if field in LIFETIME_FIELDS:
+        return lifespan
+    # Cash flow starts with the installation year
+    return lifespan + 1
+
+@lru_cache(maxsize=None)
+def _value_count(lifespan):
+    return len(SCALAR_FIELDS) + sum(_series_length(field, lifespan) for field in SERIES_FIELDS)
+
+# Where each series sits in a flat record, in SERIES_FIELDS order
+@lru_cache(maxsize=None)
+def _series_slices(lifespan):
+    slices = []
+    start = len(SCALAR_FIELDS)
+    for field in SERIES_FIELDS:
+        end = start + _series_length(field, lifespan)
+        slices.append(slice(start, end))
+        start = end
+    return tuple(slices)
+
+class SavingsReport:
+    # Series are kept as arrays of doubles instead of lists of floats, a 25 year report takes about a third of the memory
+    __slots__ = tuple(f"_{field}" for field in FIELDS)
+
+    def __init__(self, system_size, offset, roi, payback_period, irr, kg_co2_saved, trees_planted, current_monthly_consumption,
+                 new_monthly_consumption, current_monthly_payment, new_monthly_payment, yearly_energy_savings, yearly_payments_savings,
+                 cash_flow):
+        self._system_size = self._validate_scalar(system_size, "system_size")
+        self._offset = self._validate_scalar(offset, "offset")
+        self._roi = self._validate_scalar(roi, "roi")
+        self._payback_period = self._validate_optional_scalar(payback_period, "payback_period")
+        self._irr = self._validate_optional_scalar(irr, "irr")
+        self._kg_co2_saved = self._validate_scalar(kg_co2_saved, "kg_co2_saved")
+        self._trees_planted = self._validate_scalar(trees_planted, "trees_planted")
+
+        lifespan = len(yearly_payments_savings)
+        self._current_monthly_consumption = self._validate_series(current_monthly_consumption, MONTHS, "current_monthly_consumption")
+        self._new_monthly_consumption = self._validate_series(new_monthly_consumption, MONTHS, "new_monthly_consumption")
+        self._current_monthly_payment = self._validate_series(current_monthly_payment, MONTHS, "current_monthly_payment")
+        self._new_monthly_payment = self._validate_series(new_monthly_payment, MONTHS, "new_monthly_payment")
+        self._yearly_energy_savings = self._validate_series(yearly_energy_savings, lifespan, "yearly_energy_savings")
+        self._yearly_payments_savings = self._validate_series(yearly_payments_savings, lifespan, "yearly_payments_savings")
+        self._cash_flow = self._validate_series(cash_flow, lifespan + 1, "cash_flow")
+
+    def _validate_scalar(self, value, name):
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be a number")
+        if not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number")
+        return float(value)
+
+    def _validate_optional_scalar(self, value, name):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        return self._validate_scalar(value, name)
+
+    def _validate_series(self, values, length, name):
+        values = array('d', values)
+        if len(values) != length:
+            raise ValueError(f"{name} must contain {length} items")
+        if not all(map(math.isfinite, values)):
+            raise ValueError(f"{name} must contain finite numbers")
+        return values
+
+    @classmethod
+    def _from_values(cls, values, lifespan):
+        report = cls.__new__(cls)
+        report._system_size, report._offset, report._roi, payback_period, irr, report._kg_co2_saved, report._trees_planted = \
+            values[:len(SCALAR_FIELDS)]
+        report._payback_period = None if math.isnan(payback_period) else payback_period
+        report._irr = None if math.isnan(irr) else irr
+
+        (current_monthly_consumption, new_monthly_consumption, current_monthly_payment, new_monthly_payment, yearly_energy_savings,
+         yearly_payments_savings, cash_flow) = _series_slices(lifespan)
+        report._current_monthly_consumption = values[current_monthly_consumption]
+        report._new_monthly_consumption = values[new_monthly_consumption]
+        report._current_monthly_payment = values[current_monthly_payment]
+        report._new_monthly_payment = values[new_monthly_payment]
+        report._yearly_energy_savings = values[yearly_energy_savings]
+        report._yearly_payments_savings = values[yearly_payments_savings]
+        report._cash_flow = values[cash_flow]
+        return report
+
+    # Rows hold every field in FIELDS order, as the batch calculator stacks them
+    @classmethod
+    def from_rows(cls, rows, lifespan):
+        if len(rows) and len(rows[0]) != _value_count(lifespan):
+            raise ValueError(f"Rows must contain {_value_count(lifespan)} values for a lifespan of {lifespan}")
+        if len(rows):
+            # Rows skip the constructor, a missing optional scalar is NaN and every other value must be finite
+            valid = np.isfinite(rows)
+            valid[:, _OPTIONAL_INDEXES] |= np.isnan(rows[:, _OPTIONAL_INDEXES])
+            if not valid.all():
+                raise ValueError("Report values must be finite numbers")
+        return [cls._from_values(array('d', row.tobytes()), lifespan) for row in rows]
+
+    @property
+    def lifespan(self):
+        return len(self._yearly_payments_savings)
+
+    @property
+    def lifetime_savings(self):
+        return round(sum(self._yearly_payments_savings), 2)
+
+    def __eq__(self, other):
+        if not isinstance(other, SavingsReport):
+            return NotImplemented
+        return all(getattr(self, f"_{field}") == getattr(other, f"_{field}") for field in FIELDS)
+
+    def __repr__(self):
+        return (f"SavingsReport(system_size={self._system_size}, offset={self._offset}, roi={self._roi}, "
+                f"payback_period={self._payback_period}, lifespan={self.lifespan})")
+
+    def to_dict(self):
+        report = {field: getattr(self, f"_{field}") for field in SCALAR_FIELDS}
+        report.update({field: getattr(self, f"_{field}").tolist() for field in SERIES_FIELDS})
+        return report
+
+    @classmethod
+    def from_dict(cls, values):
+        try:
+            return cls(**{field: values[field] for field in FIELDS})
+        except KeyError as e:
+            raise ValueError(f"Missing field {e}")
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.from_dict(json.loads(data))
+
+    def to_bytes(self):
+        values = array('d', (self._system_size, self._offset, self._roi, math.nan if self._payback_period is None else self._payback_period,
+                             math.nan if self._irr is None else self._irr, self._kg_co2_saved, self._trees_planted))
+        values += self._current_monthly_consumption
+        values += self._new_monthly_consumption
+        values += self._current_monthly_payment
+        values += self._new_monthly_payment
+        values += self._yearly_energy_savings
+        values += self._yearly_payments_savings
+        values += self._cash_flow
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return _HEADER.pack(FORMAT_VERSION, self.lifespan) + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        return cls._unpack_from(memoryview(data), offset)[0]
+
+    # Returns the report and the offset right after it so records can be read back to back
+    @classmethod
+    def _unpack_from(cls, data, offset):
+        if len(data) - offset < _HEADER.size:
+            raise ValueError("Report data is truncated")
+        version, lifespan = _HEADER.unpack_from(data, offset)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported report format version {version}")
+
+        start = offset + _HEADER.size
+        end = start + _value_count(lifespan) * 8
+        if len(data) < end:
+            raise ValueError("Report data is truncated")
+        values = array('d')
+        values.frombytes(data[start:end])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        if not all(math.isfinite(value) or (i in _OPTIONAL_INDEXES and math.isnan(value)) for i, value in enumerate(values)):
+            raise ValueError("Report values must be finite numbers")
+        return cls._from_values(values, lifespan), end
+
+for _field in FIELDS:
+    setattr(SavingsReport, _field, property(lambda self, _name=f"_{_field}": getattr(self, _name)))
+del _field
+
+def pack_reports(reports):
+    return b''.join(report.to_bytes() for report in reports)
+
+def unpack_reports(data):
+    data = memoryview(data)
+    offset = 0
+    reports = []
+    while offset < len(data):
+        report, offset = SavingsReport._unpack_from(data, offset)
+        reports.append(report)
+    return reports
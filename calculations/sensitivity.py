@@ -0,0 +1,132 @@
+import numpy as np
+from utils.array_utils import round_array, sequential_sum
+from models.pv_system import PVSystem
+from models.production_profile import get_production_profile
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+
+class SensitivityAnalyzer:
+    PARAMETERS = ['cost_per_kw', 'annual_inflation', 'tilt_angle', 'efficiency']
+    METRICS = ['roi', 'payback_period', 'lifetime_savings']
+
+    def __init__(self, rate, pv_system, current_monthly_consumption, cost_per_kw=None, annual_inflation=0.05, net_metering=None, **kwargs):
+        self._pv_system = self._validate_pv_system(pv_system)
+        self._rate = rate
+        self._current_monthly_consumption = current_monthly_consumption
+        self._cost_per_kw = cost_per_kw or BatchSolarSavingsCalculator.DEFAULT_COST_PER_KW
+        self._annual_inflation = annual_inflation
+        self._net_metering = net_metering
+        self._extra_params = kwargs
+        self._monthly_production = {}
+
+    def _validate_pv_system(self, value):
+        if not isinstance(value, PVSystem):
+            raise ValueError("pv_system must be an instance of PVSystem")
+        return value
+
+    def _validate_metric(self, value):
+        if value not in self.METRICS:
+            raise ValueError(f"Metric must be one of {self.METRICS}")
+        return value
+
+    def _validate_variations(self, values):
+        if not isinstance(values, dict):
+            raise ValueError("Variations must be a dictionary")
+
+        for parameter, value in values.items():
+            if parameter not in self.PARAMETERS:
+                raise ValueError(f"Parameter must be one of {self.PARAMETERS}")
+            if not (isinstance(value, (tuple, list)) and len(value) == 2):
+                raise ValueError(f"{parameter} variation must be a (low, high) pair")
+        return values
+
+    @property
+    def base_scenario(self):
+        return {
+            "cost_per_kw": self._cost_per_kw,
+            "annual_inflation": self._annual_inflation,
+            "tilt_angle": self._pv_system.pv_module.tilt_angle,
+            "efficiency": self._pv_system.efficiency,
+        }
+
+    # Closest tilts below and above the base one that have solar hours, the base tilt itself at either end of the table
+    def _neighbour_tilt_angles(self, tilt_angle):
+        tilt_angles = self._pv_system.location.get_tilt_angles() or []
+        lower = [tilt for tilt in tilt_angles if tilt < tilt_angle]
+        higher = [tilt for tilt in tilt_angles if tilt > tilt_angle]
+        return (max(lower) if lower else tilt_angle, min(higher) if higher else tilt_angle)
+
+    def default_variations(self):
+        base = self.base_scenario
+        return {
+            "cost_per_kw": (base["cost_per_kw"] * 0.9, base["cost_per_kw"] * 1.1),
+            "annual_inflation": (base["annual_inflation"] - 0.01, base["annual_inflation"] + 0.01),
+            "tilt_angle": self._neighbour_tilt_angles(base["tilt_angle"]),
+            "efficiency": (max(round(base["efficiency"] - 0.05, 4), 0.1), min(round(base["efficiency"] + 0.05, 4), 1)),
+        }
+
+    # Profiles are shared per tilt, production is computed once per (tilt, efficiency) for every analysis on this instance
+    def _get_monthly_production(self, tilt_angle, efficiency):
+        key = (tilt_angle, efficiency)
+        if key not in self._monthly_production:
+            profile = get_production_profile(self._pv_system.location, tilt_angle, self._rate._end_year_month)
+            if not profile.available:
+                raise ValueError(f"Solar hours data is not available for a tilt angle of {tilt_angle}")
+            self._monthly_production[key] = profile.scale(self._pv_system.system_size, self._pv_system.pv_module.efficiency, efficiency)
+        return self._monthly_production[key]
+
+    def evaluate(self, scenarios):
+        pv_module = self._pv_system.pv_module
+        monthly_production = [self._get_monthly_production(scenario["tilt_angle"], scenario["efficiency"]) for scenario in scenarios]
+        cost_per_kw = np.array([scenario["cost_per_kw"] for scenario in scenarios], dtype=float)
+        annual_inflation = np.array([scenario["annual_inflation"] for scenario in scenarios], dtype=float)
+
+        # Every scenario is one row of a single batch, charges are not loaded again
+        calculator = BatchSolarSavingsCalculator(self._rate, np.array(monthly_production), self._current_monthly_consumption,
+                                                 self._pv_system.system_size, lifespan=pv_module.lifespan,
+                                                 annual_degradation=pv_module.annual_degradation, net_metering=self._net_metering,
+                                                 **self._extra_params)
+        roi = calculator.calculate_roi(cost_per_kw, annual_inflation)
+        payback_period = calculator.calculate_payback_period(cost_per_kw, annual_inflation)
+        lifetime_savings = round_array(sequential_sum(calculator.calculate_yearly_payments_savings(annual_inflation)), 2)
+        return [{
+            "roi": float(roi[i]),
+            "payback_period": None if np.isnan(payback_period[i]) else float(payback_period[i]),
+            "lifetime_savings": float(lifetime_savings[i]),
+        } for i in range(len(scenarios))]
+
+    def _compare(self, base, value):
+        if base is None or value is None:
+            return None
+        return round(value - base, 2)
+
+    def analyze(self, variations=None, sort_by='payback_period'):
+        variations = self._validate_variations(self.default_variations() if variations is None else variations)
+        sort_by = self._validate_metric(sort_by)
+        base_scenario = self.base_scenario
+
+        scenarios = [base_scenario]
+        for parameter, (low, high) in variations.items():
+            scenarios.append(dict(base_scenario, **{parameter: low}))
+            scenarios.append(dict(base_scenario, **{parameter: high}))
+        results = self.evaluate(scenarios)
+        base = results[0]
+
+        table = []
+        for i, (parameter, (low, high)) in enumerate(variations.items()):
+            low_result, high_result = results[2 * i + 1], results[2 * i + 2]
+            row = {"parameter": parameter, "low": low, "high": high}
+            for metric in self.METRICS:
+                low_delta = self._compare(base[metric], low_result[metric])
+                high_delta = self._compare(base[metric], high_result[metric])
+                row[metric] = {
+                    "low": low_result[metric],
+                    "high": high_result[metric],
+                    "low_delta": low_delta,
+                    "high_delta": high_delta,
+                    "swing": None if low_delta is None or high_delta is None else round(abs(high_delta - low_delta), 2),
+                }
+            table.append(row)
+
+        # Widest bar first, parameters without a comparable swing go last
+        table.sort(key=lambda row: (row[sort_by]["swing"] is None, -(row[sort_by]["swing"] or 0)))
+        return {"base": dict(base_scenario, **base), "parameters": table}
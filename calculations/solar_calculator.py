@@ -1,15 +1,47 @@
+import numpy as np
 from models.pv_system import PVSystem
 from models.rate import Rate
 from models.gdmto_rate import GdmtoRate
 from calculations.environmental_impact_calculator import EnvironmentalImpactCalculator
+from calculations.net_metering import NetMeteringEngine
+from calculations.hourly_simulation import HourlySimulator
+from calculations.financial_metrics import npv, irr, lcoe
+from calculations.savings_report import SavingsReport
+from utils.array_utils import round_array
+from utils.cache_graph import CacheGraph
+from utils.projections import accumulate, project_current_payments, project_new_lifetime_payments
 
 class SolarSavingsCalculator:
-    def __init__(self, rate, pv_system, current_monthly_consumption, **kwargs):
+    # Inputs have no dependencies, every other stage is recomputed only when something upstream of it changes
+    STAGES = {
+        'rate': [],
+        'pv_system': [],
+        'current_monthly_consumption': [],
+        'net_metering': [],
+        'hourly_consumption': [],
+        'hourly_simulation': ['rate', 'pv_system', 'hourly_consumption'],
+        'offset': ['rate', 'pv_system', 'current_monthly_consumption'],
+        'new_monthly_consumption': ['rate', 'pv_system', 'current_monthly_consumption', 'net_metering', 'hourly_simulation'],
+        'new_lifetime_consumption': ['rate', 'pv_system', 'current_monthly_consumption', 'offset'],
+        'yearly_energy_savings': ['current_monthly_consumption', 'new_lifetime_consumption'],
+        'cumulative_energy_savings': ['yearly_energy_savings'],
+        'current_monthly_payment': ['rate', 'current_monthly_consumption'],
+        'new_monthly_payment': ['rate', 'new_monthly_consumption'],
+        'new_lifetime_payments': ['rate', 'new_monthly_consumption', 'new_monthly_payment', 'new_lifetime_consumption'],
+        'yearly_payments_savings': ['current_monthly_payment', 'new_lifetime_payments'],
+        'cash_flow': ['pv_system', 'yearly_payments_savings'],
+        'cumulative_cash_flow': ['cash_flow'],
+    }
+
+    def __init__(self, rate, pv_system, current_monthly_consumption=None, net_metering=None, hourly_consumption=None, daily_shape=None,
+                 **kwargs):
         self._rate = self._validate_rate(rate)
         self._pv_system = self._validate_pv_system(pv_system)
-        self._current_monthly_consumption = current_monthly_consumption
+        self._daily_shape = daily_shape
+        self._set_consumption(current_monthly_consumption, hourly_consumption)
+        self._net_metering = self._validate_net_metering(net_metering or NetMeteringEngine())
         self._extra_params = kwargs if isinstance(rate, GdmtoRate) else {}
-        self._invalidate_caches()
+        self._cache = CacheGraph(self.STAGES, 'SolarSavingsCalculator')
 
     def _validate_rate(self, value):
         if not isinstance(value, Rate):
@@ -21,18 +53,27 @@ class SolarSavingsCalculator:
             raise ValueError("pv_system must be an instance of PVSystem")
         return value
     
-    def _invalidate_caches(self):
-        self._offset_cache = None
-        self._new_monthly_consumption_cache = None
-        self._new_lifetime_consumption_cache = None
-        self._yearly_energy_savings_cache = None
-        self._cumulative_energy_savings_cache = None
-        self._current_monthly_payment_cache = None
-        self._new_monthly_payment_cache = None
-        self._new_lifetime_payments_cache = None
-        self._yearly_payments_savings_cache = None
-        self._yearly_cashflow_cache = None
-        self._cumulative_cashflow_cache = None
+    def _validate_net_metering(self, value):
+        if not isinstance(value, NetMeteringEngine):
+            raise ValueError("net_metering must be an instance of NetMeteringEngine")
+        return value
+
+    # Hourly consumption is kept as a float array, its monthly totals stand in for the monthly consumption when that is not given
+    def _set_consumption(self, monthly_consumption, hourly_consumption):
+        if hourly_consumption is None:
+            if monthly_consumption is None:
+                raise ValueError("Either current_monthly_consumption or hourly_consumption must be given")
+            self._hourly_consumption = None
+            self._current_monthly_consumption = monthly_consumption
+            return
+
+        simulator = HourlySimulator(self._rate._end_year_month)
+        monthly_totals = simulator.aggregate_monthly(hourly_consumption, "hourly_consumption")
+        self._hourly_consumption = np.asarray(hourly_consumption, dtype=float)
+        self._current_monthly_consumption = monthly_consumption if monthly_consumption is not None else round_array(monthly_totals, 2).tolist()
+
+    def invalidate_caches(self, *stages):
+        self._cache.invalidate(*stages)
 
     @property
     def rate(self):
@@ -41,7 +82,7 @@ class SolarSavingsCalculator:
     @rate.setter
     def rate(self, value):
         self._rate = self._validate_rate(value)
-        self._invalidate_caches()
+        self._cache.invalidate('rate')
 
     @property
     def pv_system(self):
@@ -50,7 +91,7 @@ class SolarSavingsCalculator:
     @pv_system.setter
     def pv_system(self, value):
         self._pv_system = self._validate_pv_system(value)
-        self._invalidate_caches()
+        self._cache.invalidate('pv_system')
 
     @property
     def current_monthly_consumption(self):
@@ -58,13 +99,31 @@ class SolarSavingsCalculator:
     
     @current_monthly_consumption.setter
     def current_monthly_consumption(self, value):
-        self._current_monthly_consumption = value
-        self._invalidate_caches()
+        self._set_consumption(value, None)
+        self._cache.invalidate('current_monthly_consumption', 'hourly_consumption')
+
+    @property
+    def hourly_consumption(self):
+        return self._hourly_consumption
+
+    @hourly_consumption.setter
+    def hourly_consumption(self, value):
+        self._set_consumption(None, value)
+        self._cache.invalidate('current_monthly_consumption', 'hourly_consumption')
+
+    @property
+    def net_metering(self):
+        return self._net_metering
+
+    @net_metering.setter
+    def net_metering(self, value):
+        self._net_metering = self._validate_net_metering(value)
+        self._cache.invalidate('net_metering')
 
     def calculate_offset(self):
-        if self._offset_cache is not None:
-            return self._offset_cache
-        
+        return self._cache.get('offset', self._calculate_offset)
+
+    def _calculate_offset(self):
         current_annual_consumption = sum(self._current_monthly_consumption)
         annual_energy_production = sum(self._pv_system.calculate_monthly_energy_production(self._rate._end_year_month))
         
@@ -72,43 +131,29 @@ class SolarSavingsCalculator:
             return 1
         
         offset = annual_energy_production / current_annual_consumption 
-        offset = round(offset, 2)
-
-        self._offset_cache = offset
-        return offset
+        return round(offset, 2)
     
     def calculate_new_monthly_consumption(self):
-        if self._new_monthly_consumption_cache is not None:
-            return self._new_monthly_consumption_cache
-        
+        return self._cache.get('new_monthly_consumption', self._calculate_new_monthly_consumption)
+
+    def _calculate_new_monthly_consumption(self):
+        if self._hourly_consumption is not None:
+            # Only the energy that goes through the meter is netted, self consumed energy never reaches it
+            simulation = self.calculate_hourly_simulation()
+            return self._net_metering.calculate_new_consumption(simulation["monthly_imports"], simulation["monthly_exports"]).tolist()
+
         monthly_production = self._pv_system.calculate_monthly_energy_production(self._rate._end_year_month)
-        new_monthly_consumption = []
-        energy_bank = 0
-
-        for current, production in zip(self.current_monthly_consumption, monthly_production):
-            net_energy = production - current + energy_bank
-            if net_energy >= 0:
-                new_monthly_consumption.append(0)
-                energy_bank = net_energy
-            else:
-                new_monthly_consumption.append(round(abs(net_energy), 2))
-                energy_bank = 0
-        
-        if energy_bank > 0:
-            for i in range(len(new_monthly_consumption)):
-                if energy_bank <= 0:
-                    break
-                if new_monthly_consumption[i] > 0:
-                    if new_monthly_consumption[i] <= energy_bank:
-                        energy_bank -= new_monthly_consumption[i]
-                        new_monthly_consumption[i] = 0
-                    else:
-                        new_monthly_consumption[i] -= energy_bank
-                        new_monthly_consumption[i] = round(new_monthly_consumption[i], 2)
-                        energy_bank = 0
-
-        self._new_monthly_consumption_cache = new_monthly_consumption
-        return new_monthly_consumption
+        return self._net_metering.calculate_new_consumption(self.current_monthly_consumption, monthly_production).tolist()
+
+    def calculate_hourly_simulation(self):
+        if self._hourly_consumption is None:
+            raise ValueError("Hourly simulation needs hourly_consumption")
+        return self._cache.get('hourly_simulation', self._calculate_hourly_simulation)
+
+    def _calculate_hourly_simulation(self):
+        end_year_month = self._rate._end_year_month
+        hourly_production = self._pv_system.calculate_hourly_energy_production(end_year_month, self._daily_shape)
+        return HourlySimulator(end_year_month).simulate(self._hourly_consumption, hourly_production)
     
     def calculate_monthly_energy_savings(self):
         new_monthly_consumption = self.calculate_new_monthly_consumption()
@@ -116,61 +161,34 @@ class SolarSavingsCalculator:
         return monthly_energy_savings
     
     def calculate_new_lifetime_consumption(self):
-        if self._new_lifetime_consumption_cache is not None:
-            return self._new_lifetime_consumption_cache
-        
+        return self._cache.get('new_lifetime_consumption', self._calculate_new_lifetime_consumption)
+
+    def _calculate_new_lifetime_consumption(self):
         lifetime_production = self._pv_system.calculate_lifetime_production(self._rate._end_year_month)
         annual_consumption = sum(self._current_monthly_consumption)
-        new_lifetime_consumption = []
-        offset = self.calculate_offset()
-        
-        if offset < 1:
-            for production in lifetime_production:
-                new_lifetime_consumption = [round(annual_consumption - production, 2) for production in lifetime_production]
-        else:
-            for production in lifetime_production:
-                new_consumption = round(annual_consumption - production, 2) 
-                new_lifetime_consumption.append(max(new_consumption, 0))
-
-        self._new_lifetime_consumption_cache = new_lifetime_consumption
-        return new_lifetime_consumption
+        new_lifetime_consumption = [round(annual_consumption - production, 2) for production in lifetime_production]
+
+        if self.calculate_offset() < 1:
+            return new_lifetime_consumption
+        return [max(new_consumption, 0) for new_consumption in new_lifetime_consumption]
     
     def calculate_yearly_energy_savings(self, cumulative=False):
-        if self._yearly_energy_savings_cache is not None and not cumulative:
-            return self._yearly_energy_savings_cache
-        if self._cumulative_energy_savings_cache is not None and cumulative:
-            return self._cumulative_cashflow_cache
-        
+        if cumulative:
+            return self._cache.get('cumulative_energy_savings', lambda: accumulate(self.calculate_yearly_energy_savings()).tolist())
+        return self._cache.get('yearly_energy_savings', self._calculate_yearly_energy_savings)
+
+    def _calculate_yearly_energy_savings(self):
         new_lifetime_consumption = self.calculate_new_lifetime_consumption()
         current_annual_consumption = sum(self.current_monthly_consumption)
-        yearly_energy_savings = [current_annual_consumption - new_consumption for new_consumption in new_lifetime_consumption]
-
-        if not cumulative:
-            self._yearly_energy_savings_cache = yearly_energy_savings
-            return yearly_energy_savings
-
-        cumulative_energy_savings = [sum(yearly_energy_savings[:i+1]) for i in range(len(yearly_energy_savings))]
-        self._cumulative_energy_savings_cache = cumulative_energy_savings
-        return cumulative_energy_savings
+        return [current_annual_consumption - new_consumption for new_consumption in new_lifetime_consumption]
 
     def calculate_current_monthly_payment(self):
-        if self._current_monthly_payment_cache is not None:
-            return self._current_monthly_payment_cache
-        
-        current_monthly_payment = self.rate.calculate_monthly_payments(self.current_monthly_consumption, **self._extra_params)
-        
-        self._current_monthly_payment_cache = current_monthly_payment
-        return current_monthly_payment
+        return self._cache.get('current_monthly_payment',
+                               lambda: self.rate.calculate_monthly_payments(self.current_monthly_consumption, **self._extra_params))
     
     def calculate_new_monthly_payment(self):
-        if self._new_monthly_payment_cache is not None:
-            return self._new_monthly_payment_cache
-        
-        new_monthly_consumption = self.calculate_new_monthly_consumption()
-        new_monthly_payment = self.rate.calculate_monthly_payments(new_monthly_consumption, **self._extra_params)
-        
-        self._calculate_new_monthly_payment = new_monthly_payment
-        return new_monthly_payment
+        return self._cache.get('new_monthly_payment',
+                               lambda: self.rate.calculate_monthly_payments(self.calculate_new_monthly_consumption(), **self._extra_params))
     
     def calculate_monthly_payment_savings(self):
         new_monthly_payment = self.calculate_new_monthly_payment()
@@ -179,75 +197,55 @@ class SolarSavingsCalculator:
         return monthly_payment_savings
     
     def calculate_new_lifetime_payments(self, annual_inflation=0.05):
-        if self._new_lifetime_payments_cache is not None:
-            return self._new_lifetime_payments_cache
-        
+        return self._cache.get('new_lifetime_payments', lambda: self._calculate_new_lifetime_payments(annual_inflation), annual_inflation)
+
+    def _calculate_new_lifetime_payments(self, annual_inflation):
         new_monthly_consumption = self.calculate_new_monthly_consumption()
         year_1_consumption = sum(new_monthly_consumption)
         new_monthly_payment = self.calculate_new_monthly_payment()
         year_1_payment = round(sum(new_monthly_payment), 2)
         year_1_fix_charge_payment = sum(self.rate.calculate_monthly_payments([0 for _ in range(12)], **self._extra_params))
-        annual_increase = 1 +  annual_inflation
-        new_lifetime_payment = [year_1_payment]
         new_lifetime_consumption = self.calculate_new_lifetime_consumption()
-
-        for i in range(1, len(new_lifetime_consumption)):
-            if new_lifetime_consumption[i] == 0:
-                annual_payment = year_1_fix_charge_payment * ( annual_increase ** i)
-                new_lifetime_payment.append(round(annual_payment,2))
-            else:
-                annual_payment = (((year_1_payment - year_1_fix_charge_payment) * (new_lifetime_consumption[i] / year_1_consumption)) + year_1_fix_charge_payment) * (annual_increase ** i)
-                new_lifetime_payment.append(round(annual_payment,2))
-        
-        self._new_lifetime_payments_cache = new_lifetime_payment
-        return new_lifetime_payment
+        return project_new_lifetime_payments(year_1_payment, year_1_fix_charge_payment, year_1_consumption,
+                                             new_lifetime_consumption, annual_inflation).tolist()
     
     def calculate_yearly_payments_savings(self, annual_inflation=0.05):
-        if self._yearly_payments_savings_cache is not None:
-            return self._yearly_payments_savings_cache
-        
+        return self._cache.get('yearly_payments_savings', lambda: self._calculate_yearly_payments_savings(annual_inflation), annual_inflation)
+
+    def _calculate_yearly_payments_savings(self, annual_inflation):
         monthly_current_payment = self.calculate_current_monthly_payment()
         new_lifetime_payments = self.calculate_new_lifetime_payments(annual_inflation)
-        current_lifetime_payments = [sum(monthly_current_payment) * (1 + annual_inflation) ** i for i in range(len(new_lifetime_payments))]
-        total_payments_savings = [round(current - new, 2) for current, new in zip(current_lifetime_payments, new_lifetime_payments)]
-        self._yearly_payments_savings_cache = total_payments_savings
-        return total_payments_savings
+        current_lifetime_payments = project_current_payments(sum(monthly_current_payment), annual_inflation, len(new_lifetime_payments))
+        return round_array(current_lifetime_payments - np.asarray(new_lifetime_payments, dtype=float), 2).tolist()
     
-    def calculate_cash_flow(self, cost_per_kw=None, cumulative=False):
-        if self._yearly_cashflow_cache is not None and cost_per_kw is None and not cumulative:
-            return self._yearly_cashflow_cache
-        if self._cumulative_cashflow_cache is not None and cost_per_kw is None and cumulative:
-            return self._cumulative_cashflow_cache
-        
+    def calculate_cash_flow(self, cost_per_kw=None, cumulative=False, annual_inflation=0.05):
         default_cost_per_kw = 20000 
-        cost_per_kw = cost_per_kw if cost_per_kw else default_cost_per_kw 
-        
+        cost_per_kw = cost_per_kw if cost_per_kw else default_cost_per_kw
+        key = (cost_per_kw, annual_inflation)
+
+        if cumulative:
+            return self._cache.get('cumulative_cash_flow', lambda: self._calculate_cumulative_cash_flow(cost_per_kw, annual_inflation), key)
+        return self._cache.get('cash_flow', lambda: self._calculate_cash_flow(cost_per_kw, annual_inflation), key)
+
+    def _calculate_cash_flow(self, cost_per_kw, annual_inflation):
         initial_outflow = -self._pv_system.calculate_installation_cost(cost_per_kw)
         yearly_cash_flows = [initial_outflow]
-        yearly_payments_savings = self.calculate_yearly_payments_savings()
-        yearly_cash_flows.extend(yearly_payments_savings)
+        yearly_cash_flows.extend(self.calculate_yearly_payments_savings(annual_inflation))
+        return yearly_cash_flows
 
-        if not cumulative:
-            self._yearly_cashflow_cache = yearly_cash_flows
-            return yearly_cash_flows
-        
-        cumulative_cash_flows = []
-        cumulative_sum = 0
-        for cash_flow in yearly_cash_flows:
-            cumulative_sum += cash_flow
-            cumulative_cash_flows.append(round(cumulative_sum, 2))
-        self._cumulative_cashflow_cache = cumulative_cash_flows
-        return cumulative_cash_flows      
-
-    def calculate_roi(self):
-        cash_flows = self.calculate_cash_flow()
+    def _calculate_cumulative_cash_flow(self, cost_per_kw, annual_inflation):
+        yearly_cash_flows = self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation)
+        return round_array(accumulate(yearly_cash_flows), 2).tolist()
+
+    def calculate_roi(self, cost_per_kw=None, annual_inflation=0.05):
+        cash_flows = self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation)
         total_investment = -cash_flows[0]
         total_returns = sum(cash_flows[1:])
         roi = (total_returns - total_investment) / total_investment  
         return round(roi, 2)
     
-    def calculate_payback_period(self):
-        cumulative_cash_flows = self.calculate_cash_flow(cumulative=True)
+    def calculate_payback_period(self, cost_per_kw=None, annual_inflation=0.05):
+        cumulative_cash_flows = self.calculate_cash_flow(cost_per_kw, cumulative=True, annual_inflation=annual_inflation)
         first_positive_cashflow_year = -1
         last_negative_cashflow_year = -1
         for year, cash_flow in enumerate(cumulative_cash_flows):
@@ -266,6 +264,25 @@ class SolarSavingsCalculator:
 
         return round(payback_period, 2)
     
+    def calculate_npv(self, discount_rate, cost_per_kw=None, annual_inflation=0.05):
+        cash_flows = self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation)
+        return round(float(npv(cash_flows, discount_rate)), 2)
+
+    def calculate_irr(self, cost_per_kw=None, annual_inflation=0.05):
+        cash_flows = self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation)
+        value = float(irr(cash_flows))
+        if np.isnan(value):
+            return None
+        return round(value, 4)
+
+    def calculate_lcoe(self, discount_rate, cost_per_kw=None, annual_om_cost=0):
+        installation_cost = self._pv_system.calculate_installation_cost(cost_per_kw)
+        lifetime_production = self._pv_system.calculate_lifetime_production(self._rate._end_year_month)
+        value = float(lcoe(installation_cost, lifetime_production, discount_rate, annual_om_cost))
+        if np.isnan(value):
+            return None
+        return round(value, 4)
+
     def calculate_environmental_impact(self):
         total_energy_savings = sum(self.calculate_yearly_energy_savings())
         calculator = EnvironmentalImpactCalculator(total_energy_savings)
@@ -276,4 +293,24 @@ class SolarSavingsCalculator:
         return {
             "kg_co2_saved": co2_saved,
             "trees_planted": trees_planted
-        }
\ No newline at end of file
+        }
+
+    # Every output of the calculator in one compact record
+    def generate_report(self, cost_per_kw=None, annual_inflation=0.05):
+        environmental_impact = self.calculate_environmental_impact()
+        return SavingsReport(
+            system_size=self._pv_system.system_size,
+            offset=self.calculate_offset(),
+            roi=self.calculate_roi(cost_per_kw, annual_inflation),
+            payback_period=self.calculate_payback_period(cost_per_kw, annual_inflation),
+            irr=self.calculate_irr(cost_per_kw, annual_inflation),
+            kg_co2_saved=environmental_impact["kg_co2_saved"],
+            trees_planted=environmental_impact["trees_planted"],
+            current_monthly_consumption=self.current_monthly_consumption,
+            new_monthly_consumption=self.calculate_new_monthly_consumption(),
+            current_monthly_payment=self.calculate_current_monthly_payment(),
+            new_monthly_payment=self.calculate_new_monthly_payment(),
+            yearly_energy_savings=self.calculate_yearly_energy_savings(),
+            yearly_payments_savings=self.calculate_yearly_payments_savings(annual_inflation),
+            cash_flow=self.calculate_cash_flow(cost_per_kw, annual_inflation=annual_inflation),
+        )
\ No newline at end of file
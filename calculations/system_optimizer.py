@@ -0,0 +1,136 @@
+import math
+import numpy as np
+from models.pv_system import PVSystem
+from models.production_profile import get_production_profile
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+
+class SystemSizeOptimizer:
+    OBJECTIVES = ['roi', 'npv']
+    # Module counts evaluated per batch while narrowing the search window
+    GRID_SIZE = 16
+
+    def __init__(self, rate, pv_system, current_monthly_consumption, cost_per_kw=None, annual_inflation=0.05,
+                 max_pv_module_count=None, **kwargs):
+        self._pv_system = self._validate_pv_system(pv_system)
+        self._rate = rate
+        self._current_monthly_consumption = current_monthly_consumption
+        self._cost_per_kw = cost_per_kw
+        self._annual_inflation = annual_inflation
+        self._extra_params = kwargs
+        self._results = {}
+        self._evaluations = 0
+
+        pv_module = self._pv_system.pv_module
+        self._profile = get_production_profile(self._pv_system.location, pv_module.tilt_angle, rate._end_year_month)
+        # Production is linear in the module count, one module's yield sizes the search window without a sweep
+        self._module_annual_production = float(np.sum(self._profile.scale(pv_module.capacity, pv_module.efficiency, pv_system.efficiency)))
+        self._max_pv_module_count = self._validate_max_pv_module_count(max_pv_module_count)
+
+    def _validate_pv_system(self, value):
+        if not isinstance(value, PVSystem):
+            raise ValueError("pv_system must be an instance of PVSystem")
+        return value
+
+    def _validate_max_pv_module_count(self, value):
+        if value is None:
+            return self._count_for_full_offset()
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError("max pv module count must be an integer greater than 0")
+        return value
+
+    def _validate_objective(self, value):
+        if value not in self.OBJECTIVES:
+            raise ValueError(f"Objective must be one of {self.OBJECTIVES}")
+        return value
+
+    def _count_for_full_offset(self):
+        if self._module_annual_production <= 0:
+            raise ValueError("Solar hours data is not available for the system location and tilt")
+
+        # Past the size that still offsets all consumption in the last (most degraded) year, savings stop growing
+        pv_module = self._pv_system.pv_module
+        last_year_factor = (1 - pv_module.annual_degradation) ** (pv_module.lifespan - 1)
+        annual_consumption = sum(self._current_monthly_consumption)
+        return max(math.ceil(annual_consumption / (self._module_annual_production * last_year_factor)) + 1, 1)
+
+    @property
+    def max_pv_module_count(self):
+        return self._max_pv_module_count
+
+    @property
+    def evaluations(self):
+        return self._evaluations
+
+    def evaluate(self, pv_module_counts, discount_rate=0.0):
+        pending = sorted({int(count) for count in pv_module_counts if (int(count), discount_rate) not in self._results})
+        if pending:
+            self._evaluations += 1
+            pv_module = self._pv_system.pv_module
+            system_size = pv_module.capacity * np.array(pending, dtype=float)
+            monthly_production = self._profile.scale(system_size, pv_module.efficiency, self._pv_system.efficiency)
+            calculator = BatchSolarSavingsCalculator(self._rate, monthly_production, self._current_monthly_consumption, system_size,
+                                                     lifespan=pv_module.lifespan, annual_degradation=pv_module.annual_degradation,
+                                                     **self._extra_params)
+            offset = calculator.calculate_offset()
+            roi = calculator.calculate_roi(self._cost_per_kw, self._annual_inflation)
+            payback_period = calculator.calculate_payback_period(self._cost_per_kw, self._annual_inflation)
+            npv = calculator.calculate_npv(discount_rate, self._cost_per_kw, self._annual_inflation)
+            irr = calculator.calculate_irr(self._cost_per_kw, self._annual_inflation)
+
+            for i, count in enumerate(pending):
+                self._results[(count, discount_rate)] = {
+                    "pv_module_count": count,
+                    "system_size": float(system_size[i]),
+                    "offset": float(offset[i]),
+                    "roi": float(roi[i]),
+                    "npv": float(npv[i]),
+                    "irr": None if np.isnan(irr[i]) else float(irr[i]),
+                    "payback_period": None if np.isnan(payback_period[i]) else float(payback_period[i]),
+                }
+
+        return [self._results[(int(count), discount_rate)] for count in pv_module_counts]
+
+    # Offset never decreases with the module count, the answer is narrowed between a count known to fall short (low)
+    # and one known to reach the target (high)
+    def find_count_for_offset(self, target_offset):
+        if not target_offset > 0:
+            raise ValueError("Target offset must be greater than 0")
+        low, high = 0, self._max_pv_module_count
+        if self.evaluate([high])[0]["offset"] < target_offset:
+            raise ValueError(f"Target offset {target_offset} is not reached with the maximum of {high} modules")
+
+        # Production is rounded per month and the offset to 0.01, the answer is usually a few modules from the estimate
+        annual_consumption = sum(self._current_monthly_consumption)
+        estimate = min(max(math.ceil(target_offset * annual_consumption / self._module_annual_production), 1), high)
+        counts = range(max(estimate - 2, 1), min(estimate + 2, high) + 1)
+        while True:
+            for result in self.evaluate(counts):
+                if result["offset"] >= target_offset:
+                    high = min(high, result["pv_module_count"])
+                else:
+                    low = max(low, result["pv_module_count"])
+            if high - low <= 1:
+                return self.evaluate([high])[0]
+            counts = np.unique(np.linspace(low + 1, high - 1, self.GRID_SIZE).round().astype(int)).tolist()
+
+    # NaN and infinite objectives can't be ranked, they are left out instead of winning or hiding the best count
+    def _best(self, results, objective):
+        candidates = [i for i, result in enumerate(results) if math.isfinite(result[objective])]
+        if not candidates:
+            raise ValueError(f"No module count has a finite {objective}")
+        return max(candidates, key=lambda i: results[i][objective])
+
+    def maximize(self, objective='npv', discount_rate=0.0):
+        objective = self._validate_objective(objective)
+        low, high = 1, self._max_pv_module_count
+
+        # Coarse grid over the window, then narrow to the neighbours of the best point
+        while high - low + 1 > self.GRID_SIZE:
+            counts = np.unique(np.linspace(low, high, self.GRID_SIZE).round().astype(int))
+            results = self.evaluate(counts, discount_rate)
+            best = self._best(results, objective)
+            low = int(counts[max(best - 1, 0)])
+            high = int(counts[min(best + 1, len(counts) - 1)])
+
+        results = self.evaluate(range(low, high + 1), discount_rate)
+        return results[self._best(results, objective)]
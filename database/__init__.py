@@ -1,5 +1,24 @@
-from .dao_interface import SolarHoursDAO, CommercialRatesDAO, ResidentialRatesDAO, LocationDAO
-from .solar_hours_data import SolarHoursData
-from .commercial_rates_data import CommercialRatesData
-from .residential_rates_data import ResidentialRatesData
-from .location_data import LocationData
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first access so a worker that needs one DAO doesn't load them all
+_EXPORTS = {
+    'SolarHoursDAO': 'dao_interface', 'CommercialRatesDAO': 'dao_interface', 'ResidentialRatesDAO': 'dao_interface', 'LocationDAO': 'dao_interface',
+    'ConnectionManager': 'connection_manager', 'get_connection_manager': 'connection_manager', 'set_connection_manager': 'connection_manager',
+    'close_connection_managers': 'connection_manager',
+    'SolarHoursData': 'solar_hours_data',
+    'CommercialRatesData': 'commercial_rates_data',
+    'ResidentialRatesData': 'residential_rates_data',
+    'LocationData': 'location_data',
+    'TariffSnapshot': 'tariff_snapshot',
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
\ No newline at end of file
@@ -1,18 +1,22 @@
 import sqlite3
 from database.dao_interface import CommercialRatesDAO
 from utils.date_utils import calculate_start_month
+from database.connection_manager import get_connection_manager
+from utils.instrumentation import timed, QUERY
 import config
 
 class CommercialRatesData(CommercialRatesDAO):
-    def __init__(self, rate, db_path=config.DATABASE_PATH):
+    def __init__(self, rate, db_path=config.DATABASE_PATH, connection_manager=None):
         self.rate = rate
-        self.db_path = db_path
+        self._connection_manager = connection_manager or get_connection_manager(db_path)
+        self.db_path = self._connection_manager.db_path
 
+    @timed(QUERY)
     def get_charges(self, region_id, end_year_month):
         start_year_month = calculate_start_month(end_year_month)
         columns =  ['billing_period', 'transmission', 'distribution', 'cenace', 'supplier', 'services', 'energy', 'capacity']
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 query = f"""
                     SELECT {','.join(columns)}
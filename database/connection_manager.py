@@ -0,0 +1,131 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+import config
+
+class ConnectionManager:
+    DEFAULT_POOL_SIZE = 5
+    DEFAULT_TIMEOUT = 5.0
+    # Number of compiled statements sqlite3 keeps per connection, reused across calls
+    DEFAULT_CACHED_STATEMENTS = 128
+
+    def __init__(self, db_path=config.DATABASE_PATH, pool_size=DEFAULT_POOL_SIZE, read_only=False,
+                 timeout=DEFAULT_TIMEOUT, cached_statements=DEFAULT_CACHED_STATEMENTS):
+        self._db_path = db_path
+        self._pool_size = self._validate_pool_size(pool_size)
+        self._read_only = read_only
+        self._timeout = timeout
+        self._cached_statements = cached_statements
+        self._reset_pool()
+
+    def _validate_pool_size(self, value):
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError("Pool size must be an integer greater than 0")
+        return value
+
+    def _reset_pool(self):
+        self._lock = threading.Lock()
+        self._idle_connections = queue.LifoQueue()
+        self._connection_count = 0
+
+    # Connections and locks can't be pickled, workers rebuild their own pool on first use
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_idle_connections']
+        del state['_connection_count']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_pool()
+
+    @property
+    def db_path(self):
+        return self._db_path
+
+    @property
+    def pool_size(self):
+        return self._pool_size
+
+    @property
+    def read_only(self):
+        return self._read_only
+
+    def _connect(self):
+        if self._read_only:
+            return sqlite3.connect(f"file:{self._db_path}?mode=ro", uri=True, check_same_thread=False,
+                                   cached_statements=self._cached_statements)
+        return sqlite3.connect(self._db_path, check_same_thread=False, cached_statements=self._cached_statements)
+
+    def _acquire(self):
+        try:
+            return self._idle_connections.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._connection_count < self._pool_size
+            if can_create:
+                self._connection_count += 1
+
+        if can_create:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._connection_count -= 1
+                raise
+
+        try:
+            return self._idle_connections.get(timeout=self._timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a database connection")
+
+    def _release(self, conn):
+        self._idle_connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            # Same commit/rollback semantics as using sqlite3.connect() as a context manager
+            with conn:
+                yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle_connections.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._connection_count -= 1
+
+_connection_managers = {}
+_connection_managers_lock = threading.Lock()
+
+def get_connection_manager(db_path=config.DATABASE_PATH):
+    with _connection_managers_lock:
+        manager = _connection_managers.get(db_path)
+        if manager is None:
+            manager = ConnectionManager(db_path)
+            _connection_managers[db_path] = manager
+        return manager
+
+def set_connection_manager(manager):
+    with _connection_managers_lock:
+        previous = _connection_managers.get(manager.db_path)
+        _connection_managers[manager.db_path] = manager
+        return previous
+
+def close_connection_managers():
+    with _connection_managers_lock:
+        managers = list(_connection_managers.values())
+        _connection_managers.clear()
+    for manager in managers:
+        manager.close()
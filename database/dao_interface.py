@@ -5,6 +5,15 @@ class SolarHoursDAO(ABC):
     def get_solar_hours(self, location_name, tilt):
         pass
 
+    @abstractmethod
+    def get_tilt_angles(self, location_name):
+        pass
+
+    # Identifies where the solar hours are read from, values cached from one source are never served for another
+    @property
+    def source(self):
+        return self
+
 class CommercialRatesDAO(ABC):
     @abstractmethod
     def get_charges(self, region_id, rate, end_year_month):
@@ -16,6 +25,10 @@ class ResidentialRatesDAO(ABC):
         pass
     
 class LocationDAO(ABC):
+    @abstractmethod
+    def get_location(self, location_name):
+        pass
+
     @abstractmethod
     def get_region(self, location_name):
         pass
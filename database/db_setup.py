@@ -1,5 +1,6 @@
 import sqlite3
 import csv
+import hashlib
 import os
 import config
 
@@ -86,59 +87,182 @@ def create_tables(conn):
     except Exception as e:
         print(f"An unexpected error occurred during table creation: {e}")
 
-def execute_bulk_insert(conn, sql, data):
+# Each migration upgrades the schema by one version, PRAGMA user_version stores the last one applied.
+# residential_* and commercial_rates already get their rate/billing_period index from their UNIQUE constraints.
+MIGRATIONS = [
+    (1, [
+        "CREATE INDEX IF NOT EXISTS idx_solar_hours_location_tilt_month ON solar_hours (location_id, tilt_angle, month, solar_hours)",
+        "CREATE INDEX IF NOT EXISTS idx_locations_city ON locations (city, location_id)",
+    ]),
+    # Natural keys for idempotent upserts, earlier builds could have inserted the same rows more than once
+    (2, [
+        "DELETE FROM regions WHERE region_id NOT IN (SELECT MIN(region_id) FROM regions GROUP BY region_name)",
+        "DELETE FROM locations WHERE location_id NOT IN (SELECT MIN(location_id) FROM locations GROUP BY city)",
+        "DELETE FROM solar_hours WHERE solar_hour_id NOT IN (SELECT MIN(solar_hour_id) FROM solar_hours GROUP BY location_id, tilt_angle, month)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_regions_region_name ON regions (region_name)",
+        # A unique index on city also covers location_id, it replaces the (city, location_id) index
+        "DROP INDEX IF EXISTS idx_locations_city",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_locations_city ON locations (city)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_solar_hours_natural_key ON solar_hours (location_id, tilt_angle, month)",
+        """CREATE TABLE IF NOT EXISTS source_files (
+                table_name TEXT PRIMARY KEY,
+                source_hash TEXT NOT NULL
+            )""",
+    ]),
+]
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def apply_migration(conn, version, statements):
+    conn.execute("BEGIN")
     try:
-        with conn:
-            conn.executemany(sql, data)
+        for statement in statements:
+            conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def migrate(conn):
+    current_version = get_schema_version(conn)
+    for version, statements in MIGRATIONS:
+        if version <= current_version:
+            continue
+        try:
+            apply_migration(conn, version, statements)
+        except sqlite3.OperationalError as e:
+            print(f"Operational error during migration to version {version}: {e}")
+            break
+        except sqlite3.DatabaseError as e:
+            print(f"Database error during migration to version {version}: {e}")
+            break
+        current_version = version
+    return current_version
+
+def upsert_sql(table_name, columns, conflict_columns):
+    placeholders = ', '.join('?' for _ in columns)
+    update_columns = [column for column in columns if column not in conflict_columns]
+    sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders}) ON CONFLICT ({', '.join(conflict_columns)}) "
+    if not update_columns:
+        return sql + "DO NOTHING"
+    return sql + "DO UPDATE SET " + ', '.join(f"{column} = excluded.{column}" for column in update_columns)
+
+# (table, csv path, upsert statement) in load order, regions and locations must exist before rows referencing them
+def get_data_sources():
+    return [
+        ('regions', config.REGIONS_CSV_PATH,
+         upsert_sql('regions', ['region_name'], ['region_name'])),
+        ('locations', config.LOCATIONS_CSV_PATH,
+         upsert_sql('locations', ['city', 'residential_rate', 'summer_start_month', 'region_id'], ['city'])),
+        ('solar_hours', config.SOLAR_HOURS_CSV_PATH,
+         upsert_sql('solar_hours', ['location_id', 'tilt_angle', 'month', 'solar_hours'], ['location_id', 'tilt_angle', 'month'])),
+        ('residential_summer_rates_a', config.RESIDENTIAL_SUMMER_RATES_A_CSV_PATH,
+         upsert_sql('residential_summer_rates_a', ['rate', 'billing_period', 'basic', 'intermediate', 'excess'], ['rate', 'billing_period'])),
+        ('residential_summer_rates_b', config.RESIDENTIAL_SUMMER_RATES_B_CSV_PATH,
+         upsert_sql('residential_summer_rates_b', ['rate', 'billing_period', 'basic', 'low_intermediate', 'high_intermediate', 'excess'], ['rate', 'billing_period'])),
+        ('residential_winter_rates', config.RESIDENTIAL_WINTER_RATES_CSV_PATH,
+         upsert_sql('residential_winter_rates', ['rate', 'billing_period', 'basic', 'intermediate', 'excess'], ['rate', 'billing_period'])),
+        ('commercial_rates', config.COMMERCIAL_RATES_CSV_PATH,
+         upsert_sql('commercial_rates', ['region_id', 'rate', 'billing_period', 'transmission', 'distribution', 'cenace',
+                                         'supplier', 'services', 'energy', 'capacity'], ['region_id', 'rate', 'billing_period'])),
+    ]
+
+def configure_bulk_load(conn):
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -16000")
+
+def hash_file(path, chunk_size=65536):
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+def get_stored_hashes(conn):
+    return dict(conn.execute("SELECT table_name, source_hash FROM source_files"))
+
+def read_csv_rows(file):
+    for row in csv.DictReader(file):
+        yield tuple(row.values())
+
+def populate_table_from_csv(conn, insert_sql, csv_file):
+    with open(csv_file, 'r', newline='') as file:
+        conn.executemany(insert_sql, read_csv_rows(file))
+
+def populate_tables(conn, data_sources=None):
+    data_sources = data_sources if data_sources is not None else get_data_sources()
+    try:
+        stored_hashes = get_stored_hashes(conn)
+        changed_sources = []
+        for table_name, csv_file, insert_sql in data_sources:
+            source_hash = hash_file(csv_file)
+            if stored_hashes.get(table_name) != source_hash:
+                changed_sources.append((table_name, csv_file, insert_sql, source_hash))
+    except FileNotFoundError as e:
+        print(f"File not found: {e.filename}")
+        return []
+    except sqlite3.DatabaseError as e:
+        print(f"Database error while checking data sources: {e}")
+        return []
+
+    if not changed_sources:
+        return []
+
+    # All changed sources are loaded in one transaction, a failure leaves the database untouched
+    conn.execute("BEGIN")
+    try:
+        for table_name, csv_file, insert_sql, source_hash in changed_sources:
+            populate_table_from_csv(conn, insert_sql, csv_file)
+            conn.execute("INSERT OR REPLACE INTO source_files (table_name, source_hash) VALUES (?, ?)", (table_name, source_hash))
+        conn.commit()
     except sqlite3.IntegrityError as e:
+        conn.rollback()
         print(f"Integrity error during bulk insert: {e}")
+        return []
     except sqlite3.OperationalError as e:
+        conn.rollback()
         print(f"Operational error during bulk insert: {e}")
-    except sqlite3.ProgrammingError as e:
-        print(f"Programming error during bulk insert:: {e}")
-    except sqlite3.DataError as e:
-        print(f"Data error during bulk insert:: {e}")
+        return []
     except sqlite3.DatabaseError as e:
-        print(f"Database error during bulk insert:: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred during bulk insert: {e}")
-
-def populate_table_from_csv(conn, insert_sql, csv_file):
-    try:
-        with open(csv_file, 'r') as file:
-            csv_reader = csv.DictReader(file)
-            data_to_insert = [tuple(row.values()) for row in csv_reader]
-            execute_bulk_insert(conn, insert_sql, data_to_insert)
-    except FileNotFoundError:
-        print(f"File not found: {csv_file}")
+        conn.rollback()
+        print(f"Database error during bulk insert: {e}")
+        return []
     except csv.Error as e:
+        conn.rollback()
         print(f"CSV error ocurred: {e}")
+        return []
     except Exception as e:
+        conn.rollback()
         print(f"An unexpected error occurred during CSV processing: {e}")
+        return []
+
+    return [table_name for table_name, _, _, _ in changed_sources]
+
+def setup_database(db_path=None):
+    db_path = db_path or config.DATABASE_PATH
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
 
-def populate_tables(conn):
-    populate_table_from_csv(conn, "INSERT INTO regions (region_name) VALUES(?)", config.REGIONS_CSV_PATH)
-    populate_table_from_csv(conn, "INSERT INTO locations (city, residential_rate, summer_start_month, region_id) VALUES (?, ?, ?, ?)", config.LOCATIONS_CSV_PATH)
-    populate_table_from_csv(conn, "INSERT INTO solar_hours (location_id, tilt_angle, month, solar_hours) VALUES (?, ?, ?, ?)", config.SOLAR_HOURS_CSV_PATH)
-    populate_table_from_csv(conn, "INSERT INTO residential_summer_rates_a (rate, billing_period, basic, intermediate, excess) VALUES(?, ?, ?, ?, ?)", config.RESIDENTIAL_SUMMER_RATES_A_CSV_PATH)
-    populate_table_from_csv(conn, "INSERT INTO residential_summer_rates_b (rate, billing_period, basic, low_intermediate, high_intermediate, excess) VALUES(?, ?, ?, ?, ?, ?)", config.RESIDENTIAL_SUMMER_RATES_B_CSV_PATH)
-    populate_table_from_csv(conn, "INSERT INTO residential_winter_rates (rate, billing_period, basic, intermediate, excess) VALUES(?, ?, ?, ?, ?)", config.RESIDENTIAL_WINTER_RATES_CSV_PATH)
-    populate_table_from_csv(conn, "INSERT INTO commercial_rates (region_id, rate, billing_period, transmission, distribution, cenace, supplier, services, energy, capacity) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", config.COMMERCIAL_RATES_CSV_PATH)
-    
-def setup_database():
-    os.makedirs(os.path.dirname(config.DATABASE_PATH), exist_ok=True)
-    
+    conn = None
     try:
-        with sqlite3.connect(config.DATABASE_PATH) as conn:
-            create_tables(conn)
-            populate_tables(conn)
-            conn.commit()
+        conn = sqlite3.connect(db_path)
+        configure_bulk_load(conn)
+        create_tables(conn)
+        migrate(conn)
+        return populate_tables(conn)
     except sqlite3.OperationalError as e:
         print(f"Operational error during database setup: {e}")
     except sqlite3.DatabaseError as e:
         print(f"Database error during setup: {e}")
     except Exception as e:
         print(f"An error occurred during setup: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+    return []
 
 if __name__ == '__main__':
     setup_database()
@@ -1,14 +1,42 @@
 import sqlite3
 from database.dao_interface import LocationDAO
+from database.connection_manager import get_connection_manager
+from utils.instrumentation import timed, QUERY
 import config
 
 class LocationData(LocationDAO):
-    def __init__(self, db_path=config.DATABASE_PATH):
-        self.db_path = db_path
+    def __init__(self, db_path=config.DATABASE_PATH, connection_manager=None):
+        self._connection_manager = connection_manager or get_connection_manager(db_path)
+        self.db_path = self._connection_manager.db_path
 
+    @timed(QUERY)
+    def get_location(self, city):
+        columns = ['city', 'region', 'region_id', 'residential_rate', 'summer_start_month']
+        try:
+            with self._connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                query = """
+                    SELECT city, region_name, locations.region_id, residential_rate, summer_start_month
+                    FROM locations
+                    LEFT JOIN regions
+                    ON regions.region_id = locations.region_id
+                    WHERE city = ?
+                """
+                cursor.execute(query, (city,))
+                result = cursor.fetchone()
+            if result:
+                location = dict(zip(columns, result))
+                location['summer_start_month'] = int(location['summer_start_month'])
+                return location
+            return None
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return None
+
+    @timed(QUERY)
     def get_region_id(self, city):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 query = """
                     SELECT region_id
@@ -22,9 +50,10 @@ class LocationData(LocationDAO):
             print(f"Database error: {e}")
             return None
         
+    @timed(QUERY)
     def get_region(self, city):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 query = """
                     SELECT region_name
@@ -40,9 +69,10 @@ class LocationData(LocationDAO):
             print(f"Database error: {e}")
             return None
     
+    @timed(QUERY)
     def get_residential_rate(self, city):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 query = """
                     SELECT residential_rate
@@ -56,9 +86,10 @@ class LocationData(LocationDAO):
             print(f"Database error: {e}")
             return None
         
+    @timed(QUERY)
     def get_summer_start_month(self, city):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 query = """
                     SELECT summer_start_month
@@ -1,29 +1,32 @@
 import sqlite3
 from database.dao_interface import ResidentialRatesDAO
-from utils.date_utils import calculate_start_month, extract_month, extract_year, format_month
-from datetime import datetime
+from utils.year_month import YearMonth
+from database.connection_manager import get_connection_manager
+from utils.instrumentation import timed, QUERY
 import config
 
 class ResidentialRatesData(ResidentialRatesDAO):
-    def __init__(self, db_path=config.DATABASE_PATH):
-        self.db_path = db_path
+    def __init__(self, db_path=config.DATABASE_PATH, connection_manager=None):
+        self._connection_manager = connection_manager or get_connection_manager(db_path)
+        self.db_path = self._connection_manager.db_path
 
     def _generate_year_months(self, season_months, end_year_month):
-        start_year_month = calculate_start_month(end_year_month)
+        start_year_month = YearMonth.parse(end_year_month) - 11
         year_months = []
-        start_year = extract_year(start_year_month)
-        start_month = extract_month(start_year_month)
+        start_year = start_year_month.year
+        start_month = start_year_month.month
 
         for month in season_months:
             year = start_year if month >= start_month else start_year + 1
-            year_month = format_month(year, month)
+            year_month = str(YearMonth(year, month))
             year_months.append(year_month)
 
         return year_months
 
+    @timed(QUERY)
     def _retrieve_charges(self, rate, year_months, table_name, columns):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 placeholders = ', '.join('?' for _ in year_months)
                 query = f"""
@@ -60,8 +63,8 @@ class ResidentialRatesData(ResidentialRatesDAO):
         winter_charges = self._get_winter_charges(rate, winter_months, end_year_month)
 
         summer_start_month = summer_months[0]
-        winter_start_charges = [charge for charge in winter_charges if extract_month(charge['billing_period']) < summer_start_month]
-        winter_end_charges = [charge for charge in winter_charges if extract_month(charge['billing_period']) > summer_start_month]
+        winter_start_charges = [charge for charge in winter_charges if YearMonth.parse(charge['billing_period']).month < summer_start_month]
+        winter_end_charges = [charge for charge in winter_charges if YearMonth.parse(charge['billing_period']).month > summer_start_month]
         
         all_charges = winter_start_charges + summer_charges + winter_end_charges
 
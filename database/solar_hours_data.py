@@ -1,14 +1,24 @@
+import os
 import sqlite3
 from database.dao_interface import SolarHoursDAO
+from database.connection_manager import get_connection_manager
+from utils.instrumentation import timed, QUERY
 import config
 
 class SolarHoursData(SolarHoursDAO):
-    def __init__(self, db_path=config.DATABASE_PATH):
-        self.db_path = db_path
+    def __init__(self, db_path=config.DATABASE_PATH, connection_manager=None):
+        self._connection_manager = connection_manager or get_connection_manager(db_path)
+        self.db_path = self._connection_manager.db_path
 
+    # DAOs on the same database file share their cached values
+    @property
+    def source(self):
+        return ('database', os.path.abspath(self.db_path))
+
+    @timed(QUERY)
     def get_solar_hours(self, city, tilt):
         try:
-            with sqlite3.connect((self.db_path)) as conn:
+            with self._connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 query = """
                 SELECT solar_hours
@@ -25,4 +35,22 @@ class SolarHoursData(SolarHoursDAO):
             print(f"Database error: {e}")
             import traceback
             traceback.print_exc()
-            return None
\ No newline at end of file
+            return None
+
+    @timed(QUERY)
+    def get_tilt_angles(self, city):
+        try:
+            with self._connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                query = """
+                SELECT DISTINCT tilt_angle
+                FROM solar_hours
+                JOIN locations ON solar_hours.location_id = locations.location_id
+                WHERE city = ?
+                ORDER BY tilt_angle
+                """
+                cursor.execute(query, (city,))
+                return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
\ No newline at end of file
@@ -0,0 +1,195 @@
+import bisect
+import sqlite3
+from database.dao_interface import SolarHoursDAO, CommercialRatesDAO, LocationDAO
+from database.residential_rates_data import ResidentialRatesData
+from database.connection_manager import get_connection_manager
+from utils.instrumentation import timed, QUERY
+from utils.date_utils import calculate_start_month
+import config
+
+class TariffSnapshot:
+    RESIDENTIAL_TABLES = {
+        'residential_summer_rates_a': ['billing_period', 'basic', 'intermediate', 'excess'],
+        'residential_summer_rates_b': ['billing_period', 'basic', 'low_intermediate', 'high_intermediate', 'excess'],
+        'residential_winter_rates': ['billing_period', 'basic', 'intermediate', 'excess'],
+    }
+    COMMERCIAL_COLUMNS = ['billing_period', 'transmission', 'distribution', 'cenace', 'supplier', 'services', 'energy', 'capacity']
+
+    def __init__(self, db_path=config.DATABASE_PATH, connection_manager=None):
+        self._connection_manager = connection_manager or get_connection_manager(db_path)
+        self._locations = {}
+        self._solar_hours = {}
+        self._residential_charges = {}
+        self._commercial_charges = {}
+        self._commercial_rates_data = {}
+        self._location_data = SnapshotLocationData(self)
+        self._solar_hours_data = SnapshotSolarHoursData(self)
+        self._residential_rates_data = SnapshotResidentialRatesData(self)
+        self.reload()
+
+    # Region ids are stored as TEXT in locations and as INTEGER in commercial_rates
+    @staticmethod
+    def _region_key(region_id):
+        try:
+            return int(region_id)
+        except (TypeError, ValueError):
+            return region_id
+
+    @timed(QUERY)
+    def reload(self):
+        try:
+            with self._connection_manager.connection() as conn:
+                locations = self._load_locations(conn)
+                solar_hours = self._load_solar_hours(conn)
+                residential_charges = {table: self._load_residential_charges(conn, table, columns)
+                                       for table, columns in self.RESIDENTIAL_TABLES.items()}
+                commercial_charges = self._load_commercial_charges(conn)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return
+
+        self._locations = locations
+        self._solar_hours = solar_hours
+        self._residential_charges = residential_charges
+        self._commercial_charges = commercial_charges
+
+    def _load_locations(self, conn):
+        columns = ['city', 'region', 'region_id', 'residential_rate', 'summer_start_month']
+        cursor = conn.execute("""
+            SELECT city, region_name, locations.region_id, residential_rate, summer_start_month
+            FROM locations
+            LEFT JOIN regions
+            ON regions.region_id = locations.region_id
+            ORDER BY location_id
+        """)
+        locations = {}
+        for row in cursor:
+            location = dict(zip(columns, row))
+            location['summer_start_month'] = int(location['summer_start_month'])
+            # Keep the first row per city, same as the fetchone() lookups in LocationData
+            locations.setdefault(location['city'], location)
+        return locations
+
+    def _load_solar_hours(self, conn):
+        cursor = conn.execute("""
+            SELECT city, tilt_angle, solar_hours
+            FROM solar_hours
+            JOIN locations ON solar_hours.location_id = locations.location_id
+            ORDER BY month
+        """)
+        solar_hours = {}
+        for city, tilt, hours in cursor:
+            solar_hours.setdefault((city, tilt), []).append(hours)
+        return solar_hours
+
+    def _load_residential_charges(self, conn, table_name, columns):
+        cursor = conn.execute(f"SELECT rate, {', '.join(columns)} FROM {table_name}")
+        return {(row[0], row[1]): dict(zip(columns, row[1:])) for row in cursor}
+
+    def _load_commercial_charges(self, conn):
+        cursor = conn.execute(f"""
+            SELECT region_id, rate, {', '.join(self.COMMERCIAL_COLUMNS)}
+            FROM commercial_rates
+            ORDER BY billing_period
+        """)
+        commercial_charges = {}
+        for row in cursor:
+            key = (row[1], self._region_key(row[0]))
+            periods, charges = commercial_charges.setdefault(key, ([], []))
+            periods.append(row[2])
+            charges.append(dict(zip(self.COMMERCIAL_COLUMNS, row[2:])))
+        return commercial_charges
+
+    @property
+    def location_data(self):
+        return self._location_data
+
+    @property
+    def solar_hours_data(self):
+        return self._solar_hours_data
+
+    @property
+    def residential_rates_data(self):
+        return self._residential_rates_data
+
+    def commercial_rates_data(self, rate):
+        rates_data = self._commercial_rates_data.get(rate)
+        if rates_data is None:
+            rates_data = self._commercial_rates_data.setdefault(rate, SnapshotCommercialRatesData(self, rate))
+        return rates_data
+
+    def get_location(self, city):
+        location = self._locations.get(city)
+        return dict(location) if location else None
+
+    def get_solar_hours(self, city, tilt):
+        solar_hours = self._solar_hours.get((city, tilt))
+        return list(solar_hours) if solar_hours else None
+
+    def get_tilt_angles(self, city):
+        return sorted(tilt for location, tilt in self._solar_hours if location == city)
+
+    def get_residential_charges(self, table_name, rate, year_months):
+        table = self._residential_charges.get(table_name, {})
+        charges = [table[(rate, year_month)] for year_month in sorted(set(year_months)) if (rate, year_month) in table]
+        return [dict(charge) for charge in charges] if charges else None
+
+    def get_commercial_charges(self, rate, region_id, start_year_month, end_year_month):
+        periods, charges = self._commercial_charges.get((rate, self._region_key(region_id)), ([], []))
+        start = bisect.bisect_left(periods, start_year_month)
+        end = bisect.bisect_right(periods, end_year_month)
+        return [dict(charge) for charge in charges[start:end]] or None
+
+class SnapshotLocationData(LocationDAO):
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def _get_field(self, city, field):
+        location = self._snapshot.get_location(city)
+        return location[field] if location else None
+
+    def get_location(self, city):
+        return self._snapshot.get_location(city)
+
+    def get_region(self, city):
+        return self._get_field(city, 'region')
+
+    def get_region_id(self, city):
+        return self._get_field(city, 'region_id')
+
+    def get_residential_rate(self, city):
+        return self._get_field(city, 'residential_rate')
+
+    def get_summer_start_month(self, city):
+        return self._get_field(city, 'summer_start_month')
+
+class SnapshotSolarHoursData(SolarHoursDAO):
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    @property
+    def source(self):
+        return self._snapshot
+
+    def get_solar_hours(self, city, tilt):
+        return self._snapshot.get_solar_hours(city, tilt)
+
+    def get_tilt_angles(self, city):
+        return self._snapshot.get_tilt_angles(city)
+
+class SnapshotCommercialRatesData(CommercialRatesDAO):
+    def __init__(self, snapshot, rate):
+        self._snapshot = snapshot
+        self.rate = rate
+
+    def get_charges(self, region_id, end_year_month):
+        start_year_month = calculate_start_month(end_year_month)
+        return self._snapshot.get_commercial_charges(self.rate, region_id, start_year_month, end_year_month)
+
+# Reuses the season/year-month handling of ResidentialRatesData, only the row lookup is in memory
+class SnapshotResidentialRatesData(ResidentialRatesData):
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def _retrieve_charges(self, rate, year_months, table_name, columns):
+        return self._snapshot.get_residential_charges(table_name, rate, year_months)
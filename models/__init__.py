@@ -1,6 +1,28 @@
-from .location import Location
-from .pv_module import PVModule
-from .pv_system import PVSystem
-from .pdbt_rate import PdbtRate
-from .residential_rate import ResidentialRate
-from .gdmto_rate import GdmtoRate
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first access so importing one model doesn't load numpy and every DAO
+_EXPORTS = {
+    'Location': 'location',
+    'LocationRegistry': 'location_registry', 'get_location_registry': 'location_registry', 'set_location_registry': 'location_registry',
+    'get_location': 'location_registry', 'invalidate_locations': 'location_registry',
+    'ProductionProfile': 'production_profile', 'ProductionProfileCache': 'production_profile',
+    'get_production_profile_cache': 'production_profile', 'set_production_profile_cache': 'production_profile',
+    'get_production_profile': 'production_profile', 'invalidate_production_profiles': 'production_profile',
+    'PVModule': 'pv_module',
+    'PVSystem': 'pv_system',
+    'PdbtRate': 'pdbt_rate',
+    'ResidentialRate': 'residential_rate',
+    'GdmtoRate': 'gdmto_rate',
+    'RATE_TYPES': 'rate_factory', 'create_rate': 'rate_factory',
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
\ No newline at end of file
@@ -1,15 +1,20 @@
+import numpy as np
+from utils.array_utils import round_array
+from utils.year_month import days_in_window
 from database.commercial_rates_data import CommercialRatesData
 from models.rate import Rate
+from utils.instrumentation import timed, STAGE
 
 class GdmtoRate(Rate):
     LOAD_FACTOR = 0.55
     LOW_VOLTAGE_RATE = 0.02
     DAP_CHARGE = 15
 
+    @timed(STAGE)
     def __init__(self, location, end_year_month, gdmto_rate_data=None):
         super().__init__(location, end_year_month, needs_days_in_month=True)
         self._gdmto_rate_data = gdmto_rate_data or CommercialRatesData("GDMTO")
-        self._charges = self._get_charges()
+        self._charge_arrays = None
     
     def _get_charges(self):
         charges = self._gdmto_rate_data.get_charges(self._location.region_id, self._end_year_month)
@@ -26,6 +31,58 @@ class GdmtoRate(Rate):
             raise ValueError("Power factor must be a number between 30 and 100")
         return power_factor
     
+    def _validate_batch_demand(self, demand):
+        if not np.issubdtype(demand.dtype, np.integer) or not (demand >= 0).all():
+            raise ValueError("Demand must be a positive integer")
+        return demand
+
+    def _validate_batch_power_factor(self, power_factor):
+        if not np.issubdtype(power_factor.dtype, np.number) or not ((power_factor >= 30) & (power_factor <= 100)).all():
+            raise ValueError("Power factor must be a number between 30 and 100")
+        return power_factor
+
+    def _get_charge_arrays(self):
+        if self._charge_arrays is None:
+            self._charge_arrays = {key: np.array([charge[key] for charge in self.charges], dtype=float)
+                                   for key in ['transmission', 'distribution', 'cenace', 'supplier', 'services', 'energy', 'capacity']}
+            self._charge_arrays["days_in_month"] = np.array(days_in_window(self._end_year_month), dtype=float)
+        return self._charge_arrays
+
+    # A single account is billed as a batch of one, demand and power factor are validated once for all months
+    def calculate_monthly_payments(self, monthly_consumption, demand, power_factor):
+        monthly_consumption = self._validate_monthly_values(monthly_consumption, "monthly_consumption")
+        parameters = self._validate_monthly_parameters({"demand": demand, "power_factor": power_factor})
+        return self.calculate_batch_monthly_payments(monthly_consumption, **parameters).tolist()
+
+    def calculate_batch_monthly_payments(self, monthly_consumptions, demand, power_factor):
+        consumption = self._validate_batch_monthly_values(monthly_consumptions, "monthly_consumptions").astype(float)
+        parameters = self._broadcast_batch_parameters({"demand": demand, "power_factor": power_factor}, consumption.shape)
+        demand = self._validate_batch_demand(parameters["demand"])
+        power_factor = self._validate_batch_power_factor(parameters["power_factor"]).astype(float)
+        charges = self._get_charge_arrays()
+
+        capacity_demand = self._calculate_batch_demand(consumption, charges["days_in_month"])
+        distribution_demand = np.minimum(demand, capacity_demand)
+        power_factor_rate = self._calculate_batch_power_factor_rate(power_factor)
+
+        # Same term order as _calculate_payment so results match it exactly
+        subtotal = (charges["supplier"] + consumption * charges["transmission"] + consumption * charges["cenace"]
+                    + consumption * charges["services"] + consumption * charges["energy"] + capacity_demand * charges["capacity"]
+                    + distribution_demand * charges["distribution"]) * (1 + self.LOW_VOLTAGE_RATE)
+        power_factor_charge = subtotal * power_factor_rate
+        total_before_iva = subtotal + power_factor_charge
+        total_cost = (total_before_iva * self.IVA_RATE) + self.DAP_CHARGE
+        return round_array(total_cost, 2)
+
+    def _calculate_batch_demand(self, consumption, days_in_month):
+        return round_array(consumption / (24 * days_in_month * self.LOAD_FACTOR), 2)
+
+    def _calculate_batch_power_factor_rate(self, power_factor):
+        with np.errstate(divide='ignore'):
+            bonus = - 0.25 * (1 - (90 / power_factor))
+            surcharge = 0.6 * ((90 / power_factor) - 1)
+        return np.where(power_factor == 90, 0, np.where(power_factor > 90, bonus, surcharge))
+
     def _calculate_payment(self, charge, consumption, days_in_month, demand, power_factor):
         power_factor = self._validate_power_factor(power_factor)
         demand = self._validate_demand(demand)
@@ -6,31 +6,42 @@ class Location:
         self._name = name
         self._solar_hours_data = solar_hours_data or SolarHoursData()
         self._location_data = location_data or LocationData()
-        self._region = self._location_data.get_region(self.name)
-        self._region_id = self._location_data.get_region_id(self.name)
-        self._residential_rate = self._location_data.get_residential_rate(self.name)
-        self._summer_start_month = self._location_data.get_summer_start_month(self.name)
+        self._location = None
+
+    # The location row is only read when one of its fields is first needed, solar hours alone never query it
+    def _get_location(self):
+        if self._location is None:
+            self._location = self._location_data.get_location(self.name) or {}
+        return self._location
 
     @property
     def name(self):
         return self._name
     
+    # DAOs that don't implement SolarHoursDAO are their own source
+    @property
+    def solar_hours_source(self):
+        return getattr(self._solar_hours_data, 'source', self._solar_hours_data)
+
     @property
     def region(self):
-        return self._region
+        return self._get_location().get('region')
     
     @property
     def region_id(self):
-        return self._region_id
+        return self._get_location().get('region_id')
     
     @property
     def residential_rate(self):
-        return self._residential_rate
+        return self._get_location().get('residential_rate')
     
     @property
     def summer_start_month(self):
-        return self._summer_start_month
+        return self._get_location().get('summer_start_month')
     
+    def get_tilt_angles(self):
+        return self._solar_hours_data.get_tilt_angles(self._name)
+
     def get_solar_hours(self, tilt):
         solar_hours = self._solar_hours_data.get_solar_hours(self._name, tilt)
         return solar_hours if solar_hours else None
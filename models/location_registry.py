@@ -0,0 +1,67 @@
+import threading
+from database.solar_hours_data import SolarHoursData
+from database.location_data import LocationData
+from models.location import Location
+
+class LocationRegistry:
+    # Tables whose rows are copied into Location instances
+    SOURCE_TABLES = ('locations', 'regions')
+
+    def __init__(self, solar_hours_data=None, location_data=None):
+        self._solar_hours_data = solar_hours_data or SolarHoursData()
+        self._location_data = location_data or LocationData()
+        self._locations = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, name):
+        return name in self._locations
+
+    def get_location(self, name):
+        location = self._locations.get(name)
+        if location is not None:
+            return location
+
+        location = Location(name, self._solar_hours_data, self._location_data)
+        # Unknown cities are not cached so bad input can't grow the registry
+        if location.region_id is None:
+            return location
+
+        with self._lock:
+            return self._locations.setdefault(name, location)
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._locations.clear()
+            else:
+                self._locations.pop(name, None)
+
+    def tables_changed(self, table_names):
+        if any(table in self.SOURCE_TABLES for table in table_names):
+            self.invalidate()
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_location_registry():
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = LocationRegistry()
+        return _default_registry
+
+def set_location_registry(registry):
+    global _default_registry
+    with _default_registry_lock:
+        previous = _default_registry
+        _default_registry = registry
+        return previous
+
+def get_location(name):
+    return get_location_registry().get_location(name)
+
+def invalidate_locations(name=None):
+    get_location_registry().invalidate(name)
@@ -1,11 +1,15 @@
+import numpy as np
+from utils.array_utils import round_array
 from database.commercial_rates_data import CommercialRatesData
 from models.rate import Rate
+from utils.instrumentation import timed, STAGE
 
 class PdbtRate(Rate):
+    @timed(STAGE)
     def __init__(self, location, end_year_month, pdbt_rate_data=None):
         super().__init__(location, end_year_month)
         self._pdbt_rate_data = pdbt_rate_data or CommercialRatesData('PDBT')
-        self._charges = self._get_charges()
+        self._charge_arrays = None
 
     def _get_charges(self):
         charges = self._pdbt_rate_data.get_charges(self._location.region_id, self._end_year_month)
@@ -27,4 +31,20 @@ class PdbtRate(Rate):
             consumption * charge["capacity"],
         ]
         total_cost = sum(cost_components) * self.IVA_RATE
-        return round(total_cost, 2)
\ No newline at end of file
+        return round(total_cost, 2)
+
+    def _get_charge_arrays(self):
+        if self._charge_arrays is None:
+            self._charge_arrays = {key: np.array([charge[key] for charge in self.charges], dtype=float)
+                                   for key in ['transmission', 'distribution', 'cenace', 'supplier', 'services', 'energy', 'capacity']}
+        return self._charge_arrays
+
+    def calculate_batch_monthly_payments(self, monthly_consumptions):
+        consumption = self._validate_batch_monthly_values(monthly_consumptions, "monthly_consumptions").astype(float)
+        charges = self._get_charge_arrays()
+        # Same term order as _calculate_payment so results match it exactly
+        total_cost = (consumption * charges["transmission"] + consumption * charges["distribution"] + consumption * charges["cenace"]
+                      + charges["supplier"] + consumption * charges["services"] + consumption * charges["energy"]
+                      + consumption * charges["capacity"])
+        payments = round_array(total_cost * self.IVA_RATE, 2)
+        return np.where(consumption == 0, charges["supplier"] * self.IVA_RATE, payments)
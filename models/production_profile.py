@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.array_utils import round_array
+from utils.date_utils import generate_days_in_month
+from utils.instrumentation import record, CACHE
+
+class ProductionProfile:
+    def __init__(self, solar_hours, days_in_month):
+        self._solar_hours = self._to_read_only_array(solar_hours) if solar_hours else None
+        self._days_in_month = self._to_read_only_array(days_in_month)
+
+    @staticmethod
+    def _to_read_only_array(values):
+        values = np.array(values, dtype=float)
+        values.setflags(write=False)
+        return values
+
+    @property
+    def available(self):
+        return self._solar_hours is not None
+
+    @property
+    def solar_hours(self):
+        return self._solar_hours
+
+    @property
+    def days_in_month(self):
+        return self._days_in_month
+
+    def per_kw(self, module_efficiency, system_efficiency):
+        return self.scale(1, module_efficiency, system_efficiency, decimals=None)
+
+    # Production is linear in the system size; terms are multiplied in PVSystem's order so rounding matches it exactly
+    def scale(self, system_size, module_efficiency, system_efficiency, decimals=2):
+        system_size = np.asarray(system_size, dtype=float)
+        if not self.available:
+            return np.zeros(system_size.shape + (12,))
+
+        production = system_size[..., None] * self._solar_hours * self._days_in_month * module_efficiency * system_efficiency
+        return production if decimals is None else round_array(production, decimals)
+
+class ProductionProfileCache:
+    # Tables the profiles are read from
+    SOURCE_TABLES = ('solar_hours', 'locations')
+    DEFAULT_MAXSIZE = 1024
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self._maxsize = self._validate_maxsize(maxsize)
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _validate_maxsize(self, value):
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError("Max size must be an integer greater than 0")
+        return value
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, key):
+        return key in self._profiles
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def cache_info(self):
+        return {"hits": self._hits, "misses": self._misses, "size": len(self._profiles), "maxsize": self._maxsize}
+
+    # The cache is shared by the whole process, the solar hours source keeps locations of the same name on different data apart
+    def get_profile(self, location, tilt_angle, end_year_month):
+        key = (location.name, tilt_angle, end_year_month, location.solar_hours_source)
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._hits += 1
+                self._profiles.move_to_end(key)
+            else:
+                self._misses += 1
+        record(CACHE, 'ProductionProfileCache', profile is not None)
+        if profile is not None:
+            return profile
+
+        profile = ProductionProfile(location.get_solar_hours(tilt_angle), generate_days_in_month(end_year_month))
+        # Missing solar hours are not cached so bad input can't push out useful profiles
+        if not profile.available:
+            return profile
+
+        with self._lock:
+            profile = self._profiles.setdefault(key, profile)
+            self._profiles.move_to_end(key)
+            while len(self._profiles) > self._maxsize:
+                self._profiles.popitem(last=False)
+            return profile
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._profiles.clear()
+            else:
+                for key in [key for key in self._profiles if key[0] == name]:
+                    del self._profiles[key]
+
+    def tables_changed(self, table_names):
+        if any(table in self.SOURCE_TABLES for table in table_names):
+            self.invalidate()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_production_profile_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProductionProfileCache()
+        return _default_cache
+
+def set_production_profile_cache(cache):
+    global _default_cache
+    with _default_cache_lock:
+        previous = _default_cache
+        _default_cache = cache
+        return previous
+
+def get_production_profile(location, tilt_angle, end_year_month):
+    return get_production_profile_cache().get_profile(location, tilt_angle, end_year_month)
+
+def invalidate_production_profiles(name=None):
+    get_production_profile_cache().invalidate(name)
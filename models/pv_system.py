@@ -1,15 +1,30 @@
+import numpy as np
 from models.pv_module import PVModule
 from models.location import Location
-from utils.date_utils import generate_days_in_month
+from models.production_profile import get_production_profile
+from utils.projections import project_lifetime_production
+from utils.cache_graph import CacheGraph
+from utils.hourly_profiles import DEFAULT_DAILY_SHAPE, validate_daily_shape, billing_hours, expand_daily_totals
 
 class PVSystem:
+    STAGES = {
+        'pv_module': [],
+        'pv_module_count': [],
+        'efficiency': [],
+        'location': [],
+        'installation_cost': ['pv_module', 'pv_module_count'],
+        'monthly_energy_production': ['pv_module', 'pv_module_count', 'efficiency', 'location'],
+        'hourly_energy_production': ['pv_module', 'pv_module_count', 'efficiency', 'location'],
+        'lifetime_production': ['pv_module', 'monthly_energy_production'],
+    }
+
     def __init__(self, pv_module, pv_module_count, efficiency, location):
         self._pv_module = self._validate_pv_module(pv_module)
         self._pv_module_count = self._validate_pv_module_count(pv_module_count)
         self._efficiency = self._validate_efficiency(efficiency)
         self._location = self._validate_location(location)
         self._system_size = self._calculate_system_size()
-        self._invalidate_caches()
+        self._cache = CacheGraph(self.STAGES, 'PVSystem')
 
     def _validate_pv_module(self, value):
         if not isinstance(value, PVModule):
@@ -39,11 +54,6 @@ class PVSystem:
     def _calculate_system_size(self):
         return self._pv_module.capacity * self._pv_module_count
 
-    def _invalidate_caches(self):
-        self._installation_cost_cache = None
-        self._monthly_energy_production_cache = None
-        self._lifetime_production_cache = None
-    
     @property
     def pv_module(self):
         return self._pv_module
@@ -52,7 +62,7 @@ class PVSystem:
     def pv_module(self, value):
         self._pv_module = self._validate_pv_module(value)
         self._system_size = self._calculate_system_size()
-        self._invalidate_caches()
+        self._cache.invalidate('pv_module')
 
     @property
     def pv_module_count(self):
@@ -62,7 +72,7 @@ class PVSystem:
     def pv_module_count(self, value):
         self._pv_module_count = self._validate_pv_module_count(value)
         self._system_size = self._calculate_system_size()
-        self._invalidate_caches()
+        self._cache.invalidate('pv_module_count')
 
     @property
     def efficiency(self):
@@ -71,7 +81,7 @@ class PVSystem:
     @efficiency.setter
     def efficiency(self, value):
         self._efficiency = self._validate_efficiency(value)
-        self._invalidate_caches()
+        self._cache.invalidate('efficiency')
     
     @property
     def location(self):
@@ -80,49 +90,48 @@ class PVSystem:
     @location.setter
     def location(self, value):
         self._location = self._validate_location(value)
-        self._invalidate_caches()
+        self._cache.invalidate('location')
 
     @property
     def system_size(self):
         return self._system_size
 
     def calculate_installation_cost(self, cost_per_kw=None):
-        if self._installation_cost_cache is not None and cost_per_kw is None:
-            return self._installation_cost_cache
-        
         default_cost_per_kw = 20000
         cost_per_kw = self._validate_cost_per_kw(cost_per_kw) if cost_per_kw else default_cost_per_kw
-        installation_cost = cost_per_kw * self._system_size
-        
-        self._installation_cost_cache = installation_cost
-        return installation_cost
+        return self._cache.get('installation_cost', lambda: cost_per_kw * self._system_size, cost_per_kw)
     
     def calculate_monthly_energy_production(self, end_year_month):
-        if self._monthly_energy_production_cache is not None:
-            return self._monthly_energy_production_cache
-        
-        annual_production = []
-        solar_hours = self._location.get_solar_hours(self._pv_module.tilt_angle)
-        days_in_month = generate_days_in_month(end_year_month)
-        
-        if solar_hours:
-            for month, hours in enumerate(solar_hours):
-                days = days_in_month[month]
-                monthly_production = round(self._system_size * hours * days * self._pv_module.efficiency * self._efficiency, 2)
-                annual_production.append(monthly_production)
-        
-        self._monthly_energy_production_cache = annual_production
-        return annual_production 
+        return self._cache.get('monthly_energy_production', lambda: self._calculate_monthly_energy_production(end_year_month), end_year_month)
+
+    # Scales the shared per-kW profile of the location, tilt and period, no query once another system has loaded it
+    def _calculate_monthly_energy_production(self, end_year_month):
+        profile = get_production_profile(self._location, self._pv_module.tilt_angle, end_year_month)
+        if not profile.available:
+            return []
+        return profile.scale(self._system_size, self._pv_module.efficiency, self._efficiency).tolist()
     
+    # Each day of a month produces the month's daily yield spread over the daily shape, one value per hour of the billing period
+    def calculate_hourly_energy_production(self, end_year_month, daily_shape=None):
+        daily_shape = DEFAULT_DAILY_SHAPE if daily_shape is None else validate_daily_shape(daily_shape)
+        return self._cache.get('hourly_energy_production', lambda: self._calculate_hourly_energy_production(end_year_month, daily_shape),
+                               (end_year_month, daily_shape.tobytes()))
+
+    def _calculate_hourly_energy_production(self, end_year_month, daily_shape):
+        profile = get_production_profile(self._location, self._pv_module.tilt_angle, end_year_month)
+        days_in_month = profile.days_in_month.astype(int)
+        if not profile.available:
+            hourly_production = np.zeros(billing_hours(days_in_month))
+        else:
+            daily_production = self._system_size * profile.solar_hours * self._pv_module.efficiency * self._efficiency
+            hourly_production = expand_daily_totals(daily_production, days_in_month, daily_shape)
+        # Shared through the cache, callers get a read-only view
+        hourly_production.setflags(write=False)
+        return hourly_production
+
     def calculate_lifetime_production(self, end_year_month):
-        if self._lifetime_production_cache is not None:
-            return self._lifetime_production_cache
-        
-        annual_production = sum(self.calculate_monthly_energy_production(end_year_month))
-        degradation_factor = 1 - self._pv_module.annual_degradation
-        lifetime_production = [round((annual_production * (degradation_factor ** year)), 2) for year in range(self._pv_module.lifespan)]
-        
-        self._lifetime_production_cache = lifetime_production
-        return lifetime_production
+        return self._cache.get('lifetime_production', lambda: self._calculate_lifetime_production(end_year_month), end_year_month)
 
-    
\ No newline at end of file
+    def _calculate_lifetime_production(self, end_year_month):
+        annual_production = sum(self.calculate_monthly_energy_production(end_year_month))
+        return project_lifetime_production(annual_production, self._pv_module.annual_degradation, self._pv_module.lifespan).tolist()
\ No newline at end of file
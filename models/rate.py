@@ -1,5 +1,6 @@
+import numpy as np
 from models.location import Location
-from utils.date_utils import generate_days_in_month
+from utils.year_month import days_in_window
 
 class Rate:
     IVA_RATE = 1.08
@@ -10,6 +11,16 @@ class Rate:
         self._charges = None
         self._needs_days_in_month = needs_days_in_month
 
+    # Charges are fetched on the first bill, constructing a rate doesn't query the database
+    @property
+    def charges(self):
+        if self._charges is None:
+            self._charges = self._get_charges()
+        return self._charges
+
+    def _get_charges(self):
+        raise NotImplementedError("Subclasses must implement this method")
+
     def _validate_location(self, value):
         if not isinstance(value, Location):
             raise ValueError("The location object must be an instance of Location")
@@ -51,9 +62,43 @@ class Rate:
         
         return parameters
     
+    def _validate_batch_monthly_values(self, values, name):
+        values = np.asarray(values)
+        if values.ndim not in (1, 2) or values.shape[-1] != 12:
+            raise ValueError(f"{name} must have 12 items per row")
+
+        if not np.issubdtype(values.dtype, np.number) or not (values >= 0).all():
+            raise ValueError(f"All items in {name} must be positive numbers")
+
+        return values
+
+    def _broadcast_batch_parameters(self, parameters, shape):
+        if not isinstance(parameters, dict):
+            raise ValueError("parameters must be a dictionary")
+
+        broadcasted = {}
+        for key, value in parameters.items():
+            value = self._validate_batch_monthly_values(value, key)
+            try:
+                broadcasted[key] = np.broadcast_to(value, shape)
+            except ValueError:
+                raise ValueError(f"{key} must have one row per consumption row")
+        return broadcasted
+
+    # Rows are billed independently, subclasses override this with vectorized billing
+    def calculate_batch_monthly_payments(self, monthly_consumptions, **kwargs):
+        monthly_consumptions = self._validate_batch_monthly_values(monthly_consumptions, "monthly_consumptions")
+        rows = np.atleast_2d(monthly_consumptions)
+        kwargs = self._broadcast_batch_parameters(kwargs, rows.shape)
+        payments = np.array([
+            self.calculate_monthly_payments(row.tolist(), **{k: v[i].tolist() for k, v in kwargs.items()})
+            for i, row in enumerate(rows)
+        ], dtype=float).reshape(rows.shape)
+        return payments.reshape(monthly_consumptions.shape)
+
     def calculate_monthly_payments(self, monthly_consumption, **kwargs):
         if self._needs_days_in_month:
-            days_in_months = generate_days_in_month(self._end_year_month)
+            days_in_months = days_in_window(self._end_year_month)
         
         monthly_consumption = self._validate_monthly_values(monthly_consumption, "monthly_consumption")
         kwargs = self._validate_monthly_parameters(kwargs)
@@ -61,12 +106,12 @@ class Rate:
         if self._needs_days_in_month:
             return [
                 self._calculate_payment(charge, consumption, days_in_month, **{k: v[i] for k, v in kwargs.items()})
-                for i, (charge, consumption, days_in_month) in enumerate(zip(self._charges, monthly_consumption, days_in_months))
+                for i, (charge, consumption, days_in_month) in enumerate(zip(self.charges, monthly_consumption, days_in_months))
             ]
         else:
             return [
                 self._calculate_payment(charge, consumption, **{k: v[i] for k, v in kwargs.items()})
-                for i, (charge, consumption) in enumerate(zip(self._charges, monthly_consumption))
+                for i, (charge, consumption) in enumerate(zip(self.charges, monthly_consumption))
             ]
 
     def _calculate_payment(self, charge, consumption, **kwargs):
@@ -0,0 +1,23 @@
+from models.pdbt_rate import PdbtRate
+from models.gdmto_rate import GdmtoRate
+from models.residential_rate import ResidentialRate
+
+RATE_TYPES = {
+    'PDBT': PdbtRate,
+    'GDMTO': GdmtoRate,
+    'RESIDENTIAL': ResidentialRate,
+}
+
+def validate_rate_type(rate_type):
+    if not isinstance(rate_type, str) or rate_type.upper() not in RATE_TYPES:
+        raise ValueError(f"Rate type must be one of {list(RATE_TYPES)}")
+    return rate_type.upper()
+
+# With a tariff snapshot the rate reads its charges from memory instead of the database
+def create_rate(rate_type, location, end_year_month, snapshot=None):
+    rate_type = validate_rate_type(rate_type)
+    if snapshot is None:
+        return RATE_TYPES[rate_type](location, end_year_month)
+    if rate_type == 'RESIDENTIAL':
+        return ResidentialRate(location, end_year_month, snapshot.residential_rates_data)
+    return RATE_TYPES[rate_type](location, end_year_month, snapshot.commercial_rates_data(rate_type))
@@ -1,6 +1,10 @@
+import numpy as np
+from utils.array_utils import round_array
 from database.residential_rates_data import ResidentialRatesData
-from utils.date_utils import generate_months, get_winter_start_month, extract_month
+from utils.date_utils import generate_months, get_winter_start_month
+from utils.year_month import YearMonth
 from models.rate import Rate
+from utils.instrumentation import timed, STAGE
 
 class ResidentialRate(Rate):
     # Dictionaries with energy charge tiers for each residential rate
@@ -16,6 +20,7 @@ class ResidentialRate(Rate):
                                   '1E': {'basic': 75, 'intermediate': 200},
                                   '1F': {'basic': 75, 'intermediate': 200}}
     
+    @timed(STAGE)
     def __init__(self, location, end_year_month, residential_rates_data=None):
         super().__init__(location, end_year_month)
         self._rate = self._location.residential_rate
@@ -24,7 +29,7 @@ class ResidentialRate(Rate):
         self._winter_start_month = get_winter_start_month(self._summer_start_month)
         self._winter_months = generate_months(self._winter_start_month)
         self._residential_rates_data = residential_rates_data or ResidentialRatesData()
-        self._charges = self._get_charges()
+        self._compile_charge_tiers()
     
     def _validate_summer_start_month(self, value):
         if not isinstance(value, int):
@@ -43,19 +48,69 @@ class ResidentialRate(Rate):
         charges = self._validate_charges(charges)
         return charges
     
+    def _sort_charge_tiers(self, charge_tiers):
+        if charge_tiers is None:
+            return None
+        return [(charge_tiers[tier], tier) for tier in sorted(charge_tiers.keys(), key=lambda k: charge_tiers[k])]
+
+    # Tier limits only depend on the season, they are sorted once per rate instead of on every bill
+    def _compile_charge_tiers(self):
+        summer_tiers = self._sort_charge_tiers(self.energy_summer_charge_tiers.get(self._rate))
+        winter_tiers = self._sort_charge_tiers(self.energy_winter_charge_tiers.get(self._rate))
+        self._month_charge_tiers = {month: summer_tiers if month in self._summer_months else winter_tiers for month in range(1, 13)}
+        self._has_charge_tiers = summer_tiers is not None and winter_tiers is not None
+        self._tier_table = None
+
+    def _get_charge_tiers(self, billing_period):
+        charge_tiers = self._month_charge_tiers[YearMonth.parse(billing_period).month]
+        if charge_tiers is None:
+            raise ValueError(f"Energy charge tiers are not defined for rate {self._rate}")
+        return charge_tiers
+
+    # The tier table needs the charges, it is built on the first batch bill
+    def _get_tier_table(self):
+        if self._tier_table is None and self._has_charge_tiers:
+            self._tier_table = self._compile_tier_table()
+        return self._tier_table
+
+    # Per billing month tier limits (padded with inf) and prices, 'excess' is the price above the last limit
+    def _compile_tier_table(self):
+        tier_count = max(len(self._get_charge_tiers(charge['billing_period'])) for charge in self.charges)
+        boundaries = np.full((12, tier_count), np.inf)
+        prices = np.empty((12, tier_count + 1))
+        for month, charge in enumerate(self.charges):
+            charge_tiers = self._get_charge_tiers(charge['billing_period'])
+            month_prices = [charge[tier] for _, tier in charge_tiers] + [charge['excess']] * (tier_count + 1 - len(charge_tiers))
+            boundaries[month, :len(charge_tiers)] = [limit for limit, _ in charge_tiers]
+            prices[month] = month_prices
+        return boundaries, prices
+
     def _calculate_payment(self, charge, consumption):
         # When consumption is less than 25 kWh CFE charges the equivalent of 25 kWh consumption as fix charge
         consumption = max(consumption, 25)
-        current_month = extract_month(charge['billing_period'])
-        is_summer = current_month in self._summer_months
-        charge_tiers = self.energy_summer_charge_tiers[self._rate] if is_summer else self.energy_winter_charge_tiers[self._rate]
 
-        for tier in sorted(charge_tiers.keys(), key=lambda k: charge_tiers[k]):
-            if consumption <= charge_tiers[tier]:
+        for limit, tier in self._get_charge_tiers(charge['billing_period']):
+            if consumption <= limit:
                 payment = consumption * charge[tier]
                 break
         else:
             payment = consumption * charge['excess']
 
         payment = round(payment * self.IVA_RATE, 2)
-        return payment
\ No newline at end of file
+        return payment
+
+    def calculate_batch_monthly_payments(self, monthly_consumptions):
+        monthly_consumptions = self._validate_batch_monthly_values(monthly_consumptions, "monthly_consumptions")
+        tier_table = self._get_tier_table()
+        if tier_table is None:
+            raise ValueError(f"Energy charge tiers are not defined for rate {self._rate}")
+        tier_boundaries, tier_prices = tier_table
+
+        consumptions = np.maximum(np.atleast_2d(monthly_consumptions).astype(float), 25)
+        payments = np.empty(consumptions.shape)
+        for month in range(12):
+            tiers = np.searchsorted(tier_boundaries[month], consumptions[:, month], side='left')
+            payments[:, month] = consumptions[:, month] * tier_prices[month][tiers]
+
+        payments = round_array(payments * self.IVA_RATE, 2)
+        return payments.reshape(monthly_consumptions.shape)
@@ -0,0 +1,2 @@
+from .quote_engine import QuoteEngine, normalize_scenario
+from .server import QuotingServer, ServiceMetrics
\ No newline at end of file
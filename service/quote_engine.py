@@ -0,0 +1,105 @@
+import math
+import threading
+from time import perf_counter
+from database.tariff_snapshot import TariffSnapshot
+from models.location_registry import LocationRegistry
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.production_profile import get_production_profile, invalidate_production_profiles
+from models.rate_factory import create_rate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.portfolio_runner import normalize_customer
+import config
+
+# Scenarios use the same fields as portfolio records, plus the optional cost_per_kw and annual_inflation of the quote
+def normalize_scenario(payload, scenario_number=1):
+    if not isinstance(payload, dict):
+        raise ValueError("Scenario must be a JSON object")
+    scenario = normalize_customer(payload, scenario_number)
+    try:
+        scenario["cost_per_kw"] = float(payload["cost_per_kw"]) if payload.get("cost_per_kw") is not None else None
+        scenario["annual_inflation"] = float(payload.get("annual_inflation", 0.05))
+    except TypeError as e:
+        raise ValueError(str(e))
+    return scenario
+
+# JSON has no NaN or infinity, a report holding one can't be sent
+def _is_finite(value):
+    if isinstance(value, dict):
+        return all(_is_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_is_finite(item) for item in value)
+    return not isinstance(value, float) or math.isfinite(value)
+
+# Tariffs and solar hours are read once into memory, locations and rates are kept for every later quote
+class QuoteEngine:
+    def __init__(self, db_path=config.DATABASE_PATH):
+        self._snapshot = TariffSnapshot(db_path)
+        self._locations = LocationRegistry(self._snapshot.solar_hours_data, self._snapshot.location_data)
+        self._tariffs = {}
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def reload(self):
+        self._snapshot.reload()
+        self._locations.invalidate()
+        invalidate_production_profiles()
+        with self._lock:
+            self._tariffs.clear()
+
+    def _get_tariff(self, city, rate_type, end_year_month):
+        key = (city, rate_type, end_year_month)
+        tariff = self._tariffs.get(key)
+        if tariff is not None:
+            return tariff
+
+        location = self._locations.get_location(city)
+        if location.region_id is None:
+            raise ValueError(f"Location {city} is not available")
+        rate = create_rate(rate_type, location, end_year_month, self._snapshot)
+        # Charges are loaded before caching so a rate without charges fails every time instead of being kept
+        rate.charges
+        with self._lock:
+            return self._tariffs.setdefault(key, (location, rate))
+
+    def quote(self, scenario):
+        location, rate = self._get_tariff(scenario["city"], scenario["rate"], scenario["end_year_month"])
+        pv_module = PVModule(scenario["pv_module_capacity"], scenario["tilt_angle"], scenario["module_efficiency"],
+                             scenario["lifespan"], scenario["annual_degradation"])
+        pv_system = PVSystem(pv_module, scenario["pv_module_count"], scenario["system_efficiency"], location)
+        if not get_production_profile(location, pv_module.tilt_angle, scenario["end_year_month"]).available:
+            raise ValueError(f"Solar hours data is not available for a tilt angle of {pv_module.tilt_angle}")
+
+        extra_params = {field: scenario[field] for field in ['demand', 'power_factor'] if field in scenario}
+        calculator = SolarSavingsCalculator(rate, pv_system, scenario["consumption"], **extra_params)
+        report = calculator.generate_report(scenario["cost_per_kw"], scenario["annual_inflation"]).to_dict()
+        if not _is_finite(report):
+            raise ValueError("Quote has values that are not finite")
+        return {
+            "customer_id": scenario["customer_id"],
+            "city": scenario["city"],
+            "rate": scenario["rate"],
+            "end_year_month": scenario["end_year_month"],
+            "report": report,
+        }
+
+# One engine per worker process, built by the pool initializer so the first request doesn't pay for loading it
+_engine = None
+
+def init_worker(db_path):
+    global _engine
+    _engine = QuoteEngine(db_path)
+
+def worker_ready():
+    return _engine is not None
+
+# Runs in a worker, the quote time is returned so the service can tell queueing from computing
+def quote_in_worker(scenario):
+    start = perf_counter()
+    try:
+        return _engine.quote(scenario), None, perf_counter() - start
+    except ValueError as e:
+        return None, str(e), perf_counter() - start
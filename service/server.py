@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from time import monotonic, perf_counter
+from utils.instrumentation import StatsSink, HistogramSink, STAGE
+from service.quote_engine import normalize_scenario, init_worker, quote_in_worker, worker_ready
+import config
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_HEADERS = 100
+# Idle keep-alive connections and slow clients are dropped after this many seconds
+READ_TIMEOUT = 30
+THROUGHPUT_WINDOW = 60
+
+class HTTPError(ValueError):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ServiceMetrics:
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self._started = monotonic()
+        self._stats = StatsSink()
+        self._latency = HistogramSink()
+        self._responses = {}
+        self._recent = deque()
+
+    def _discard_old(self, now):
+        while self._recent and self._recent[0] < now - THROUGHPUT_WINDOW:
+            self._recent.popleft()
+
+    def record_request(self, endpoint, status, seconds):
+        now = monotonic()
+        self._stats.record(STAGE, endpoint, seconds)
+        self._latency.record(STAGE, endpoint, seconds)
+        self._responses[status] = self._responses.get(status, 0) + 1
+        self._recent.append(now)
+        self._discard_old(now)
+
+    # Time spent computing a quote in a worker, the rest of the /quote latency is parsing and queueing
+    def record_quote(self, seconds):
+        self._stats.record(STAGE, 'quote.compute', seconds)
+        self._latency.record(STAGE, 'quote.compute', seconds)
+
+    def snapshot(self):
+        now = monotonic()
+        self._discard_old(now)
+        uptime = now - self._started
+        stats = self._stats.stats()["stages"]
+        requests = sum(self._responses.values())
+        return {
+            "uptime": uptime,
+            "requests": requests,
+            "throughput": requests / uptime if uptime > 0 else 0,
+            "recent_throughput": len(self._recent) / min(uptime, THROUGHPUT_WINDOW) if uptime > 0 else 0,
+            "responses": {str(status): count for status, count in sorted(self._responses.items())},
+            "latency": {name: dict(timing, **{f"p{percentile}": self._latency.percentile(STAGE, name, percentile)
+                                              for percentile in self.PERCENTILES})
+                        for name, timing in stats.items()},
+        }
+
+# Quotes run in a process pool whose workers keep their own warm QuoteEngine, requests past max_pending are rejected
+class QuotingServer:
+    def __init__(self, db_path=config.DATABASE_PATH, workers=None, max_pending=None):
+        self._db_path = db_path
+        self._workers = self._validate_positive_int(workers if workers is not None else os.cpu_count() or 1, "Workers")
+        self._max_pending = self._validate_positive_int(max_pending if max_pending is not None else 4 * self._workers, "Max pending")
+        self._executor = None
+        self._server = None
+        self._pending = 0
+        self._connections = {}
+        self._metrics = ServiceMetrics()
+        self._routes = {
+            '/quote': ('POST', self._quote),
+            '/metrics': ('GET', self._get_metrics),
+            '/health': ('GET', self._health),
+        }
+
+    def _validate_positive_int(self, value, name):
+        if not (isinstance(value, int) and value > 0):
+            raise ValueError(f"{name} must be an integer greater than 0")
+        return value
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def max_pending(self):
+        return self._max_pending
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1] if self._server else None
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    # Every worker loads its tariff snapshot before the server accepts requests
+    async def start(self, host='127.0.0.1', port=8080):
+        loop = asyncio.get_running_loop()
+        self._executor = ProcessPoolExecutor(max_workers=self._workers, initializer=init_worker, initargs=(self._db_path,))
+        await asyncio.gather(*[loop.run_in_executor(self._executor, worker_ready) for _ in range(self._workers)])
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    # Open connections are closed so their handlers see the end of stream and finish the request they are on
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def handle(self, method, path, body=b''):
+        start = perf_counter()
+        route = self._routes.get(path.split('?', 1)[0])
+        try:
+            if route is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint at {path}")
+            if method != route[0]:
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only accepts {route[0]}")
+            status, payload = await route[1](body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        # A crashed worker or a bug must not take the connection down without an answer
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+        self._metrics.record_request(path if route else 'unknown', int(status), perf_counter() - start)
+        return int(status), payload
+
+    async def _quote(self, body):
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        try:
+            scenario = normalize_scenario(payload)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        if self._pending >= self._max_pending:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many pending quotes, retry later")
+
+        self._pending += 1
+        try:
+            result, error, seconds = await asyncio.get_running_loop().run_in_executor(self._executor, quote_in_worker, scenario)
+        finally:
+            self._pending -= 1
+        self._metrics.record_quote(seconds)
+        if error is not None:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, error)
+        return HTTPStatus.OK, result
+
+    async def _get_metrics(self, body):
+        return HTTPStatus.OK, dict(self._metrics.snapshot(), pending=self._pending, workers=self._workers, max_pending=self._max_pending)
+
+    async def _health(self, body):
+        return HTTPStatus.OK, {"status": "ok", "workers": self._workers, "pending": self._pending}
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+            name, separator, value = line.decode('latin-1').partition(':')
+            if not separator:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed header")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length must be an integer")
+        if not 0 <= length <= MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body must be at most {MAX_BODY_SIZE} bytes")
+        body = await reader.readexactly(length) if length else b''
+        keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+        return method, path, body, keep_alive
+
+    # Payloads are strict JSON, one with NaN or infinity is answered with an error instead
+    def _response(self, status, payload, keep_alive):
+        try:
+            body = json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+        except ValueError:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            body = json.dumps({"error": "Response has values that are not finite"}).encode()
+        headers = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+    # Requests on a connection are answered in order until the client closes it or asks to
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+                except HTTPError as e:
+                    writer.write(self._response(e.status, {"error": str(e)}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await self.handle(method, path, body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        # Lines longer than the stream limit raise ValueError, the connection is dropped like a timed out one
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, ConnectionError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+async def serve(host, port, db_path=config.DATABASE_PATH, workers=None, max_pending=None):
+    server = QuotingServer(db_path, workers, max_pending)
+    await server.start(host, port)
+    print(f"Serving quotes on http://{host}:{server.port} with {server.workers} workers")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve solar savings quotes over HTTP: POST /quote, GET /metrics, GET /health")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db-path", default=config.DATABASE_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-pending", type=int, default=None, help="Quotes queued or running before new ones get a 503, 4 per worker by default")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.db_path, args.workers, args.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import unittest
+import numpy as np
+from utils.array_utils import round_array
+
+class TestArrayUtils(unittest.TestCase):
+    def test_round_array_matches_round(self):
+        values = [27.5 * 0.05 * 1.08, 1.005, 2.675, 0.125, -1.485, 1234.5678, 0, 0.015, 1e-9]
+        values += [i * 0.001 for i in range(3000)]
+        self.assertEqual(round_array(values).tolist(), [round(value, 2) for value in values])
+
+    def test_round_array_keeps_shape(self):
+        values = np.arange(24, dtype=float).reshape(2, 12) / 7
+        self.assertEqual(round_array(values, 3).shape, (2, 12))
+
+    def test_round_array_non_finite(self):
+        rounded = round_array([np.inf, np.nan, 1.234])
+        self.assertTrue(np.isinf(rounded[0]))
+        self.assertTrue(np.isnan(rounded[1]))
+        self.assertEqual(rounded[2], 1.23)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from database.commercial_rates_data import CommercialRatesData
+from database.residential_rates_data import ResidentialRatesData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from models.residential_rate import ResidentialRate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.batch_calculator import BatchSolarSavingsCalculator, sequential_sum
+
+class TestBatchSolarSavingsCalculator(unittest.TestCase):
+    def setUp(self):
+        self.end_year_month = '2024-12'
+        self.location = Mock(spec=Location)
+        self.location.region_id = 1
+        self.location.residential_rate = '1F'
+        self.location.summer_start_month = 5
+        self.location.get_solar_hours.return_value = [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+
+        pdbt_rate_data = Mock(spec=CommercialRatesData)
+        pdbt_rate_data.get_charges.return_value = [{'transmission': 0.1758, 'distribution': 0.734 + i * 0.01, 'cenace': 0.0074,
+                                                    'supplier': 53.58, 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for i in range(12)]
+        self.pdbt_rate = PdbtRate(self.location, self.end_year_month, pdbt_rate_data)
+
+        residential_rates_data = Mock(spec=ResidentialRatesData)
+        residential_rates_data.get_charges.return_value = [
+            {'billing_period': f'2024-{month:02}', 'basic': 0.7, 'low_intermediate': 0.9, 'intermediate': 1.1,
+             'high_intermediate': 1.3, 'excess': 3.6} for month in range(1, 13)
+        ]
+        self.residential_rate = ResidentialRate(self.location, self.end_year_month, residential_rates_data)
+
+        self.pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        self.pv_system = PVSystem(self.pv_module, 4, 0.85, self.location)
+        self.consumptions = np.array([
+            [350, 320, 300, 380, 520, 700, 900, 950, 800, 600, 400, 360],
+            [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250],
+            [0] * 12,
+            [90, 80, 75, 70, 85, 100, 140, 150, 130, 100, 90, 85],
+            [900, 700, 150, 100, 80, 90, 110, 100, 90, 80, 70, 60],
+        ])
+        self.module_counts = np.array([4, 10, 2, 12, 3])
+
+    def _scalar_calculator(self, rate, consumption, module_count):
+        pv_system = PVSystem(self.pv_module, int(module_count), 0.85, self.location)
+        return SolarSavingsCalculator(rate, pv_system, list(consumption))
+
+    def _assert_matches_scalar(self, rate, consumptions=None, module_counts=None):
+        consumptions = self.consumptions if consumptions is None else consumptions
+        module_counts = self.module_counts if module_counts is None else module_counts
+        batch = BatchSolarSavingsCalculator.from_pv_system(rate, self.pv_system, consumptions, module_counts)
+        self.assertEqual(len(batch), len(consumptions))
+        offsets = batch.calculate_offset()
+        new_consumption = batch.calculate_new_monthly_consumption()
+        energy_savings = batch.calculate_yearly_energy_savings(cumulative=True)
+        current_payments = batch.calculate_current_monthly_payment()
+        new_payments = batch.calculate_new_monthly_payment()
+        payments_savings = batch.calculate_yearly_payments_savings()
+        cash_flows = batch.calculate_cash_flow(cumulative=True)
+        roi = batch.calculate_roi()
+        payback = batch.calculate_payback_period()
+
+        for i, (consumption, module_count) in enumerate(zip(consumptions, module_counts)):
+            calculator = self._scalar_calculator(rate, consumption, module_count)
+            self.assertEqual(offsets[i], calculator.calculate_offset())
+            self.assertEqual(new_consumption[i].tolist(), calculator.calculate_new_monthly_consumption())
+            self.assertEqual(energy_savings[i].tolist(), calculator.calculate_yearly_energy_savings(cumulative=True))
+            self.assertEqual(current_payments[i].tolist(), calculator.calculate_current_monthly_payment())
+            self.assertEqual(new_payments[i].tolist(), calculator.calculate_new_monthly_payment())
+            if sum(consumption) == 0:
+                continue
+            self.assertEqual(payments_savings[i].tolist(), calculator.calculate_yearly_payments_savings())
+            self.assertEqual(cash_flows[i].tolist(), calculator.calculate_cash_flow(cumulative=True))
+            self.assertEqual(roi[i], calculator.calculate_roi())
+            expected_payback = calculator.calculate_payback_period()
+            if expected_payback is None:
+                self.assertTrue(np.isnan(payback[i]))
+            else:
+                self.assertEqual(payback[i], expected_payback)
+
+    def test_matches_scalar_pdbt(self):
+        self._assert_matches_scalar(self.pdbt_rate)
+
+    def test_matches_scalar_residential(self):
+        self._assert_matches_scalar(self.residential_rate)
+
+    # Systems around offset 1 pay nothing for energy in year 1 but draw from the grid again as they degrade
+    def test_matches_scalar_across_full_offset(self):
+        module_counts = np.arange(20, 31)
+        consumptions = np.repeat(self.consumptions[1:2], len(module_counts), axis=0)
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.residential_rate, self.pv_system, consumptions, module_counts)
+        offsets = batch.calculate_offset()
+        self.assertTrue((offsets < 1).any() and (offsets > 1).any())
+        self.assertTrue(np.isfinite(batch.calculate_cash_flow()).all())
+        self.assertTrue(np.isfinite(batch.calculate_roi()).all())
+        self._assert_matches_scalar(self.residential_rate, consumptions, module_counts)
+        self._assert_matches_scalar(self.pdbt_rate, consumptions, module_counts)
+
+    def test_pdbt_batch_payments(self):
+        payments = self.pdbt_rate.calculate_batch_monthly_payments(self.consumptions)
+        for consumption, payment in zip(self.consumptions, payments):
+            self.assertEqual(payment.tolist(), self.pdbt_rate.calculate_monthly_payments(consumption.tolist()))
+
+    def test_broadcast_single_profile(self):
+        module_counts = np.arange(1, 21)
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.pdbt_rate, self.pv_system, self.consumptions[1], module_counts)
+        self.assertEqual(len(batch), 20)
+        self.assertEqual(batch.calculate_cash_flow().shape, (20, self.pv_module.lifespan + 1))
+        self.assertTrue((np.diff(batch.calculate_offset()) >= 0).all())
+
+    def test_environmental_impact(self):
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.pdbt_rate, self.pv_system, self.consumptions[:2], self.module_counts[:2])
+        impact = batch.calculate_environmental_impact()
+        for i in range(2):
+            calculator = self._scalar_calculator(self.pdbt_rate, self.consumptions[i], self.module_counts[i])
+            expected_impact = calculator.calculate_environmental_impact()
+            self.assertEqual(impact["kg_co2_saved"][i], expected_impact["kg_co2_saved"])
+            self.assertEqual(impact["trees_planted"][i], expected_impact["trees_planted"])
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            BatchSolarSavingsCalculator.from_pv_system(self.pdbt_rate, self.pv_system, self.consumptions, [0, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            BatchSolarSavingsCalculator.from_pv_system(self.pdbt_rate, self.pv_system, self.consumptions, [1, 2])
+        with self.assertRaises(ValueError):
+            BatchSolarSavingsCalculator.from_pv_system(self.pdbt_rate, self.pv_system, [[100] * 11])
+        with self.assertRaises(ValueError):
+            BatchSolarSavingsCalculator.from_pv_system(Mock(), self.pv_system, self.consumptions)
+
+    def test_sequential_sum(self):
+        values = [0.1, 0.2, 0.3, 1e16, -1e16, 0.7]
+        self.assertEqual(sequential_sum(values), sum(values))
+
+if __name__ == '__main__':
+    unittest.main()
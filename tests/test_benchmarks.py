@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from benchmarks.cases import CASES, BenchmarkContext
+from benchmarks.fixture import build_fixture, generate_customers
+from benchmarks.run_benchmarks import CALIBRATION, compare, format_report, load_baselines, save_baselines, select_cases, time_cases
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cases_run_against_fixture(self):
+        context = BenchmarkContext(build_fixture(self.directory.name), self.directory.name)
+        try:
+            for name, case in CASES.items():
+                with self.subTest(case=name):
+                    case(context)()
+            self.assertEqual(CASES['portfolio_runner_2k'](context)(), {"quoted": 2000, "failed": 0, "skipped": 0})
+        finally:
+            context.close()
+
+    def test_generate_customers(self):
+        customers = generate_customers(50, seed=1)
+        self.assertEqual(len(customers), 50)
+        self.assertEqual(customers, generate_customers(50, seed=1))
+        for customer in customers:
+            self.assertEqual(len(customer["consumption"]), 12)
+            self.assertEqual("demand" in customer, customer["rate"] == 'GDMTO')
+
+    def test_compare(self):
+        results = {"same": 1.0, "slower": 1.5, "faster": 0.5, "added": 2.0}
+        report = compare(results, {"same": 1.1, "slower": 1.0, "faster": 1.0}, threshold=0.25)
+        self.assertEqual([row["status"] for row in report], ["ok", "regression", "faster", "new"])
+        self.assertEqual(report[1]["ratio"], 1.5)
+        self.assertIn("1 regressions above 25% of baseline", format_report(report, 0.25))
+        with self.assertRaises(ValueError):
+            compare(results, {}, threshold=-1)
+
+    def test_compare_with_calibration_and_noise(self):
+        baselines = {"scaled": 1.0, "noisy": 1.0, "slower": 1.0, CALIBRATION: 2.0}
+        report = compare({"scaled": 1.4, "noisy": 1.4, "slower": 2.0, CALIBRATION: 2.2}, baselines, threshold=0.25, noise={"noisy": 0.4})
+        self.assertEqual([row["status"] for row in report], ["regression", "ok", "regression", "calibration"])
+        self.assertAlmostEqual(report[0]["ratio"], 1.4 / 1.1)
+        self.assertAlmostEqual(report[3]["ratio"], 1.1)
+
+        report = compare({"scaled": 1.4, CALIBRATION: 2.8}, baselines, threshold=0.25)
+        self.assertEqual(report[0]["status"], "ok")
+
+    def test_time_cases(self):
+        results, noise = time_cases({"sum": lambda: sum(range(100)), CALIBRATION: lambda: sum(range(200))}, repeat=3)
+        self.assertEqual(set(results), {"sum", CALIBRATION})
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+        self.assertTrue(all(value >= 0 for value in noise.values()))
+
+    def test_baselines_round_trip(self):
+        path = os.path.join(self.directory.name, "baselines.json")
+        self.assertEqual(load_baselines(path), {})
+        save_baselines({"b": 2.0, "a": 1.0}, path)
+        self.assertEqual(load_baselines(path), {"a": 1.0, "b": 2.0})
+
+    def test_select_cases(self):
+        self.assertEqual(select_cases(), list(CASES))
+        self.assertEqual(select_cases(['pdbt_monthly_payments']), ['pdbt_monthly_payments'])
+        with self.assertRaises(ValueError):
+            select_cases(['unknown'])
+
+if __name__ == '__main__':
+    unittest.main()
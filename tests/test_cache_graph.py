@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import Mock
+from utils.cache_graph import CacheGraph
+
+class TestCacheGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = CacheGraph({
+            'a': [],
+            'b': [],
+            'c': ['a'],
+            'd': ['c', 'b'],
+            'e': ['b'],
+        })
+
+    def test_undefined_dependency(self):
+        with self.assertRaises(ValueError):
+            CacheGraph({'a': ['missing']})
+
+    def test_undefined_stage(self):
+        with self.assertRaises(ValueError):
+            self.graph.get('missing', lambda: 1)
+
+    def test_get_is_cached_per_key(self):
+        calculate = Mock(return_value=10)
+        self.assertEqual(self.graph.get('c', calculate, 0.05), 10)
+        self.assertEqual(self.graph.get('c', calculate, 0.05), 10)
+        self.assertEqual(calculate.call_count, 1)
+        self.graph.get('c', calculate, 0.03)
+        self.assertEqual(calculate.call_count, 2)
+        self.assertTrue(self.graph.is_cached('c', 0.05))
+        self.assertFalse(self.graph.is_cached('c'))
+
+    def test_downstream(self):
+        self.assertEqual(self.graph.downstream('a'), {'c', 'd'})
+        self.assertEqual(self.graph.downstream('b'), {'d', 'e'})
+        self.assertEqual(self.graph.downstream('d'), set())
+
+    def test_invalidate_only_downstream(self):
+        for stage in ['c', 'd', 'e']:
+            self.graph.get(stage, lambda: stage)
+        self.graph.invalidate('a')
+        self.assertFalse(self.graph.is_cached('c'))
+        self.assertFalse(self.graph.is_cached('d'))
+        self.assertTrue(self.graph.is_cached('e'))
+
+    def test_invalidate_all(self):
+        for stage in ['c', 'd', 'e']:
+            self.graph.get(stage, lambda: stage)
+        self.graph.invalidate()
+        self.assertFalse(any(self.graph.is_cached(stage) for stage in ['c', 'd', 'e']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import unittest
+from database.connection_manager import ConnectionManager, get_connection_manager, set_connection_manager
+from database.location_data import LocationData
+
+class TestConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.sqlite3')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE regions (region_id INTEGER PRIMARY KEY, region_name TEXT NOT NULL)")
+            conn.execute("""CREATE TABLE locations (location_id INTEGER PRIMARY KEY, city TEXT NOT NULL, residential_rate TEXT NOT NULL,
+                            summer_start_month INTEGER NOT NULL, region_id TEXT NOT NULL)""")
+            conn.execute("INSERT INTO regions (region_name) VALUES ('Baja California')")
+            conn.execute("INSERT INTO locations (city, residential_rate, summer_start_month, region_id) VALUES ('Mexicali', '1F', 5, '1')")
+        conn.close()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_invalid_pool_size(self):
+        with self.assertRaises(ValueError):
+            ConnectionManager(self.db_path, pool_size=0)
+
+    def test_connections_are_reused(self):
+        manager = ConnectionManager(self.db_path, pool_size=2)
+        with manager.connection() as first_conn:
+            pass
+        with manager.connection() as second_conn:
+            pass
+        self.assertIs(first_conn, second_conn)
+        manager.close()
+
+    def test_pool_size_limits_open_connections(self):
+        manager = ConnectionManager(self.db_path, pool_size=1, timeout=0.01)
+        with manager.connection():
+            with self.assertRaises(sqlite3.OperationalError):
+                with manager.connection():
+                    pass
+        manager.close()
+
+    def test_connections_shared_across_threads(self):
+        manager = ConnectionManager(self.db_path, pool_size=2)
+        results = []
+
+        def query():
+            with manager.connection() as conn:
+                results.append(conn.execute("SELECT city FROM locations").fetchone()[0])
+
+        threads = [threading.Thread(target=query) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['Mexicali'] * 8)
+        manager.close()
+
+    def test_read_only_mode(self):
+        manager = ConnectionManager(self.db_path, read_only=True)
+        with self.assertRaises(sqlite3.OperationalError):
+            with manager.connection() as conn:
+                conn.execute("DELETE FROM locations")
+        manager.close()
+
+        missing_db_path = os.path.join(self.temp_dir.name, 'missing.sqlite3')
+        location_data = LocationData(connection_manager=ConnectionManager(missing_db_path, read_only=True))
+        self.assertIsNone(location_data.get_region('Mexicali'))
+        self.assertFalse(os.path.exists(missing_db_path))
+
+    def test_shared_manager_per_db_path(self):
+        self.assertIs(get_connection_manager(self.db_path), get_connection_manager(self.db_path))
+        self.assertIs(LocationData(self.db_path)._connection_manager, get_connection_manager(self.db_path))
+
+    def test_inject_connection_manager(self):
+        manager = ConnectionManager(self.db_path, pool_size=1)
+        previous = set_connection_manager(manager)
+        try:
+            location_data = LocationData(self.db_path)
+            self.assertIs(location_data._connection_manager, manager)
+            self.assertEqual(location_data.get_region('Mexicali'), 'Baja California')
+        finally:
+            if previous is not None:
+                set_connection_manager(previous)
+            manager.close()
+
+    def test_pickle_rebuilds_pool(self):
+        manager = ConnectionManager(self.db_path, pool_size=3, read_only=True)
+        with manager.connection():
+            pass
+        restored = pickle.loads(pickle.dumps(manager))
+        self.assertEqual(restored.pool_size, 3)
+        self.assertTrue(restored.read_only)
+        with restored.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0], 1)
+        manager.close()
+        restored.close()
+
+if __name__ == '__main__':
+    unittest.main()
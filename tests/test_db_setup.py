@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from database.db_setup import create_tables, migrate, get_schema_version, populate_tables, setup_database, upsert_sql, MIGRATIONS
+
+class TestDbSetup(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        create_tables(self.conn)
+        self.latest_version = MIGRATIONS[-1][0]
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _index_names(self):
+        cursor = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+        return {row[0] for row in cursor}
+
+    def test_migrate_new_database(self):
+        self.assertEqual(get_schema_version(self.conn), 0)
+        self.assertEqual(migrate(self.conn), self.latest_version)
+        self.assertEqual(get_schema_version(self.conn), self.latest_version)
+        self.assertIn('idx_solar_hours_location_tilt_month', self._index_names())
+        self.assertIn('idx_locations_city', self._index_names())
+
+    def test_migrate_is_idempotent(self):
+        migrate(self.conn)
+        indexes = self._index_names()
+        self.assertEqual(migrate(self.conn), self.latest_version)
+        self.assertEqual(self._index_names(), indexes)
+
+    def test_migrate_existing_data(self):
+        self.conn.execute("INSERT INTO locations (city, residential_rate, summer_start_month, region_id) VALUES ('Mexicali', '1F', 5, 1)")
+        self.conn.execute("INSERT INTO solar_hours (location_id, tilt_angle, month, solar_hours) VALUES (1, 32, 1, 5.5)")
+        self.conn.commit()
+        migrate(self.conn)
+        result = self.conn.execute("SELECT solar_hours FROM solar_hours WHERE location_id = 1 AND tilt_angle = 32").fetchall()
+        self.assertEqual(result, [(5.5,)])
+
+    def test_solar_hours_query_uses_indexes(self):
+        migrate(self.conn)
+        plan = self.conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT solar_hours
+            FROM solar_hours
+            JOIN locations ON solar_hours.location_id = locations.location_id
+            WHERE city = ?
+            AND tilt_angle = ?
+            ORDER BY month
+        """, ('Mexicali', 32)).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        self.assertIn('idx_locations_city', details)
+        self.assertIn('idx_solar_hours_location_tilt_month', details)
+
+class TestIncrementalPopulate(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.regions_csv = self._write_csv('regions.csv', '\ufeffregion_name\nBaja California\nBaja California Sur\n')
+        self.locations_csv = self._write_csv('locations.csv', 'city,residential_rate,summer_start_month,region_id\nMexicali,1F,5,1\n')
+        self.solar_hours_csv = self._write_csv('solar_hours.csv', 'location_id,tilt_angle,month,solar_hours\n1,32,1,5.5\n1,32,2,6.0\n')
+        self.data_sources = [
+            ('regions', self.regions_csv, upsert_sql('regions', ['region_name'], ['region_name'])),
+            ('locations', self.locations_csv,
+             upsert_sql('locations', ['city', 'residential_rate', 'summer_start_month', 'region_id'], ['city'])),
+            ('solar_hours', self.solar_hours_csv,
+             upsert_sql('solar_hours', ['location_id', 'tilt_angle', 'month', 'solar_hours'], ['location_id', 'tilt_angle', 'month'])),
+        ]
+        self.conn = sqlite3.connect(':memory:')
+        create_tables(self.conn)
+        migrate(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def _write_csv(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def _count(self, table_name):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+    def test_upsert_sql(self):
+        self.assertEqual(upsert_sql('regions', ['region_name'], ['region_name']),
+                         "INSERT INTO regions (region_name) VALUES (?) ON CONFLICT (region_name) DO NOTHING")
+        self.assertEqual(upsert_sql('locations', ['city', 'region_id'], ['city']),
+                         "INSERT INTO locations (city, region_id) VALUES (?, ?) ON CONFLICT (city) DO UPDATE SET region_id = excluded.region_id")
+
+    def test_populate_is_idempotent(self):
+        self.assertEqual(populate_tables(self.conn, self.data_sources), ['regions', 'locations', 'solar_hours'])
+        self.assertEqual(populate_tables(self.conn, self.data_sources), [])
+        self.assertEqual(self._count('regions'), 2)
+        self.assertEqual(self._count('locations'), 1)
+        self.assertEqual(self._count('solar_hours'), 2)
+
+    def test_only_changed_sources_are_loaded(self):
+        populate_tables(self.conn, self.data_sources)
+        self._write_csv('solar_hours.csv', 'location_id,tilt_angle,month,solar_hours\n1,32,1,5.7\n1,32,2,6.0\n1,32,3,6.5\n')
+        self.assertEqual(populate_tables(self.conn, self.data_sources), ['solar_hours'])
+        rows = self.conn.execute("SELECT month, solar_hours FROM solar_hours ORDER BY month").fetchall()
+        self.assertEqual(rows, [(1, 5.7), (2, 6.0), (3, 6.5)])
+
+    def test_failed_load_is_rolled_back(self):
+        populate_tables(self.conn, self.data_sources)
+        self._write_csv('regions.csv', 'region_name\nBaja California\nBajio\n')
+        self._write_csv('locations.csv', 'city,residential_rate,summer_start_month,region_id\nTijuana,,5,1\n')
+        self.conn.execute("CREATE TRIGGER reject_empty_rate BEFORE INSERT ON locations WHEN NEW.residential_rate = '' BEGIN SELECT RAISE(ABORT, 'empty rate'); END")
+        with patch('builtins.print'):
+            self.assertEqual(populate_tables(self.conn, self.data_sources), [])
+        self.assertEqual(self._count('regions'), 2)
+        self.assertEqual(self._count('locations'), 1)
+
+    def test_migration_removes_duplicates(self):
+        conn = sqlite3.connect(':memory:')
+        create_tables(conn)
+        for _ in range(2):
+            conn.execute("INSERT INTO regions (region_name) VALUES ('Baja California')")
+            conn.execute("INSERT INTO locations (city, residential_rate, summer_start_month, region_id) VALUES ('Mexicali', '1F', 5, 1)")
+            conn.execute("INSERT INTO solar_hours (location_id, tilt_angle, month, solar_hours) VALUES (1, 32, 1, 5.5)")
+        conn.commit()
+        migrate(conn)
+        for table_name in ['regions', 'locations', 'solar_hours']:
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0], 1)
+        conn.close()
+
+    def test_setup_database_rebuild(self):
+        db_path = os.path.join(self.temp_dir.name, 'SolarData.sqlite3')
+        with patch('database.db_setup.get_data_sources', return_value=self.data_sources):
+            self.assertEqual(setup_database(db_path), ['regions', 'locations', 'solar_hours'])
+            self.assertEqual(setup_database(db_path), [])
+        with sqlite3.connect(db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0], 1)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
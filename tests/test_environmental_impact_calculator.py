@@ -29,3 +29,17 @@ class TestEnvironmentalImpactCalculator(unittest.TestCase):
         expected_trees_planted = co2_saved * EnvironmentalImpactCalculator._TREES_PLANTED_PER_KG_CO2
         actual_trees_planted = calculator.calculate_trees_planted()
         self.assertEqual(expected_trees_planted, actual_trees_planted)
+
+    def test_custom_factors(self):
+        calculator = EnvironmentalImpactCalculator(1000, kg_co2_per_kwh=0.3, trees_planted_per_kg_co2=0.01)
+        self.assertEqual(calculator.calculate_co2_emission_saved(), 300)
+        self.assertEqual(calculator.calculate_trees_planted(), 3)
+        with self.assertRaises(ValueError):
+            EnvironmentalImpactCalculator(1000, kg_co2_per_kwh=-0.1)
+
+    def test_energy_saved_kwh_setter(self):
+        calculator = EnvironmentalImpactCalculator(100)
+        calculator.energy_saved_kwh = 200
+        self.assertEqual(calculator.energy_saved_kwh, 200)
+        with self.assertRaises(ValueError):
+            calculator.energy_saved_kwh = -1
@@ -0,0 +1,106 @@
+import math
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from database.commercial_rates_data import CommercialRatesData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+from calculations.financial_metrics import npv, irr, lcoe
+
+class TestFinancialMetrics(unittest.TestCase):
+    def test_npv(self):
+        cash_flows = [-1000, 300, 400, 500]
+        expected = sum(cash_flow / 1.1 ** year for year, cash_flow in enumerate(cash_flows))
+        self.assertAlmostEqual(float(npv(cash_flows, 0.1)), expected, places=9)
+        self.assertEqual(float(npv(cash_flows, 0)), 200)
+
+    def test_npv_batch(self):
+        cash_flows = np.array([[-1000, 300, 400, 500], [-500, 100, 100, 600]])
+        result = npv(cash_flows, [0.1, 0.05])
+        self.assertEqual(result.shape, (2,))
+        self.assertEqual(result[0], npv(cash_flows[0], 0.1))
+        self.assertEqual(result[1], npv(cash_flows[1], 0.05))
+
+    def test_irr(self):
+        self.assertAlmostEqual(irr([-100, 110]), 0.1, places=10)
+        self.assertAlmostEqual(irr([-100, 0, 121]), 0.1, places=10)
+        self.assertAlmostEqual(irr([-100, 5000]), 49, places=8)
+        self.assertAlmostEqual(irr([-100, 50]), -0.5, places=10)
+
+    def test_irr_without_root(self):
+        self.assertTrue(math.isnan(irr([100, 10])))
+        self.assertTrue(math.isnan(irr([0, 0])))
+        self.assertTrue(math.isnan(irr([-100, -10])))
+
+    def test_irr_batch(self):
+        rng = np.random.default_rng(0)
+        cash_flows = np.hstack([-rng.uniform(1000, 5000, (500, 1)), rng.uniform(0, 600, (500, 25))])
+        result = irr(cash_flows)
+        self.assertEqual(result.shape, (500,))
+        for i in range(0, 500, 50):
+            self.assertEqual(result[i], irr(cash_flows[i]))
+        self.assertLess(np.max(np.abs(npv(cash_flows, result) / cash_flows[:, 0])), 1e-8)
+
+    def test_irr_batch_mixed_rows(self):
+        result = irr([[-100, 110], [100, 10], [-100, 121]])
+        self.assertAlmostEqual(result[0], 0.1, places=10)
+        self.assertTrue(math.isnan(result[1]))
+        self.assertAlmostEqual(result[2], 0.21, places=10)
+
+    def test_lcoe(self):
+        expected = (1000 + 10 / 1.05 + 10 / 1.05 ** 2) / (100 / 1.05 + 90 / 1.05 ** 2)
+        self.assertAlmostEqual(float(lcoe(1000, [100, 90], 0.05, 10)), expected, places=10)
+        self.assertEqual(float(lcoe(1000, [100, 100], 0)), 5)
+        self.assertTrue(math.isnan(lcoe(1000, [0, 0], 0.05)))
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            npv([-100], 0.1)
+        with self.assertRaises(ValueError):
+            npv([-100, 110], -1)
+        with self.assertRaises(ValueError):
+            irr(np.zeros((2, 2, 2)))
+
+class TestCalculatorFinancialMetrics(unittest.TestCase):
+    def setUp(self):
+        self.location = Mock(spec=Location)
+        self.location.region_id = 1
+        self.location.get_solar_hours.return_value = [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+        pdbt_rate_data = Mock(spec=CommercialRatesData)
+        pdbt_rate_data.get_charges.return_value = [{'transmission': 0.1758, 'distribution': 0.734, 'cenace': 0.0074,
+                                                    'supplier': 53.58, 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for _ in range(12)]
+        self.rate = PdbtRate(self.location, '2024-12', pdbt_rate_data)
+        self.pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        self.consumption = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+        self.pv_systems = [PVSystem(self.pv_module, count, 0.85, self.location) for count in [4, 12, 30]]
+
+    def test_scalar_metrics(self):
+        calculator = SolarSavingsCalculator(self.rate, self.pv_systems[1], self.consumption)
+        cash_flows = calculator.calculate_cash_flow(15000)
+        self.assertEqual(calculator.calculate_npv(0, 15000), round(sum(cash_flows), 2))
+        self.assertEqual(calculator.calculate_npv(0.08, 15000), round(float(npv(cash_flows, 0.08)), 2))
+        self.assertEqual(calculator.calculate_irr(15000), round(float(irr(cash_flows)), 4))
+        self.assertGreater(calculator.calculate_irr(15000), calculator.calculate_irr(30000))
+        self.assertGreater(calculator.calculate_lcoe(0.08, 15000), 0)
+
+    def test_irr_below_zero_without_payback(self):
+        calculator = SolarSavingsCalculator(self.rate, self.pv_systems[1], self.consumption)
+        self.assertLess(calculator.calculate_irr(10 ** 6), 0)
+
+    def test_batch_matches_scalar(self):
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.rate, self.pv_systems[0], self.consumption, [4, 12, 30])
+        npv_values = batch.calculate_npv(0.08, 15000, annual_inflation=0.04)
+        irr_values = batch.calculate_irr(15000, annual_inflation=0.04)
+        lcoe_values = batch.calculate_lcoe(0.08, 15000, annual_om_cost=500)
+        for i, pv_system in enumerate(self.pv_systems):
+            calculator = SolarSavingsCalculator(self.rate, pv_system, self.consumption)
+            self.assertEqual(npv_values[i], calculator.calculate_npv(0.08, 15000, annual_inflation=0.04))
+            self.assertEqual(irr_values[i], calculator.calculate_irr(15000, annual_inflation=0.04))
+            self.assertEqual(lcoe_values[i], calculator.calculate_lcoe(0.08, 15000, annual_om_cost=500))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+import numpy as np
 from unittest.mock import Mock, patch
 from models.gdmto_rate import GdmtoRate
 from models.location import Location
+from utils.date_utils import generate_days_in_month
 
 class TestGdmtoRate(unittest.TestCase):
     def setUp(self):
@@ -42,5 +44,46 @@ class TestGdmtoRate(unittest.TestCase):
         for power_factor, expected_charge in zip(power_factors, expected_charges):
             self.assertAlmostEqual(gdmto_rate._calculate_power_factor_rate(power_factor), expected_charge, places=4)
 
+    def _reference_payments(self, gdmto_rate, consumption, demand, power_factor):
+        days_in_months = generate_days_in_month(self.end_month)
+        return [gdmto_rate._calculate_payment(charge, consumption[i], days_in_months[i], demand[i], power_factor[i])
+                for i, charge in enumerate(gdmto_rate._charges)]
+
+    def test_calculate_batch_monthly_payments(self):
+        with patch('models.gdmto_rate.CommercialRatesData.get_charges', return_value=self.mock_charges):
+            gdmto_rate = GdmtoRate(self.location, self.end_month)
+        rng = np.random.default_rng(5)
+        consumptions = rng.integers(0, 60000, (50, 12)).astype(float)
+        demands = rng.integers(0, 200, (50, 12))
+        power_factors = np.round(rng.uniform(30, 100, (50, 12)), 1)
+        power_factors[0] = 90
+
+        payments = gdmto_rate.calculate_batch_monthly_payments(consumptions, demand=demands, power_factor=power_factors)
+        self.assertEqual(payments.shape, (50, 12))
+        for i in range(50):
+            expected = self._reference_payments(gdmto_rate, consumptions[i].tolist(), demands[i].tolist(), power_factors[i].tolist())
+            self.assertEqual(payments[i].tolist(), expected)
+
+        single_row = gdmto_rate.calculate_batch_monthly_payments(consumptions[3], demand=demands[3], power_factor=power_factors[3])
+        self.assertEqual(single_row.tolist(), payments[3].tolist())
+        broadcast = gdmto_rate.calculate_batch_monthly_payments(consumptions[:2], demand=demands[0], power_factor=power_factors[0])
+        self.assertEqual(broadcast[1].tolist(), self._reference_payments(gdmto_rate, consumptions[1].tolist(), demands[0].tolist(),
+                                                                        power_factors[0].tolist()))
+
+    def test_batch_validation(self):
+        with patch('models.gdmto_rate.CommercialRatesData.get_charges', return_value=self.mock_charges):
+            gdmto_rate = GdmtoRate(self.location, self.end_month)
+        consumptions = [[1000] * 12]
+        with self.assertRaises(ValueError):
+            gdmto_rate.calculate_batch_monthly_payments(consumptions, demand=[[10.5] * 12], power_factor=[[90] * 12])
+        with self.assertRaises(ValueError):
+            gdmto_rate.calculate_batch_monthly_payments(consumptions, demand=[[-1] * 12], power_factor=[[90] * 12])
+        with self.assertRaises(ValueError):
+            gdmto_rate.calculate_batch_monthly_payments(consumptions, demand=[[10] * 12], power_factor=[[20] * 12])
+        with self.assertRaises(ValueError):
+            gdmto_rate.calculate_batch_monthly_payments(consumptions * 2, demand=[[10] * 12] * 3, power_factor=[[90] * 12])
+        with self.assertRaises(ValueError):
+            gdmto_rate.calculate_monthly_payments([1000] * 12, demand=[10.0] * 12, power_factor=[90] * 12)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from database.commercial_rates_data import CommercialRatesData
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.hourly_simulation import HourlySimulator
+from utils.date_utils import generate_days_in_month
+from utils.hourly_profiles import DEFAULT_DAILY_SHAPE, solar_daily_shape, validate_daily_shape, expand_daily_totals, aggregate_monthly
+
+class TestHourlyProfiles(unittest.TestCase):
+    def test_solar_daily_shape(self):
+        self.assertAlmostEqual(DEFAULT_DAILY_SHAPE.sum(), 1)
+        self.assertTrue((DEFAULT_DAILY_SHAPE[:6] == 0).all())
+        self.assertTrue((DEFAULT_DAILY_SHAPE[18:] == 0).all())
+        self.assertIn(DEFAULT_DAILY_SHAPE.argmax(), (11, 12))
+        with self.assertRaises(ValueError):
+            solar_daily_shape(18, 6)
+        with self.assertRaises(ValueError):
+            validate_daily_shape([1] * 23)
+
+    def test_expand_and_aggregate(self):
+        days_in_month = generate_days_in_month('2024-12')
+        daily_totals = np.arange(1, 13, dtype=float)
+        hourly = expand_daily_totals(daily_totals, days_in_month)
+        self.assertEqual(hourly.shape, (8784,))
+        np.testing.assert_allclose(aggregate_monthly(hourly, days_in_month), daily_totals * days_in_month)
+
+        batch = expand_daily_totals(np.vstack([daily_totals, 2 * daily_totals]), days_in_month)
+        self.assertEqual(batch.shape, (2, 8784))
+        np.testing.assert_allclose(batch[1], 2 * hourly)
+
+class TestHourlySimulation(unittest.TestCase):
+    def setUp(self):
+        self.end_year_month = '2023-12'
+        self.location = Mock(spec=Location)
+        self.location.region_id = 1
+        self.location.get_solar_hours.return_value = [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+        self.pv_system = PVSystem(PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95), 10, 0.85, self.location)
+        pdbt_rate_data = Mock(spec=CommercialRatesData)
+        pdbt_rate_data.get_charges.return_value = [{'transmission': 0.1758, 'distribution': 0.734, 'cenace': 0.0074,
+                                                    'supplier': 53.58, 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for _ in range(12)]
+        self.rate = PdbtRate(self.location, self.end_year_month, pdbt_rate_data)
+        # Evening heavy load, most of it can't be covered by same-hour production
+        load_shape = np.array([1] * 7 + [2] * 10 + [4] * 5 + [1] * 2, dtype=float)
+        self.hourly_consumption = np.tile(load_shape, 365)
+        self.simulator = HourlySimulator(self.end_year_month)
+
+    def test_hourly_production(self):
+        hourly_production = self.pv_system.calculate_hourly_energy_production(self.end_year_month)
+        self.assertEqual(hourly_production.shape, (8760,))
+        self.assertEqual(self.pv_system.calculate_hourly_energy_production('2024-12').shape, (8784,))
+        monthly_production = self.pv_system.calculate_monthly_energy_production(self.end_year_month)
+        np.testing.assert_allclose(self.simulator.aggregate_monthly(hourly_production), monthly_production, atol=0.005)
+        self.assertIs(self.pv_system.calculate_hourly_energy_production(self.end_year_month), hourly_production)
+        with self.assertRaises(ValueError):
+            hourly_production[0] = 1
+
+    def test_simulate(self):
+        hourly_production = self.pv_system.calculate_hourly_energy_production(self.end_year_month)
+        simulation = self.simulator.simulate(self.hourly_consumption, hourly_production)
+        np.testing.assert_allclose(simulation["monthly_imports"] - simulation["monthly_exports"],
+                                   simulation["monthly_consumption"] - simulation["monthly_production"], atol=0.02)
+        np.testing.assert_allclose(simulation["monthly_self_consumption"] + simulation["monthly_exports"],
+                                   simulation["monthly_production"], atol=0.02)
+        self.assertTrue(0 < simulation["self_consumption_ratio"] < 1)
+
+        batch = self.simulator.simulate(np.vstack([self.hourly_consumption, np.zeros(8760)]), hourly_production)
+        np.testing.assert_array_equal(batch["monthly_imports"][0], simulation["monthly_imports"])
+        self.assertEqual(batch["self_consumption_ratio"][1], 0)
+
+    def test_simulate_validation(self):
+        with self.assertRaises(ValueError):
+            self.simulator.simulate(self.hourly_consumption[:-1], self.hourly_consumption[:-1])
+        with self.assertRaises(ValueError):
+            self.simulator.simulate(-self.hourly_consumption, self.hourly_consumption)
+
+    def test_calculator_hourly_mode(self):
+        calculator = SolarSavingsCalculator(self.rate, self.pv_system, hourly_consumption=self.hourly_consumption)
+        self.assertEqual(calculator.current_monthly_consumption, aggregate_monthly(self.hourly_consumption, generate_days_in_month(self.end_year_month)).tolist())
+        monthly_calculator = SolarSavingsCalculator(self.rate, self.pv_system, calculator.current_monthly_consumption)
+
+        # With full credit for exports netting hourly imports and exports settles to the monthly net
+        np.testing.assert_allclose(calculator.calculate_new_monthly_consumption(), monthly_calculator.calculate_new_monthly_consumption(), atol=0.05)
+        self.assertGreater(calculator.calculate_hourly_simulation()["self_consumption_ratio"], 0)
+
+        calculator.hourly_consumption = 2 * self.hourly_consumption
+        self.assertEqual(calculator.current_monthly_consumption, [2 * value for value in monthly_calculator.current_monthly_consumption])
+        calculator.current_monthly_consumption = monthly_calculator.current_monthly_consumption
+        self.assertIsNone(calculator.hourly_consumption)
+        with self.assertRaises(ValueError):
+            calculator.calculate_hourly_simulation()
+        with self.assertRaises(ValueError):
+            SolarSavingsCalculator(self.rate, self.pv_system)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import logging
+import unittest
+from utils import instrumentation
+from utils.instrumentation import HistogramSink, LogSink, StatsSink, timed, QUERY, STAGE, CACHE
+from utils.cache_graph import CacheGraph
+from database.location_data import LocationData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from calculations.solar_calculator import SolarSavingsCalculator
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(instrumentation.get_instrumentation())
+        self.assertIsNone(instrumentation.get_stats())
+        instrumentation.record(QUERY, 'ignored', 1.0)
+        graph = CacheGraph({'a': []})
+        self.assertEqual(graph.get('a', lambda: 1), 1)
+        self.assertIsNone(instrumentation.get_stats())
+
+    def test_enable_and_disable(self):
+        enabled = instrumentation.enable()
+        self.assertIs(instrumentation.get_instrumentation(), enabled)
+        self.assertIs(instrumentation.disable(), enabled)
+        self.assertIsNone(instrumentation.get_instrumentation())
+
+    def test_timed(self):
+        @timed(QUERY, 'lookup')
+        def lookup(value):
+            return value * 2
+
+        self.assertEqual(lookup(2), 4)
+        instrumentation.enable()
+        self.assertEqual(lookup(3), 6)
+        self.assertEqual(lookup(4), 8)
+        stats = instrumentation.get_stats()["queries"]["lookup"]
+        self.assertEqual(stats["count"], 2)
+        self.assertGreaterEqual(stats["max"], stats["mean"])
+        self.assertAlmostEqual(stats["mean"], stats["total"] / 2)
+        self.assertEqual(lookup.__name__, 'lookup')
+
+    def test_timed_records_failures(self):
+        @timed(STAGE)
+        def fail():
+            raise ValueError("failed")
+
+        instrumentation.enable()
+        with self.assertRaises(ValueError):
+            fail()
+        self.assertEqual(instrumentation.get_stats()["stages"][fail.__qualname__]["count"], 1)
+
+    def test_cache_graph(self):
+        instrumentation.enable()
+        graph = CacheGraph({'a': [], 'b': ['a']}, 'Graph')
+        graph.get('a', lambda: 1)
+        graph.get('a', lambda: 1)
+        graph.get('b', lambda: 2)
+        stats = instrumentation.get_stats()
+        self.assertEqual(stats["caches"]["Graph.a"], {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+        self.assertEqual(stats["caches"]["Graph"]["hits"], 1)
+        self.assertEqual(stats["caches"]["Graph"]["misses"], 2)
+        self.assertEqual(stats["stages"]["Graph.a"]["count"], 1)
+        self.assertEqual(stats["stages"]["Graph.b"]["count"], 1)
+
+    def test_calculator_pipeline(self):
+        instrumentation.enable()
+        location = Location('Mexicali')
+        pv_module = PVModule(capacity=0.3, tilt_angle=32, efficiency=0.8, lifespan=25, annual_degradation=0.005)
+        pv_system = PVSystem(pv_module=pv_module, pv_module_count=10, efficiency=0.95, location=location)
+        rate = PdbtRate(location, '2023-12')
+        calculator = SolarSavingsCalculator(rate, pv_system, [800] * 12)
+        calculator.calculate_offset()
+        calculator.calculate_offset()
+        calculator.calculate_monthly_payment_savings()
+
+        stats = instrumentation.get_stats()
+        self.assertEqual(stats["caches"]["SolarSavingsCalculator.offset"]["hits"], 1)
+        self.assertIn("PVSystem", stats["caches"])
+        self.assertIn("SolarSavingsCalculator.offset", stats["stages"])
+        self.assertEqual(stats["stages"]["PdbtRate.__init__"]["count"], 1)
+        self.assertIn("SolarHoursData.get_solar_hours", stats["queries"])
+        self.assertIn("CommercialRatesData.get_charges", stats["queries"])
+
+    def test_location_queries(self):
+        instrumentation.enable()
+        location_data = LocationData()
+        for method in ['get_location', 'get_region_id', 'get_region', 'get_residential_rate', 'get_summer_start_month']:
+            getattr(location_data, method)('Mexicali')
+            self.assertEqual(instrumentation.get_stats()["queries"][f"LocationData.{method}"]["count"], 1)
+
+    def test_reset(self):
+        histogram = HistogramSink()
+        enabled = instrumentation.enable(histogram)
+        instrumentation.record(QUERY, 'query', 0.001)
+        enabled.reset()
+        self.assertEqual(enabled.stats(), {"queries": {}, "stages": {}, "caches": {}})
+        self.assertIsNone(histogram.percentile(QUERY, 'query', 50))
+
+class TestStatsSink(unittest.TestCase):
+    def test_stats(self):
+        sink = StatsSink()
+        sink.record(QUERY, 'query', 0.1)
+        sink.record(QUERY, 'query', 0.3)
+        sink.record(CACHE, 'cache', True)
+        sink.record(CACHE, 'cache', False)
+        sink.record(CACHE, 'cache', True)
+        stats = sink.stats()
+        self.assertEqual(stats["queries"]["query"]["count"], 2)
+        self.assertAlmostEqual(stats["queries"]["query"]["total"], 0.4)
+        self.assertAlmostEqual(stats["queries"]["query"]["mean"], 0.2)
+        self.assertEqual(stats["queries"]["query"]["max"], 0.3)
+        self.assertEqual(stats["caches"]["cache"], {"hits": 2, "misses": 1, "hit_ratio": 2 / 3})
+        self.assertEqual(stats["stages"], {})
+
+class TestHistogramSink(unittest.TestCase):
+    def test_invalid_bounds(self):
+        for bounds in [(), (0, 1), (2, 1), (1, 1)]:
+            with self.assertRaises(ValueError):
+                HistogramSink(bounds)
+
+    def test_histogram(self):
+        sink = HistogramSink((0.001, 0.01, 0.1))
+        for value in [0.0005, 0.001, 0.005, 0.05, 0.05, 1]:
+            sink.record(STAGE, 'stage', value)
+        sink.record(CACHE, 'stage', True)
+        self.assertEqual(sink.histogram(STAGE, 'stage'), [(0.001, 2), (0.01, 1), (0.1, 2), (float('inf'), 1)])
+        self.assertEqual(sink.histogram(QUERY, 'stage'), [(0.001, 0), (0.01, 0), (0.1, 0), (float('inf'), 0)])
+
+    def test_percentile(self):
+        sink = HistogramSink((0.001, 0.01, 0.1))
+        for value in [0.0005] * 50 + [0.005] * 40 + [0.05] * 9 + [1]:
+            sink.record(QUERY, 'query', value)
+        self.assertEqual(sink.percentile(QUERY, 'query', 0), 0.001)
+        self.assertEqual(sink.percentile(QUERY, 'query', 50), 0.001)
+        self.assertEqual(sink.percentile(QUERY, 'query', 90), 0.01)
+        self.assertEqual(sink.percentile(QUERY, 'query', 99), 0.1)
+        self.assertEqual(sink.percentile(QUERY, 'query', 100), float('inf'))
+        self.assertIsNone(sink.percentile(QUERY, 'missing', 50))
+        with self.assertRaises(ValueError):
+            sink.percentile(QUERY, 'query', 101)
+
+class TestLogSink(unittest.TestCase):
+    def test_log(self):
+        logger = logging.getLogger('test.instrumentation')
+        sink = LogSink(logger, logging.INFO, min_duration=0.01)
+        with self.assertLogs(logger, logging.INFO) as logs:
+            sink.record(QUERY, 'query', 0.02)
+            sink.record(QUERY, 'fast', 0.001)
+            sink.record(CACHE, 'cache', False)
+        self.assertEqual(logs.output, [
+            "INFO:test.instrumentation:query query 20.000 ms",
+            "INFO:test.instrumentation:cache cache miss",
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
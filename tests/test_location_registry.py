@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import Mock
+from database.location_data import LocationData
+from database.solar_hours_data import SolarHoursData
+from models.location import Location
+from models.location_registry import LocationRegistry
+import config
+
+class TestLocationRegistry(unittest.TestCase):
+    def setUp(self):
+        self.location_data = Mock(spec=LocationData)
+        self.location_data.get_location.side_effect = lambda city: {
+            'city': city, 'region': 'Baja California', 'region_id': '1', 'residential_rate': '1F', 'summer_start_month': 5
+        } if city in ['Mexicali', 'San Felipe'] else None
+        self.solar_hours_data = Mock(spec=SolarHoursData)
+        self.registry = LocationRegistry(self.solar_hours_data, self.location_data)
+
+    def test_get_location_record(self):
+        location_data = LocationData(config.DATABASE_PATH)
+        location = location_data.get_location('Tijuana')
+        self.assertEqual(location, {'city': 'Tijuana', 'region': 'Baja California', 'region_id': '1',
+                                    'residential_rate': '1A', 'summer_start_month': 5})
+        self.assertIsNone(location_data.get_location('Atlantis'))
+
+    def test_location_built_from_single_query(self):
+        location = Location('Mexicali', self.solar_hours_data, self.location_data)
+        self.location_data.get_location.assert_not_called()
+        self.assertEqual(location.region, 'Baja California')
+        self.assertEqual(location.region_id, '1')
+        self.assertEqual(location.residential_rate, '1F')
+        self.assertEqual(location.summer_start_month, 5)
+        self.location_data.get_location.assert_called_once_with('Mexicali')
+
+    def test_get_location_is_cached(self):
+        location = self.registry.get_location('Mexicali')
+        self.assertIs(self.registry.get_location('Mexicali'), location)
+        self.assertEqual(self.location_data.get_location.call_count, 1)
+        self.assertIn('Mexicali', self.registry)
+
+    def test_unknown_location_is_not_cached(self):
+        location = self.registry.get_location('Atlantis')
+        self.assertIsNone(location.region_id)
+        self.assertNotIn('Atlantis', self.registry)
+
+    def test_invalidate(self):
+        mexicali = self.registry.get_location('Mexicali')
+        san_felipe = self.registry.get_location('San Felipe')
+        self.registry.invalidate('Mexicali')
+        self.assertIsNot(self.registry.get_location('Mexicali'), mexicali)
+        self.assertIs(self.registry.get_location('San Felipe'), san_felipe)
+
+        self.registry.invalidate()
+        self.assertEqual(len(self.registry), 0)
+
+    def test_tables_changed(self):
+        location = self.registry.get_location('Mexicali')
+        self.registry.tables_changed(['solar_hours'])
+        self.assertIs(self.registry.get_location('Mexicali'), location)
+        self.registry.tables_changed(['regions'])
+        self.assertIsNot(self.registry.get_location('Mexicali'), location)
+
+if __name__ == '__main__':
+    unittest.main()
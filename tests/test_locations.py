@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import unittest
 from models.location import Location
 
@@ -47,6 +50,14 @@ class TestLocation(unittest.TestCase):
 
         summer_start_month = self.invalid_location.summer_start_month
         self.assertIsNone(summer_start_month)
+
+    def test_import_is_lazy(self):
+        code = ("import sys; import models.location; import models; "
+                "print(sorted(name for name in ['numpy', 'database.tariff_snapshot', 'models.pv_system'] if name in sys.modules)); "
+                "print(models.PVSystem.__module__)")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split('\n')[:2], ['[]', 'models.pv_system'])
         
 if __name__ == '__main__':
     unittest.main()
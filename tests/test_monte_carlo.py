@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.monte_carlo import MonteCarloSimulator
+
+# Plain data sources instead of mocks so the simulator can be pickled to pool workers
+class LocationDataSource:
+    def get_location(self, city):
+        return {'city': city, 'region': 'Noroeste', 'region_id': 1, 'residential_rate': '1F', 'summer_start_month': 4}
+
+class SolarHoursSource:
+    def get_solar_hours(self, city, tilt):
+        return [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+
+class ChargesSource:
+    def get_charges(self, region_id, end_year_month):
+        return [{'transmission': 0.1758, 'distribution': 0.734, 'cenace': 0.0074, 'supplier': 53.58,
+                 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for _ in range(12)]
+
+class TestMonteCarloSimulator(unittest.TestCase):
+    def setUp(self):
+        self.location = Location('Hermosillo', SolarHoursSource(), LocationDataSource())
+        self.rate = PdbtRate(self.location, '2024-12', ChargesSource())
+        self.pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        self.pv_system = PVSystem(self.pv_module, 20, 0.85, self.location)
+        self.consumption = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+        self.simulator = MonteCarloSimulator(self.rate, self.pv_system, self.consumption, cost_per_kw=15000)
+
+    def test_invalid_distribution(self):
+        with self.assertRaises(ValueError):
+            MonteCarloSimulator(self.rate, self.pv_system, self.consumption, inflation=(0.05, -0.01))
+        with self.assertRaises(ValueError):
+            MonteCarloSimulator(self.rate, self.pv_system, self.consumption, degradation=0.005)
+
+    def test_invalid_draws(self):
+        with self.assertRaises(ValueError):
+            self.simulator.run(0)
+
+    def test_zero_variance_matches_calculator(self):
+        simulator = MonteCarloSimulator(self.rate, self.pv_system, self.consumption, inflation=(0.05, 0),
+                                        degradation=(0.005, 0), efficiency=(0.85, 0), solar_hours_std=0)
+        summary = simulator.run(20, seed=1)
+        calculator = SolarSavingsCalculator(self.rate, self.pv_system, self.consumption)
+
+        self.assertEqual(summary["draws"], 20)
+        self.assertEqual(summary["invalid_draws"], 0)
+        self.assertEqual(summary["offset"]["p10"], calculator.calculate_offset())
+        self.assertEqual(summary["lifetime_savings"]["p50"], round(sum(calculator.calculate_yearly_payments_savings()), 2))
+        self.assertEqual(summary["roi"]["p90"], calculator.calculate_roi())
+        self.assertEqual(summary["payback_period"]["p50"], calculator.calculate_payback_period())
+        self.assertEqual(summary["payback_probability"], 1.0)
+
+    def test_percentiles_are_ordered(self):
+        summary = self.simulator.run(500, seed=7)
+        for metric in MonteCarloSimulator.METRICS:
+            self.assertLessEqual(summary[metric]["p10"], summary[metric]["p50"])
+            self.assertLessEqual(summary[metric]["p50"], summary[metric]["p90"])
+        self.assertLess(summary["roi"]["p10"], summary["roi"]["p90"])
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(self.simulator.run(300, seed=3), self.simulator.run(300, seed=3))
+        self.assertNotEqual(self.simulator.run(300, seed=3), self.simulator.run(300, seed=4))
+
+    def test_results_do_not_depend_on_workers(self):
+        self.simulator.CHUNK_SIZE = 100
+        self.assertEqual(self.simulator.run(350, seed=11, workers=2), self.simulator.run(350, seed=11))
+
+    def test_no_payback_percentile(self):
+        simulator = MonteCarloSimulator(self.rate, self.pv_system, self.consumption, cost_per_kw=10 ** 7)
+        summary = simulator.run(50, seed=1)
+        self.assertEqual(summary["payback_probability"], 0.0)
+        self.assertIsNone(summary["payback_period"]["p50"])
+        self.assertIsNone(summary["payback_period"]["mean"])
+
+    def test_invalid_draws_are_left_out(self):
+        metrics = {"offset": [0.9, 1.0, 1.1, 1.2], "lifetime_savings": [100.0, np.nan, 300.0, 400.0],
+                   "roi": [1.0, -np.inf, 3.0, np.nan], "payback_period": [5.0, np.nan, np.nan, 8.0]}
+        summary = self.simulator.summarize(metrics)
+        self.assertEqual(summary["draws"], 4)
+        self.assertEqual(summary["invalid_draws"], 2)
+        self.assertEqual(summary["roi"], {"p10": 1.0, "p50": 1.0, "p90": 1.0, "mean": 2.0})
+        self.assertEqual(summary["lifetime_savings"]["mean"], 200.0)
+        self.assertEqual(summary["payback_probability"], 0.5)
+        self.assertEqual(summary["payback_period"]["p10"], 5.0)
+
+        summary = self.simulator.summarize({metric: [np.nan] for metric in MonteCarloSimulator.METRICS})
+        self.assertEqual(summary["invalid_draws"], 1)
+        self.assertIsNone(summary["payback_probability"])
+        self.assertEqual(summary["roi"], {"p10": None, "p50": None, "p90": None, "mean": None})
+
+    def test_sample_bounds(self):
+        samples = self.simulator.sample(1000, np.random.default_rng(0))
+        self.assertTrue((samples["degradation"] >= 0).all())
+        self.assertTrue(((samples["efficiency"] >= 0.1) & (samples["efficiency"] <= 1)).all())
+        self.assertEqual(samples["solar_hours"].shape, (1000, 12))
+
+if __name__ == '__main__':
+    unittest.main()
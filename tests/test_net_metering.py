@@ -0,0 +1,85 @@
+import random
+import unittest
+import numpy as np
+from calculations.net_metering import NetMeteringEngine
+
+def reference_new_consumption(current_consumption, production):
+    new_consumption = []
+    energy_bank = 0
+    for current, produced in zip(current_consumption, production):
+        net_energy = produced - current + energy_bank
+        if net_energy >= 0:
+            new_consumption.append(0)
+            energy_bank = net_energy
+        else:
+            new_consumption.append(round(abs(net_energy), 2))
+            energy_bank = 0
+
+    for i in range(len(new_consumption)):
+        if energy_bank <= 0:
+            break
+        if new_consumption[i] > 0:
+            if new_consumption[i] <= energy_bank:
+                energy_bank -= new_consumption[i]
+                new_consumption[i] = 0
+            else:
+                new_consumption[i] = round(new_consumption[i] - energy_bank, 2)
+                energy_bank = 0
+    return new_consumption
+
+class TestNetMeteringEngine(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(7)
+        self.consumptions = [[round(generator.uniform(0, 1500), 2) for _ in range(12)] for _ in range(300)]
+        self.productions = [[round(generator.uniform(0, 1200), 2) for _ in range(12)] for _ in range(300)]
+
+    def test_matches_reference_single_profile(self):
+        engine = NetMeteringEngine()
+        for consumption, production in zip(self.consumptions, self.productions):
+            self.assertEqual(engine.calculate_new_consumption(consumption, production).tolist(),
+                             reference_new_consumption(consumption, production))
+
+    def test_matches_reference_batch(self):
+        new_consumption = NetMeteringEngine().calculate_new_consumption(self.consumptions, self.productions)
+        self.assertEqual(new_consumption.shape, (300, 12))
+        expected = [reference_new_consumption(consumption, production) for consumption, production in zip(self.consumptions, self.productions)]
+        self.assertEqual(new_consumption.tolist(), expected)
+
+    def test_carry_over_to_first_months(self):
+        consumption = [500, 400] + [100] * 10
+        production = [200] * 12
+        expected = [0, 0] + [0] * 10
+        self.assertEqual(NetMeteringEngine().calculate_new_consumption(consumption, production).tolist(), expected)
+        self.assertEqual(NetMeteringEngine(carry_over=False).calculate_new_consumption(consumption, production).tolist(),
+                         [300, 200] + [0] * 10)
+
+    def test_expiring_bank(self):
+        consumption = [0, 0, 300, 300] + [0] * 8
+        production = [200, 200, 0, 0] + [0] * 8
+        self.assertEqual(NetMeteringEngine(expiry_months=2).calculate_new_consumption(consumption, production).tolist(),
+                         [0, 0, 0, 200] + [0] * 8)
+        self.assertEqual(NetMeteringEngine(expiry_months=1).calculate_new_consumption(consumption, production).tolist(),
+                         [0, 0, 100, 300] + [0] * 8)
+
+    def test_expiring_bank_uses_oldest_credit_first(self):
+        consumption = [0, 0, 0, 150] + [0] * 8
+        production = [100, 100, 0, 0] + [0] * 8
+        self.assertEqual(NetMeteringEngine(expiry_months=3).calculate_new_consumption(consumption, production).tolist(),
+                         [0] * 12)
+        self.assertEqual(NetMeteringEngine(expiry_months=2).calculate_new_consumption(consumption, production).tolist(),
+                         [0, 0, 0, 50] + [0] * 8)
+
+    def test_long_expiry_without_carry_over_matches_bank(self):
+        engine = NetMeteringEngine(carry_over=False)
+        expiring_engine = NetMeteringEngine(expiry_months=12)
+        np.testing.assert_allclose(expiring_engine.calculate_new_consumption(self.consumptions, self.productions),
+                                   engine.calculate_new_consumption(self.consumptions, self.productions), atol=0.011)
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            NetMeteringEngine(expiry_months=0)
+        with self.assertRaises(ValueError):
+            NetMeteringEngine().calculate_new_consumption([100] * 11, [100] * 12)
+
+if __name__ == '__main__':
+    unittest.main()
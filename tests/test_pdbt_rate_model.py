@@ -31,5 +31,21 @@ class TestPdbtRate(unittest.TestCase):
                 ]) * 1.08
                 self.assertEqual(monthly_payments[i], round(expected_payment,2))
 
+    def test_charges_fetched_on_first_bill(self):
+        pdbt_rate_data = Mock()
+        pdbt_rate_data.get_charges.return_value = self.mock_charges
+        pdbt_rate = PdbtRate(self.location, self.end_month, pdbt_rate_data)
+        pdbt_rate_data.get_charges.assert_not_called()
+        pdbt_rate.calculate_monthly_payments([100] * 12)
+        pdbt_rate.calculate_batch_monthly_payments([[100] * 12])
+        pdbt_rate_data.get_charges.assert_called_once_with(1, self.end_month)
+
+    def test_missing_charges(self):
+        pdbt_rate_data = Mock()
+        pdbt_rate_data.get_charges.return_value = []
+        pdbt_rate = PdbtRate(self.location, self.end_month, pdbt_rate_data)
+        with self.assertRaises(ValueError):
+            pdbt_rate.calculate_monthly_payments([100] * 12)
+
 if __name__ == "__main__":
     unittest.main()
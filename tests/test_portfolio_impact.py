@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from calculations.environmental_impact_calculator import EnvironmentalImpactCalculator
+from calculations.portfolio_impact import EmissionFactorTable, PortfolioImpactCalculator
+
+class TestEmissionFactorTable(unittest.TestCase):
+    def setUp(self):
+        self.table = EmissionFactorTable({1: {2024: 0.5, 2026: 0.4}, '2': {2025: 0.3}}, default=0.45)
+
+    def test_lookup(self):
+        years = [2023, 2024, 2025, 2026, 2027]
+        factors = self.table.lookup(['1', 2, 3], [years, years, years])
+        np.testing.assert_array_equal(factors[0], [0.5, 0.5, 0.5, 0.4, 0.4])
+        np.testing.assert_array_equal(factors[1], [0.3, 0.3, 0.3, 0.3, 0.3])
+        np.testing.assert_array_equal(factors[2], [0.45] * 5)
+
+    def test_from_records(self):
+        table = EmissionFactorTable.from_records([(1, 2024, 0.5), (1, 2026, 0.4), ('2', 2025, 0.3)], default=0.45)
+        np.testing.assert_array_equal(table.lookup([1, 2], [[2025, 2026], [2025, 2026]]), self.table.lookup([1, 2], [[2025, 2026], [2025, 2026]]))
+
+    def test_default_table(self):
+        table = EmissionFactorTable()
+        np.testing.assert_array_equal(table.lookup([1], [[2024, 2050]]), [[EnvironmentalImpactCalculator._KG_CO2_PER_KWH] * 2])
+
+    def test_invalid_factors(self):
+        with self.assertRaises(ValueError):
+            EmissionFactorTable({1: {2024: -0.1}})
+        with self.assertRaises(ValueError):
+            EmissionFactorTable({1: {'2024': 0.4}})
+        with self.assertRaises(ValueError):
+            EmissionFactorTable({1: {}})
+        with self.assertRaises(ValueError):
+            EmissionFactorTable([(1, 2024, 0.4)])
+
+class TestPortfolioImpactCalculator(unittest.TestCase):
+    def setUp(self):
+        self.table = EmissionFactorTable({1: {2024: 0.5, 2026: 0.4}, 2: {2025: 0.3}})
+        self.calculator = PortfolioImpactCalculator(self.table)
+        self.savings = np.array([[1000, 1000, 1000], [2000, 1900, 1800], [500, 500, 500]], dtype=float)
+
+    def test_calculate(self):
+        result = self.calculator.calculate(self.savings, [1, 2, 1], [2025, 2025, 2024])
+        np.testing.assert_array_equal(result["kg_co2_saved"], [1300, 1710, 700])
+        np.testing.assert_array_equal(result["trees_planted"], [1.3, 1.71, 0.7])
+        self.assertEqual(result["total_kg_co2_saved"], 3710)
+        self.assertEqual(result["total_trees_planted"], 3.71)
+        self.assertEqual(result["by_region"], {
+            "1": {"systems": 2, "kg_co2_saved": 2000, "trees_planted": 2},
+            "2": {"systems": 1, "kg_co2_saved": 1710, "trees_planted": 1.71},
+        })
+        self.assertEqual(result["by_year"], {2024: 250, 2025: 1350, 2026: 1170, 2027: 940})
+
+    def test_matches_single_factor_calculator(self):
+        rng = np.random.default_rng(1)
+        savings = rng.uniform(1000, 5000, (200, 25))
+        result = PortfolioImpactCalculator().calculate(savings, 1, 2025)
+        for i in range(0, 200, 20):
+            calculator = EnvironmentalImpactCalculator(sum(savings[i]))
+            self.assertAlmostEqual(result["kg_co2_saved"][i], calculator.calculate_co2_emission_saved(), delta=0.011)
+            self.assertAlmostEqual(result["trees_planted"][i], calculator.calculate_trees_planted(), delta=0.011)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            self.calculator.calculate([1000, 1000], 1, 2025)
+        with self.assertRaises(ValueError):
+            self.calculator.calculate(-self.savings, 1, 2025)
+        with self.assertRaises(ValueError):
+            self.calculator.calculate(self.savings, [1, 2], 2025)
+        with self.assertRaises(ValueError):
+            self.calculator.calculate(self.savings, 1, 2025.5)
+        with self.assertRaises(ValueError):
+            PortfolioImpactCalculator({1: {2024: 0.5}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.rate_factory import create_rate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+from calculations.portfolio_runner import PortfolioRunner, read_customers, main
+import config
+
+class TestPortfolioRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.consumption = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+        system = {"pv_module_capacity": 0.45, "tilt_angle": 32, "module_efficiency": 0.95, "system_efficiency": 0.85}
+        self.customers = [
+            dict(system, customer_id="c1", city="Mexicali", rate="PDBT", end_year_month="2024-07", consumption=self.consumption, pv_module_count=10),
+            dict(system, customer_id="c2", city="Mexicali", rate="residential", end_year_month="2024-12",
+                 consumption=[300 + 10 * i for i in range(12)], pv_module_count=4),
+            dict(system, customer_id="c3", city="Mexicali", rate="PDBT", end_year_month="2024-07", consumption=self.consumption, pv_module_count=25),
+            dict(system, customer_id="c4", city="Mexicali", rate="GDMTO", end_year_month="2024-07", consumption=self.consumption,
+                 pv_module_count=20, demand=[10] * 12, power_factor=[92] * 12),
+            dict(system, customer_id="c5", city="Mexicali", rate="PDBT", end_year_month="2024-07", consumption=self.consumption,
+                 pv_module_count=10, tilt_angle=5),
+            dict(system, customer_id="c6", city="Atlantis", rate="PDBT", end_year_month="2024-07", consumption=self.consumption, pv_module_count=10),
+            dict(system, customer_id="c7", city="Mexicali", rate="XYZ", end_year_month="2024-07", consumption=self.consumption, pv_module_count=10),
+            dict(system, customer_id="c8", city="Mexicali", rate="PDBT", end_year_month="2024-07", consumption=self.consumption[:6], pv_module_count=10),
+        ]
+        self.input_path = self._path("customers.jsonl")
+        with open(self.input_path, 'w') as file:
+            for customer in self.customers:
+                file.write(json.dumps(customer) + '\n')
+        self.output_path = self._path("quotes.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def _read_output(self, path=None):
+        with open(path or self.output_path) as file:
+            return {result["customer_id"]: result for result in map(json.loads, file)}
+
+    def test_results_match_calculator(self):
+        counts = PortfolioRunner(self.output_path, batch_size=2).run(self.input_path)
+        self.assertEqual(counts, {"quoted": 4, "failed": 4, "skipped": 0})
+        results = self._read_output()
+
+        for customer_id, rate_type, end_year_month, count in [("c1", "PDBT", "2024-07", 10), ("c3", "PDBT", "2024-07", 25),
+                                                              ("c2", "RESIDENTIAL", "2024-12", 4)]:
+            customer = next(customer for customer in self.customers if customer["customer_id"] == customer_id)
+            location = Location("Mexicali")
+            rate = create_rate(rate_type, location, end_year_month)
+            pv_system = PVSystem(PVModule(0.45, 32, 0.95), count, 0.85, location)
+            calculator = SolarSavingsCalculator(rate, pv_system, customer["consumption"])
+            result = results[customer_id]
+            self.assertEqual(result["offset"], calculator.calculate_offset())
+            self.assertEqual(result["roi"], calculator.calculate_roi())
+            self.assertEqual(result["payback_period"], calculator.calculate_payback_period())
+            self.assertEqual(result["lifetime_savings"], round(sum(calculator.calculate_yearly_payments_savings()), 2))
+
+        self.assertIn("c4", results)
+        self.assertNotIn("error", results["c4"])
+        for customer_id in ["c5", "c6", "c7", "c8"]:
+            self.assertIn("error", results[customer_id])
+        self.assertFalse(os.path.exists(self.output_path + '.checkpoint'))
+
+    def test_csv_input(self):
+        csv_path = self._path("customers.csv")
+        fields = ["customer_id", "city", "rate", "end_year_month", "pv_module_capacity", "tilt_angle", "module_efficiency",
+                  "pv_module_count", "system_efficiency"] + [f"consumption_{month}" for month in range(1, 13)]
+        with open(csv_path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fields)
+            writer.writeheader()
+            customer = self.customers[0]
+            writer.writerow(dict({field: customer[field] for field in fields[:9]},
+                                 **{f"consumption_{month + 1}": value for month, value in enumerate(customer["consumption"])}))
+        self.assertEqual(next(read_customers(csv_path))["consumption"], [str(value) for value in self.consumption])
+
+        csv_output = self._path("csv_quotes.jsonl")
+        PortfolioRunner(csv_output).run(csv_path)
+        PortfolioRunner(self.output_path).run(self.input_path)
+        self.assertEqual(self._read_output(csv_output)["c1"], self._read_output()["c1"])
+
+    def test_resume_after_crash(self):
+        PortfolioRunner(self.output_path, batch_size=1).run(self.input_path)
+        expected = self._read_output()
+        with open(self.output_path) as file:
+            lines = file.readlines()
+
+        # Two complete batches were checkpointed, a third was being written when the run stopped
+        with open(self.output_path, 'w') as file:
+            file.write(''.join(lines[:2]) + lines[2][:20])
+        with open(self.output_path + '.checkpoint', 'w') as file:
+            json.dump({"input_path": os.path.abspath(self.input_path), "output_size": len(''.join(lines[:2]))}, file)
+
+        counts = PortfolioRunner(self.output_path, batch_size=1).run(self.input_path)
+        self.assertEqual(counts["skipped"], 2)
+        with open(self.output_path) as file:
+            customer_ids = [json.loads(line)["customer_id"] for line in file]
+        self.assertEqual(sorted(customer_ids), sorted(expected))
+        self.assertEqual(self._read_output(), expected)
+
+    def test_malformed_lines(self):
+        with open(self.input_path, 'w') as file:
+            file.write(json.dumps(self.customers[0]) + '\n{"customer_id": "c2", \n[1]\n' + json.dumps(self.customers[2]) + '\n')
+        counts = PortfolioRunner(self.output_path, batch_size=1).run(self.input_path)
+        self.assertEqual(counts, {"quoted": 2, "failed": 2, "skipped": 0})
+        results = self._read_output()
+        self.assertEqual(sorted(results), ["2", "3", "c1", "c3"])
+        self.assertIn("error", results["2"])
+        self.assertEqual(results["3"]["error"], "Customer record must be a JSON object")
+
+        with open(self.output_path + '.checkpoint', 'w') as file:
+            json.dump({"input_path": os.path.abspath(self.input_path), "output_size": os.path.getsize(self.output_path)}, file)
+        self.assertEqual(PortfolioRunner(self.output_path, batch_size=1).run(self.input_path), {"quoted": 0, "failed": 0, "skipped": 4})
+        self.assertEqual(self._read_output(), results)
+
+    def test_non_finite_results(self):
+        calculate_roi = BatchSolarSavingsCalculator.calculate_roi
+        def roi_for_small_systems(calculator, *args):
+            return np.where(calculator.system_size > 10, -np.inf, calculate_roi(calculator, *args))
+
+        with patch.object(BatchSolarSavingsCalculator, 'calculate_roi', roi_for_small_systems):
+            counts = PortfolioRunner(self.output_path, batch_size=2).run(self.input_path)
+        self.assertEqual(counts, {"quoted": 3, "failed": 5, "skipped": 0})
+        with open(self.output_path) as file:
+            results = {result["customer_id"]: result for result in (json.loads(line, parse_constant=self.fail) for line in file)}
+        self.assertEqual(results["c3"], {"customer_id": "c3", "error": "Quote has values that are not finite"})
+        self.assertNotIn("error", results["c1"])
+
+    def test_checkpoint_for_other_input(self):
+        with open(self.output_path, 'w') as file:
+            file.write('')
+        with open(self.output_path + '.checkpoint', 'w') as file:
+            json.dump({"input_path": "/other/customers.jsonl", "output_size": 0}, file)
+        with self.assertRaises(ValueError):
+            PortfolioRunner(self.output_path).run(self.input_path)
+        self.assertEqual(PortfolioRunner(self.output_path).run(self.input_path, resume=False)["skipped"], 0)
+
+    def test_process_pool_matches_inline(self):
+        PortfolioRunner(self.output_path).run(self.input_path)
+        pool_output = self._path("pool_quotes.jsonl")
+        counts = PortfolioRunner(pool_output, workers=2, batch_size=1).run(self.input_path)
+        self.assertEqual(counts, {"quoted": 4, "failed": 4, "skipped": 0})
+        self.assertEqual(self._read_output(pool_output), self._read_output())
+
+    def test_runs_read_the_current_database(self):
+        db_path = self._path("SolarData.sqlite3")
+        shutil.copyfile(config.DATABASE_PATH, db_path)
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                runner = PortfolioRunner(self.output_path, db_path, workers, batch_size=1)
+                runner.run(self.input_path, resume=False)
+                before = self._read_output()["c1"]["offset"]
+                with sqlite3.connect(db_path) as conn:
+                    conn.execute("UPDATE solar_hours SET solar_hours = solar_hours * 2")
+                conn.close()
+                runner.run(self.input_path, resume=False)
+                self.assertGreater(self._read_output()["c1"]["offset"], before)
+
+    def test_main(self):
+        main([self.input_path, self.output_path, "--workers", "1", "--db-path", config.DATABASE_PATH])
+        self.assertEqual(len(self._read_output()), len(self.customers))
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            PortfolioRunner(self.output_path, batch_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
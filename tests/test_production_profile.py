@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from database.solar_hours_data import SolarHoursData
+from database.tariff_snapshot import TariffSnapshot
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.production_profile import (ProductionProfile, ProductionProfileCache, get_production_profile_cache,
+                                       set_production_profile_cache, get_production_profile, invalidate_production_profiles)
+from utils.date_utils import generate_days_in_month
+import config
+
+class TestProductionProfile(unittest.TestCase):
+    def setUp(self):
+        self.solar_hours = [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+        self.location = Mock(spec=Location)
+        self.location.name = 'Mexicali'
+        self.location.get_solar_hours.return_value = self.solar_hours
+        self.cache = ProductionProfileCache(maxsize=2)
+        self.previous_cache = set_production_profile_cache(self.cache)
+
+    def tearDown(self):
+        set_production_profile_cache(self.previous_cache)
+
+    def test_scale_matches_monthly_loop(self):
+        days_in_month = generate_days_in_month('2024-12')
+        profile = ProductionProfile(self.solar_hours, days_in_month)
+        for system_size in [0.45, 1.35, 4.5, 9.9, 13.05]:
+            expected = [round(system_size * hours * days * 0.95 * 0.85, 2) for hours, days in zip(self.solar_hours, days_in_month)]
+            self.assertEqual(profile.scale(system_size, 0.95, 0.85).tolist(), expected)
+        self.assertEqual(profile.scale([0.45, 4.5], 0.95, 0.85).shape, (2, 12))
+        np.testing.assert_allclose(profile.per_kw(0.95, 0.85) * 4.5, profile.scale(4.5, 0.95, 0.85), atol=0.005)
+
+    def test_unavailable_profile(self):
+        profile = ProductionProfile(None, generate_days_in_month('2024-12'))
+        self.assertFalse(profile.available)
+        self.assertEqual(profile.scale([1, 2], 0.95, 0.85).tolist(), [[0] * 12] * 2)
+
+    def test_profiles_are_shared(self):
+        pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        productions = [PVSystem(pv_module, count, 0.85, self.location).calculate_monthly_energy_production('2024-12') for count in range(1, 30)]
+        self.assertEqual(self.location.get_solar_hours.call_count, 1)
+        self.assertEqual(self.cache.cache_info(), {"hits": 28, "misses": 1, "size": 1, "maxsize": 2})
+        self.assertEqual(productions[9], [round(4.5 * hours * days * 0.95 * 0.85, 2)
+                                          for hours, days in zip(self.solar_hours, generate_days_in_month('2024-12'))])
+
+    def test_lru_eviction(self):
+        for end_year_month in ['2023-12', '2024-12', '2023-12', '2025-12']:
+            get_production_profile(self.location, 32, end_year_month)
+        source = self.location.solar_hours_source
+        self.assertIn(('Mexicali', 32, '2023-12', source), self.cache)
+        self.assertIn(('Mexicali', 32, '2025-12', source), self.cache)
+        self.assertNotIn(('Mexicali', 32, '2024-12', source), self.cache)
+        with self.assertRaises(ValueError):
+            ProductionProfileCache(maxsize=0)
+
+    def test_missing_solar_hours_not_cached(self):
+        self.location.get_solar_hours.return_value = None
+        self.assertFalse(get_production_profile(self.location, 5, '2024-12').available)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate(self):
+        other = Mock(spec=Location)
+        other.name = 'Tijuana'
+        other.get_solar_hours.return_value = self.solar_hours
+        get_production_profile(self.location, 32, '2024-12')
+        get_production_profile(other, 32, '2024-12')
+        invalidate_production_profiles('Mexicali')
+        self.assertEqual(len(self.cache), 1)
+        self.cache.tables_changed(['commercial_rates'])
+        self.assertEqual(len(self.cache), 1)
+        self.cache.tables_changed(['solar_hours'])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_profiles_are_kept_per_source(self):
+        set_production_profile_cache(ProductionProfileCache())
+        self.cache = get_production_profile_cache()
+        pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        database_location = Location('Mexicali')
+        mock_solar_hours_data = Mock(spec=SolarHoursData)
+        mock_solar_hours_data.get_solar_hours.return_value = [1.0] * 12
+        mock_location = Location('Mexicali', solar_hours_data=mock_solar_hours_data)
+        snapshot_location = Location('Mexicali', solar_hours_data=TariffSnapshot(config.DATABASE_PATH).solar_hours_data)
+
+        database_production = PVSystem(pv_module, 10, 0.85, database_location).calculate_monthly_energy_production('2024-12')
+        mock_production = PVSystem(pv_module, 10, 0.85, mock_location).calculate_monthly_energy_production('2024-12')
+        snapshot_production = PVSystem(pv_module, 10, 0.85, snapshot_location).calculate_monthly_energy_production('2024-12')
+        self.assertEqual(mock_production, [round(4.5 * days * 0.95 * 0.85, 2) for days in generate_days_in_month('2024-12')])
+        self.assertNotEqual(database_production, mock_production)
+        self.assertEqual(snapshot_production, database_production)
+        self.assertEqual(len(self.cache), 3)
+
+        # Separate DAOs on the same database file share their profiles
+        PVSystem(pv_module, 10, 0.85, Location('Mexicali')).calculate_monthly_energy_production('2024-12')
+        self.assertEqual(self.cache.cache_info()["hits"], 1)
+
+    def test_default_cache(self):
+        self.assertIs(get_production_profile_cache(), self.cache)
+
+if __name__ == '__main__':
+    unittest.main()
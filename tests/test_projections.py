@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from utils.projections import (growth_factors, escalation_factors, degradation_factors, accumulate,
+                               project_lifetime_production, project_current_payments, project_new_lifetime_payments)
+
+class TestProjections(unittest.TestCase):
+    def test_escalation_factors(self):
+        factors = escalation_factors(0.05, 25)
+        self.assertEqual(factors.tolist(), [1.05 ** i for i in range(25)])
+        self.assertIs(escalation_factors(0.05, 25), factors)
+        with self.assertRaises(ValueError):
+            factors[0] = 2
+
+    def test_degradation_factors(self):
+        self.assertEqual(degradation_factors(0.005, 10).tolist(), [(1 - 0.005) ** i for i in range(10)])
+        self.assertEqual(degradation_factors([0.005, 0.01], 3).shape, (2, 3))
+
+    def test_growth_factors_per_row(self):
+        factors = growth_factors(np.array([0.03, 0.05]), 4)
+        self.assertEqual(factors.tolist(), [[1.03 ** i for i in range(4)], [1.05 ** i for i in range(4)]])
+
+    def test_accumulate(self):
+        values = [0.1, 0.2, 0.3, 1e16, -1e16, 0.7]
+        self.assertEqual(accumulate(values).tolist(), [sum(values[:i + 1]) for i in range(len(values))])
+        self.assertEqual(accumulate([[1, 2], [3, 4]]).tolist(), [[1, 3], [3, 7]])
+
+    def test_project_lifetime_production(self):
+        expected = [round(5257.2 * (0.995 ** year), 2) for year in range(25)]
+        self.assertEqual(project_lifetime_production(5257.2, 0.005, 25).tolist(), expected)
+
+    def test_project_current_payments(self):
+        self.assertEqual(project_current_payments(1000, 0.05, 5).tolist(), [1000 * 1.05 ** i for i in range(5)])
+        self.assertEqual(project_current_payments([1000, 2000], [0.05, 0.1], 3).shape, (2, 3))
+
+    def test_project_new_lifetime_payments(self):
+        year_1_payment = 5000.0
+        fix_charge_payment = 600.0
+        year_1_consumption = 4000.0
+        new_lifetime_consumption = [4000, 4100, 0, 4300]
+        expected = [year_1_payment]
+        for i in range(1, 4):
+            if new_lifetime_consumption[i] == 0:
+                expected.append(round(fix_charge_payment * 1.05 ** i, 2))
+            else:
+                expected.append(round(((year_1_payment - fix_charge_payment) * (new_lifetime_consumption[i] / year_1_consumption)
+                                       + fix_charge_payment) * 1.05 ** i, 2))
+        actual = project_new_lifetime_payments(year_1_payment, fix_charge_payment, year_1_consumption, new_lifetime_consumption, 0.05)
+        self.assertEqual(actual.tolist(), expected)
+
+        batch = project_new_lifetime_payments([year_1_payment] * 3, [fix_charge_payment] * 3, [year_1_consumption] * 3,
+                                              [new_lifetime_consumption] * 3, 0.05)
+        self.assertEqual(batch.tolist(), [expected] * 3)
+
+    def test_project_new_lifetime_payments_without_year_1_consumption(self):
+        actual = project_new_lifetime_payments([800.68, 5000.0], [800.68, 600.0], [0, 4000.0], [[-120, 0, 35, 70], [4000, 4100, 0, 4300]], 0.05)
+        self.assertEqual(actual[0].tolist(), [800.68] + [round(800.68 * 1.05 ** i, 2) for i in range(1, 4)])
+        self.assertTrue(np.isfinite(actual).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,6 +68,27 @@ class TestPVSystem(unittest.TestCase):
         for expected, actual in zip(expected_lifetime_production, actual_lifetime_production):
             self.assertEqual(expected, actual, msg=f"Expected {expected}, got {actual}")
 
+    def test_caches_are_keyed_by_parameters(self):
+        pv_system = PVSystem(pv_module=self.pv_module, pv_module_count=10, efficiency=0.95, location=self.mock_location)
+        self.assertEqual(pv_system.calculate_installation_cost(10000), 10000 * pv_system.system_size)
+        self.assertEqual(pv_system.calculate_installation_cost(), 20000 * pv_system.system_size)
+
+        # February has 29 days in the 2024 billing period
+        production_2023 = pv_system.calculate_monthly_energy_production('2023-12')
+        production_2024 = pv_system.calculate_monthly_energy_production('2024-12')
+        self.assertNotEqual(production_2023, production_2024)
+        self.assertEqual(self.mock_location.get_solar_hours.call_count, 2)
+        pv_system.calculate_monthly_energy_production('2023-12')
+        self.assertEqual(self.mock_location.get_solar_hours.call_count, 2)
+
+    def test_efficiency_change_keeps_installation_cost(self):
+        pv_system = PVSystem(pv_module=self.pv_module, pv_module_count=10, efficiency=0.95, location=self.mock_location)
+        installation_cost = pv_system.calculate_installation_cost()
+        production = pv_system.calculate_lifetime_production(self.end_year_month)
+        pv_system.efficiency = 0.5
+        self.assertEqual(pv_system.calculate_installation_cost(), installation_cost)
+        self.assertLess(pv_system.calculate_lifetime_production(self.end_year_month)[0], production[0])
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
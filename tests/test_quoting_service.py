@@ -0,0 +1,144 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.rate_factory import create_rate
+from calculations.solar_calculator import SolarSavingsCalculator
+from service.quote_engine import QuoteEngine, normalize_scenario
+from service.server import QuotingServer, ServiceMetrics
+import config
+
+SCENARIO = {"city": "Mexicali", "rate": "PDBT", "end_year_month": "2024-07", "consumption": [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250],
+            "pv_module_capacity": 0.45, "tilt_angle": 32, "module_efficiency": 0.95, "system_efficiency": 0.85, "pv_module_count": 10}
+
+class TestQuoteEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = QuoteEngine(config.DATABASE_PATH)
+
+    def test_normalize_scenario(self):
+        scenario = normalize_scenario(dict(SCENARIO, rate="pdbt", cost_per_kw="18000"))
+        self.assertEqual(scenario["rate"], "PDBT")
+        self.assertEqual(scenario["cost_per_kw"], 18000)
+        self.assertEqual(scenario["annual_inflation"], 0.05)
+        self.assertEqual(scenario["lifespan"], 25)
+        for payload in [[], dict(SCENARIO, rate=None), {"city": "Mexicali"}, dict(SCENARIO, consumption=[100] * 6),
+                        dict(SCENARIO, rate="XYZ"), dict(SCENARIO, annual_inflation=[0.05])]:
+            with self.assertRaises(ValueError):
+                normalize_scenario(payload)
+
+    def test_quote_matches_calculator(self):
+        for payload in [SCENARIO, dict(SCENARIO, rate="RESIDENTIAL", end_year_month="2024-12", consumption=[300 + 10 * i for i in range(12)]),
+                        dict(SCENARIO, rate="GDMTO", demand=[10] * 12, power_factor=[92] * 12, cost_per_kw=18000, annual_inflation=0.04)]:
+            scenario = normalize_scenario(payload)
+            location = Location(scenario["city"])
+            rate = create_rate(scenario["rate"], location, scenario["end_year_month"])
+            pv_module = PVModule(scenario["pv_module_capacity"], scenario["tilt_angle"], scenario["module_efficiency"])
+            pv_system = PVSystem(pv_module, scenario["pv_module_count"], scenario["system_efficiency"], location)
+            extra_params = {field: scenario[field] for field in ['demand', 'power_factor'] if field in scenario}
+            calculator = SolarSavingsCalculator(rate, pv_system, scenario["consumption"], **extra_params)
+            expected = calculator.generate_report(scenario["cost_per_kw"], scenario["annual_inflation"]).to_dict()
+
+            quote = self.engine.quote(scenario)
+            self.assertEqual(quote["report"], expected)
+            self.assertEqual(quote["rate"], scenario["rate"])
+            self.assertEqual(self.engine.quote(scenario), quote)
+
+    def test_invalid_quotes(self):
+        for payload in [dict(SCENARIO, city="Atlantis"), dict(SCENARIO, tilt_angle=5), dict(SCENARIO, end_year_month="2030-12")]:
+            with self.assertRaises(ValueError):
+                self.engine.quote(normalize_scenario(payload))
+
+    def test_non_finite_quote(self):
+        with patch.object(SolarSavingsCalculator, 'calculate_roi', return_value=float('-inf')):
+            with self.assertRaises(ValueError):
+                self.engine.quote(normalize_scenario(dict(SCENARIO, pv_module_count=25)))
+
+class TestServiceMetrics(unittest.TestCase):
+    def test_snapshot(self):
+        metrics = ServiceMetrics()
+        metrics.record_request('/quote', 200, 0.004)
+        metrics.record_request('/quote', 400, 0.0001)
+        metrics.record_quote(0.003)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["requests"], 2)
+        self.assertEqual(snapshot["responses"], {"200": 1, "400": 1})
+        self.assertGreater(snapshot["throughput"], 0)
+        self.assertEqual(snapshot["latency"]["/quote"]["count"], 2)
+        self.assertEqual(snapshot["latency"]["/quote"]["p99"], 0.005)
+        self.assertEqual(snapshot["latency"]["quote.compute"]["count"], 1)
+
+class TestQuotingServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = QuotingServer(config.DATABASE_PATH, workers=1, max_pending=2)
+        await self.server.start('127.0.0.1', 0)
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def _request(self, requests):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+        responses = []
+        try:
+            for method, path, body in requests:
+                writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                head = (await reader.readuntil(b'\r\n\r\n')).decode().split('\r\n')
+                headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+                payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+                responses.append((int(head[0].split()[1]), payload))
+        finally:
+            writer.close()
+            await writer.wait_closed()
+        return responses
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            QuotingServer(workers=0)
+        with self.assertRaises(ValueError):
+            QuotingServer(max_pending=-1)
+
+    async def test_endpoints(self):
+        body = json.dumps(SCENARIO).encode()
+        responses = await self._request([
+            ('POST', '/quote', body),
+            ('POST', '/quote', b'{"city": '),
+            ('POST', '/quote', json.dumps(dict(SCENARIO, city="Atlantis")).encode()),
+            ('GET', '/health', b''),
+            ('GET', '/quote', b''),
+            ('GET', '/missing', b''),
+            ('GET', '/metrics', b''),
+        ])
+        self.assertEqual([status for status, _ in responses], [200, 400, 422, 200, 405, 404, 200])
+        self.assertEqual(responses[0][1], QuoteEngine(config.DATABASE_PATH).quote(normalize_scenario(SCENARIO)))
+        self.assertEqual(responses[2][1], {"error": "Location Atlantis is not available"})
+        self.assertEqual(responses[3][1], {"status": "ok", "workers": 1, "pending": 0})
+
+        metrics = responses[6][1]
+        self.assertEqual(metrics["requests"], 6)
+        self.assertEqual(metrics["responses"], {"200": 2, "400": 1, "404": 1, "405": 1, "422": 1})
+        self.assertEqual(metrics["latency"]["/quote"]["count"], 4)
+        self.assertEqual(metrics["latency"]["quote.compute"]["count"], 2)
+
+    def test_non_finite_response(self):
+        response = self.server._response(200, {"roi": float('-inf')}, True)
+        self.assertTrue(response.startswith(b"HTTP/1.1 500 Internal Server Error"))
+        self.assertNotIn(b"Infinity", response)
+
+    async def test_malformed_request(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+        writer.write(b"GET\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 Bad Request"))
+
+    async def test_pending_quotes_are_bounded(self):
+        results = await asyncio.gather(*[self.server.handle('POST', '/quote', json.dumps(SCENARIO).encode()) for _ in range(5)])
+        self.assertEqual([status for status, _ in results], [200, 200, 503, 503, 503])
+        self.assertEqual(results[0][1], results[1][1])
+
+if __name__ == '__main__':
+    unittest.main()
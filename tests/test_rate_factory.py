@@ -0,0 +1,32 @@
+import unittest
+from database.tariff_snapshot import TariffSnapshot
+from models.location import Location
+from models.pdbt_rate import PdbtRate
+from models.gdmto_rate import GdmtoRate
+from models.residential_rate import ResidentialRate
+from models.rate_factory import create_rate, validate_rate_type
+import config
+
+class TestRateFactory(unittest.TestCase):
+    def test_validate_rate_type(self):
+        self.assertEqual(validate_rate_type('pdbt'), 'PDBT')
+        with self.assertRaises(ValueError):
+            validate_rate_type('1F')
+        with self.assertRaises(ValueError):
+            validate_rate_type(None)
+
+    def test_create_rate(self):
+        location = Location('Mexicali')
+        self.assertIsInstance(create_rate('PDBT', location, '2024-07'), PdbtRate)
+        self.assertIsInstance(create_rate('gdmto', location, '2024-07'), GdmtoRate)
+        self.assertIsInstance(create_rate('Residential', location, '2024-12'), ResidentialRate)
+
+    def test_create_rate_from_snapshot(self):
+        snapshot = TariffSnapshot(config.DATABASE_PATH)
+        location = Location('Mexicali', snapshot.solar_hours_data, snapshot.location_data)
+        for rate_type, end_year_month in [('PDBT', '2024-07'), ('GDMTO', '2024-07'), ('RESIDENTIAL', '2024-12')]:
+            rate = create_rate(rate_type, location, end_year_month, snapshot)
+            self.assertEqual(rate._charges, create_rate(rate_type, Location('Mexicali'), end_year_month)._charges)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import Mock
+import numpy as np
 from database.residential_rates_data import ResidentialRatesData
 from models.residential_rate import ResidentialRate
 from models.location import Location
@@ -27,5 +28,32 @@ class TestResidentialRateYearly(unittest.TestCase):
             payment = residential_rate._calculate_payment(self.mock_charges[i], consumption)
             self.assertAlmostEqual(payment, expected_payments[i])
 
+    def test_calculate_batch_monthly_payments(self):
+        boundaries = [0, 24, 25, 75, 76, 150, 175, 200, 300, 301, 450, 600, 750, 900, 1200, 2500, 2501]
+        for rate in ['1C', '1D', '1E', '1F']:
+            self.location.residential_rate = rate
+            residential_rate = ResidentialRate(self.location, self.end_year_month, self.residential_rates_data)
+            monthly_consumptions = np.array([[consumption + 0.5 * month for month in range(12)] for consumption in boundaries])
+            monthly_consumptions = np.vstack([monthly_consumptions, np.array([[consumption] * 12 for consumption in boundaries])])
+            batch_payments = residential_rate.calculate_batch_monthly_payments(monthly_consumptions)
+            for consumptions, payments in zip(monthly_consumptions, batch_payments):
+                self.assertEqual(payments.tolist(), residential_rate.calculate_monthly_payments(consumptions.tolist()))
+
+    def test_charges_fetched_on_first_bill(self):
+        residential_rate = ResidentialRate(self.location, self.end_year_month, self.residential_rates_data)
+        self.residential_rates_data.get_charges.assert_not_called()
+        residential_rate.calculate_monthly_payments([100] * 12)
+        residential_rate.calculate_batch_monthly_payments([[100] * 12])
+        self.assertEqual(residential_rate.charges, self.mock_charges)
+        self.residential_rates_data.get_charges.assert_called_once()
+
+    def test_undefined_charge_tiers(self):
+        self.location.residential_rate = '1A'
+        residential_rate = ResidentialRate(self.location, self.end_year_month, self.residential_rates_data)
+        with self.assertRaises(ValueError):
+            residential_rate.calculate_monthly_payments([100] * 12)
+        with self.assertRaises(ValueError):
+            residential_rate.calculate_batch_monthly_payments([[100] * 12])
+
 if __name__ == '__main__':
     unittest.main()
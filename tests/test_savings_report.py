@@ -0,0 +1,120 @@
+import json
+import math
+import pickle
+import struct
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from database.commercial_rates_data import CommercialRatesData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+from calculations.savings_report import SavingsReport, FIELDS, pack_reports, unpack_reports
+
+class TestSavingsReport(unittest.TestCase):
+    def setUp(self):
+        self.location = Mock(spec=Location)
+        self.location.region_id = 1
+        self.location.get_solar_hours.return_value = [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+        pdbt_rate_data = Mock(spec=CommercialRatesData)
+        pdbt_rate_data.get_charges.return_value = [{'transmission': 0.1758, 'distribution': 0.734, 'cenace': 0.0074,
+                                                    'supplier': 53.58, 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for _ in range(12)]
+        self.rate = PdbtRate(self.location, '2024-12', pdbt_rate_data)
+        self.pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        self.consumption = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+        self.pv_system = PVSystem(self.pv_module, 12, 0.85, self.location)
+        self.calculator = SolarSavingsCalculator(self.rate, self.pv_system, self.consumption)
+
+    def test_generate_report(self):
+        report = self.calculator.generate_report(15000, annual_inflation=0.04)
+        self.assertEqual(report.system_size, self.pv_system.system_size)
+        self.assertEqual(report.roi, self.calculator.calculate_roi(15000, 0.04))
+        self.assertEqual(report.payback_period, self.calculator.calculate_payback_period(15000, 0.04))
+        self.assertEqual(report.irr, self.calculator.calculate_irr(15000, 0.04))
+        self.assertEqual(report.kg_co2_saved, self.calculator.calculate_environmental_impact()["kg_co2_saved"])
+        self.assertEqual(list(report.new_monthly_payment), self.calculator.calculate_new_monthly_payment())
+        self.assertEqual(list(report.cash_flow), self.calculator.calculate_cash_flow(15000, annual_inflation=0.04))
+        self.assertEqual(report.lifespan, 25)
+        self.assertEqual(report.lifetime_savings, round(sum(self.calculator.calculate_yearly_payments_savings(0.04)), 2))
+
+    def test_batch_reports_match_scalar(self):
+        counts = [2, 12, 40]
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.rate, self.pv_system, self.consumption, counts)
+        reports = batch.generate_reports(15000, annual_inflation=0.04)
+        self.assertEqual(len(reports), 3)
+        for count, report in zip(counts, reports):
+            calculator = SolarSavingsCalculator(self.rate, PVSystem(self.pv_module, count, 0.85, self.location), self.consumption)
+            self.assertEqual(report, calculator.generate_report(15000, annual_inflation=0.04))
+
+    def test_missing_payback_is_none(self):
+        report = self.calculator.generate_report(10 ** 6)
+        self.assertIsNone(report.payback_period)
+        self.assertIsNone(SavingsReport.from_bytes(report.to_bytes()).payback_period)
+        self.assertIsNone(SavingsReport.from_json(report.to_json()).payback_period)
+
+    def test_json_round_trip(self):
+        report = self.calculator.generate_report()
+        data = report.to_json()
+        self.assertEqual(set(json.loads(data)), set(FIELDS))
+        self.assertEqual(SavingsReport.from_json(data), report)
+
+    def test_binary_round_trip(self):
+        report = self.calculator.generate_report()
+        data = report.to_bytes()
+        self.assertLess(len(data), len(report.to_json()))
+        self.assertEqual(SavingsReport.from_bytes(data), report)
+        self.assertEqual(pickle.loads(pickle.dumps(report)), report)
+
+    def test_pack_reports(self):
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.rate, self.pv_system, self.consumption, [2, 12, 40])
+        reports = batch.generate_reports()
+        self.assertEqual(unpack_reports(pack_reports(reports)), reports)
+        self.assertEqual(unpack_reports(b''), [])
+
+    def test_invalid_data(self):
+        data = self.calculator.generate_report().to_bytes()
+        with self.assertRaises(ValueError):
+            SavingsReport.from_bytes(data[:-8])
+        with self.assertRaises(ValueError):
+            SavingsReport.from_bytes(b'\x09' + data[1:])
+        values = self.calculator.generate_report().to_dict()
+        values["cash_flow"] = values["cash_flow"][:-1]
+        with self.assertRaises(ValueError):
+            SavingsReport.from_dict(values)
+        del values["roi"]
+        with self.assertRaises(ValueError):
+            SavingsReport.from_dict(values)
+
+    def test_non_finite_values(self):
+        values = self.calculator.generate_report().to_dict()
+        for field, value in [("roi", -math.inf), ("offset", math.nan), ("payback_period", math.inf), ("cash_flow", [math.nan] * 26)]:
+            with self.subTest(field=field):
+                with self.assertRaises(ValueError):
+                    SavingsReport.from_dict(dict(values, **{field: value}))
+        self.assertIsNone(SavingsReport.from_dict(dict(values, irr=math.nan)).irr)
+
+        data = bytearray(self.calculator.generate_report().to_bytes())
+        struct.pack_into('<d', data, 3 + 2 * 8, -math.inf)
+        with self.assertRaises(ValueError):
+            SavingsReport.from_bytes(data)
+
+        batch = BatchSolarSavingsCalculator.from_pv_system(self.rate, self.pv_system, self.consumption, [2, 12])
+        rows = np.array([np.frombuffer(report.to_bytes()[3:]) for report in batch.generate_reports()])
+        rows[0, 4] = math.nan
+        self.assertIsNone(SavingsReport.from_rows(rows, 25)[0].irr)
+        rows[1, 40] = math.inf
+        with self.assertRaises(ValueError):
+            SavingsReport.from_rows(rows, 25)
+
+    def test_slots(self):
+        report = self.calculator.generate_report()
+        with self.assertRaises(AttributeError):
+            report.extra = 1
+        with self.assertRaises(AttributeError):
+            report.roi = 1
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import Mock
+from database.commercial_rates_data import CommercialRatesData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.sensitivity import SensitivityAnalyzer
+
+class TestSensitivityAnalyzer(unittest.TestCase):
+    def setUp(self):
+        solar_hours = {
+            17: [3.9, 4.6, 5.6, 6.6, 7.3, 7.6, 7.2, 6.9, 6.2, 5.3, 4.3, 3.7],
+            32: [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9],
+            47: [4.2, 5.0, 5.7, 6.3, 6.6, 6.7, 6.4, 6.4, 6.1, 5.5, 4.7, 4.0],
+        }
+        self.location = Mock(spec=Location)
+        self.location.region_id = 1
+        self.location.get_solar_hours.side_effect = lambda tilt: solar_hours.get(tilt)
+        self.location.get_tilt_angles.return_value = sorted(solar_hours)
+        pdbt_rate_data = Mock(spec=CommercialRatesData)
+        pdbt_rate_data.get_charges.return_value = [{'transmission': 0.1758, 'distribution': 0.734, 'cenace': 0.0074,
+                                                    'supplier': 53.58, 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for _ in range(12)]
+        self.rate = PdbtRate(self.location, '2024-12', pdbt_rate_data)
+        self.pv_system = PVSystem(PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95), 20, 0.85, self.location)
+        self.consumption = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+        self.analyzer = SensitivityAnalyzer(self.rate, self.pv_system, self.consumption)
+
+    def _calculator(self, tilt_angle=32, efficiency=0.85):
+        pv_system = PVSystem(PVModule(capacity=0.45, tilt_angle=tilt_angle, efficiency=0.95), 20, efficiency, self.location)
+        return SolarSavingsCalculator(self.rate, pv_system, self.consumption)
+
+    def test_invalid_variations(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze({'capacity': (0.3, 0.5)})
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze({'cost_per_kw': 15000})
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze(sort_by='npv')
+
+    def test_base_matches_calculator(self):
+        base = self.analyzer.analyze()["base"]
+        calculator = self._calculator()
+        self.assertEqual(base["roi"], calculator.calculate_roi())
+        self.assertEqual(base["payback_period"], calculator.calculate_payback_period())
+        self.assertEqual(base["lifetime_savings"], round(sum(calculator.calculate_yearly_payments_savings()), 2))
+
+    def test_perturbations_match_calculator(self):
+        table = {row["parameter"]: row for row in self.analyzer.analyze()["parameters"]}
+        self.assertEqual(set(table), set(SensitivityAnalyzer.PARAMETERS))
+
+        high_tilt = self._calculator(tilt_angle=47)
+        self.assertEqual(table["tilt_angle"]["high"], 47)
+        self.assertEqual(table["tilt_angle"]["payback_period"]["high"], high_tilt.calculate_payback_period())
+        low_efficiency = self._calculator(efficiency=0.8)
+        self.assertEqual(table["efficiency"]["roi"]["low"], low_efficiency.calculate_roi())
+
+        cost = table["cost_per_kw"]
+        self.assertGreater(cost["payback_period"]["high_delta"], 0)
+        self.assertLess(cost["payback_period"]["low_delta"], 0)
+        self.assertEqual(cost["lifetime_savings"]["swing"], 0)
+        inflation = table["annual_inflation"]
+        self.assertEqual(inflation["lifetime_savings"]["high"],
+                         round(sum(self._calculator().calculate_yearly_payments_savings(0.06)), 2))
+
+    def test_sorted_by_swing(self):
+        table = self.analyzer.analyze(sort_by='roi')["parameters"]
+        swings = [row["roi"]["swing"] for row in table]
+        self.assertEqual(swings, sorted(swings, reverse=True))
+
+    def test_solar_hours_loaded_once_per_tilt(self):
+        self.analyzer.analyze()
+        self.analyzer.analyze({'tilt_angle': (17, 47)})
+        self.assertEqual(self.location.get_solar_hours.call_count, 3)
+
+    def test_default_tilt_variations(self):
+        self.assertEqual(self.analyzer.default_variations()["tilt_angle"], (17, 47))
+        location = Location('Mexicali')
+        rate = PdbtRate(location, '2024-07')
+        for tilt_angle, expected in [(0, (0, 17)), (90, (47, 90))]:
+            pv_system = PVSystem(PVModule(capacity=0.45, tilt_angle=tilt_angle, efficiency=0.95), 20, 0.85, location)
+            analyzer = SensitivityAnalyzer(rate, pv_system, self.consumption)
+            self.assertEqual(analyzer.default_variations()["tilt_angle"], expected)
+            row = next(row for row in analyzer.analyze()["parameters"] if row["parameter"] == "tilt_angle")
+            self.assertEqual(row["low"], expected[0])
+            self.assertEqual(row["high"], expected[1])
+
+    def test_missing_tilt(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze({'tilt_angle': (10, 60)})
+
+if __name__ == '__main__':
+    unittest.main()
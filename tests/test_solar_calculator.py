@@ -1,8 +1,13 @@
+import math
 import unittest
 from unittest.mock import Mock
+from models.location import Location
+from models.pv_module import PVModule
 from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
 from models.rate import Rate
 from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.net_metering import NetMeteringEngine
 
 class TestSolarSavingsCalculator(unittest.TestCase):
     def setUp(self):
@@ -261,6 +266,64 @@ class TestSolarSavingsCalculator(unittest.TestCase):
         expected_trees_planted = round(expected_co2_saved * trees_planted_per_kg_co2, 2)
         actual_trees_planted = environmental_impact["trees_planted"]
         self.assertEqual(actual_trees_planted, expected_trees_planted)
-        
+
+    def test_new_monthly_payment_is_cached(self):
+        self.calculator.calculate_new_monthly_payment()
+        self.calculator.calculate_new_monthly_payment()
+        self.assertEqual(self.mock_rate.calculate_monthly_payments.call_count, 1)
+
+    def test_cumulative_energy_savings_cache(self):
+        self.mock_pv_system.calculate_lifetime_production.return_value = [1200, 1150, 1100]
+        self.mock_pv_system.calculate_installation_cost.return_value = 10000
+        self.calculator.calculate_cash_flow(cumulative=True)
+        cumulative_savings = self.calculator.calculate_yearly_energy_savings(cumulative=True)
+        self.assertEqual(self.calculator.calculate_yearly_energy_savings(cumulative=True), cumulative_savings)
+        self.assertEqual(cumulative_savings, [1200, 2350, 3450])
+
+    def test_payment_caches_are_keyed_by_inflation(self):
+        self.mock_rate.calculate_monthly_payments.side_effect = lambda consumption: [50 + 2 * value for value in consumption]
+        self.mock_pv_system.calculate_lifetime_production.return_value = [1200, 1150, 1100]
+        savings_5 = self.calculator.calculate_yearly_payments_savings(0.05)
+        savings_10 = self.calculator.calculate_yearly_payments_savings(0.10)
+        self.assertNotEqual(savings_5, savings_10)
+        self.assertEqual(self.calculator.calculate_yearly_payments_savings(0.05), savings_5)
+
+    def test_cash_flow_cache_is_keyed_by_cost_per_kw(self):
+        self.mock_pv_system.calculate_installation_cost.side_effect = lambda cost_per_kw: cost_per_kw * 2
+        self.calculator.calculate_yearly_payments_savings = Mock(return_value=[100, 200])
+        self.assertEqual(self.calculator.calculate_cash_flow(15000)[0], -30000)
+        self.assertEqual(self.calculator.calculate_cash_flow()[0], -40000)
+        self.assertEqual(self.calculator.calculate_cash_flow(15000, cumulative=True), [-30000, -29900, -29700])
+
+    def test_net_metering_change_keeps_upstream_stages(self):
+        self.mock_pv_system.calculate_lifetime_production.return_value = [1200, 1150, 1100]
+        self.calculator.calculate_yearly_payments_savings()
+        self.calculator.net_metering = NetMeteringEngine(carry_over=False)
+        self.assertTrue(self.calculator._cache.is_cached('current_monthly_payment'))
+        self.assertTrue(self.calculator._cache.is_cached('offset'))
+        self.assertFalse(self.calculator._cache.is_cached('new_monthly_consumption'))
+        self.assertFalse(self.calculator._cache.is_cached('yearly_payments_savings', 0.05))
+
+        call_count = self.mock_rate.calculate_monthly_payments.call_count
+        self.calculator.calculate_yearly_payments_savings()
+        # New monthly payment and the fix charge are billed again, the current payment stays cached
+        self.assertEqual(self.mock_rate.calculate_monthly_payments.call_count, call_count + 2)
+
+    # Year 1 is fully offset while degraded later years draw from the grid again
+    def test_offset_just_above_one(self):
+        location = Location('Mexicali')
+        pv_system = PVSystem(PVModule(0.45, 32, 0.95), 25, 0.85, location)
+        rate = PdbtRate(location, '2024-07')
+        calculator = SolarSavingsCalculator(rate, pv_system, [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250])
+        self.assertEqual(calculator.calculate_offset(), 1.05)
+        self.assertEqual(sum(calculator.calculate_new_monthly_consumption()), 0)
+        self.assertGreater(calculator.calculate_new_lifetime_consumption()[-1], 0)
+
+        fix_charge_payment = sum(rate.calculate_monthly_payments([0] * 12))
+        self.assertEqual(calculator.calculate_new_lifetime_payments(),
+                         [round(fix_charge_payment, 2)] + [round(fix_charge_payment * 1.05 ** i, 2) for i in range(1, 25)])
+        self.assertTrue(math.isfinite(calculator.calculate_roi()))
+        self.assertIsNotNone(calculator.calculate_payback_period())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -22,6 +22,11 @@ class TestSolarHours(unittest.TestCase):
                 self.assertIsNotNone(solar_hours, f"Data should exist for {city} with tilt {tilt}°")
                 self.assertEqual(len(solar_hours), 12, f"Solar hours list for {city} with tilt {tilt}° should have 12 months data")
     
+    def test_tilt_angles(self):
+        self.assertEqual(Location('Mexicali', self.solar_hours_data).get_tilt_angles(), [0, 17, 32, 47, 90])
+        self.assertEqual(Location('San Felipe', self.solar_hours_data).get_tilt_angles(), [0, 16, 31, 46, 90])
+        self.assertEqual(Location('Borderland', self.solar_hours_data).get_tilt_angles(), [])
+
     def test_invalid_inputs(self):
         non_existing_location = Location("Borderland", self.solar_hours_data)
         self.assertIsNone(non_existing_location.get_solar_hours(15))
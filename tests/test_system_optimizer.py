@@ -0,0 +1,124 @@
+import math
+import unittest
+from unittest.mock import Mock, patch
+import numpy as np
+from database.commercial_rates_data import CommercialRatesData
+from models.location import Location
+from models.pv_module import PVModule
+from models.pv_system import PVSystem
+from models.pdbt_rate import PdbtRate
+from models.residential_rate import ResidentialRate
+from calculations.batch_calculator import BatchSolarSavingsCalculator
+from calculations.solar_calculator import SolarSavingsCalculator
+from calculations.system_optimizer import SystemSizeOptimizer
+
+class TestSystemSizeOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.location = Mock(spec=Location)
+        self.location.region_id = 1
+        self.location.get_solar_hours.return_value = [4.1, 4.9, 5.8, 6.7, 7.2, 7.4, 7.0, 6.8, 6.3, 5.5, 4.6, 3.9]
+        pdbt_rate_data = Mock(spec=CommercialRatesData)
+        pdbt_rate_data.get_charges.return_value = [{'transmission': 0.1758, 'distribution': 0.734, 'cenace': 0.0074,
+                                                    'supplier': 53.58, 'services': 0.006, 'energy': 0.588, 'capacity': 0.89} for _ in range(12)]
+        self.rate = PdbtRate(self.location, '2024-12', pdbt_rate_data)
+        self.pv_module = PVModule(capacity=0.45, tilt_angle=32, efficiency=0.95)
+        self.pv_system = PVSystem(self.pv_module, 1, 0.85, self.location)
+        self.consumption = [1200, 1100, 1000, 1300, 1800, 2400, 2600, 2700, 2300, 1700, 1300, 1250]
+        self.cost_per_kw = 15000
+        self.optimizer = SystemSizeOptimizer(self.rate, self.pv_system, self.consumption, cost_per_kw=self.cost_per_kw)
+
+    def _sweep(self, objective, discount_rate=0.0):
+        sweep_optimizer = SystemSizeOptimizer(self.rate, self.pv_system, self.consumption, cost_per_kw=self.cost_per_kw)
+        results = sweep_optimizer.evaluate(range(1, self.optimizer.max_pv_module_count + 1), discount_rate)
+        return max(results, key=lambda result: result[objective])
+
+    def test_evaluate_matches_calculator(self):
+        result = self.optimizer.evaluate([20])[0]
+        pv_system = PVSystem(self.pv_module, 20, 0.85, self.location)
+        calculator = SolarSavingsCalculator(self.rate, pv_system, self.consumption)
+        self.assertEqual(result["offset"], calculator.calculate_offset())
+        self.assertEqual(result["roi"], round((sum(calculator.calculate_cash_flow(self.cost_per_kw)[1:]) - pv_system.calculate_installation_cost(self.cost_per_kw))
+                                              / pv_system.calculate_installation_cost(self.cost_per_kw), 2))
+        self.assertEqual(result["npv"], round(sum(calculator.calculate_cash_flow(self.cost_per_kw)), 2))
+        self.assertEqual(result["irr"], calculator.calculate_irr(self.cost_per_kw))
+
+    def test_maximize_npv(self):
+        expected = self._sweep('npv')
+        actual = self.optimizer.maximize('npv')
+        self.assertEqual(actual["pv_module_count"], expected["pv_module_count"])
+        self.assertLess(self.optimizer.evaluations, 6)
+
+    def test_maximize_discounted_npv(self):
+        expected = self._sweep('npv', discount_rate=0.08)
+        actual = self.optimizer.maximize('npv', discount_rate=0.08)
+        self.assertEqual(actual["pv_module_count"], expected["pv_module_count"])
+
+    def test_maximize_roi(self):
+        expected = self._sweep('roi')
+        actual = self.optimizer.maximize('roi')
+        self.assertEqual(actual["roi"], expected["roi"])
+
+    # The default window runs past offset 1, where year 1 is fully offset but degraded later years are not
+    def test_maximize_residential(self):
+        location = Location('Mexicali')
+        pv_system = PVSystem(self.pv_module, 1, 0.85, location)
+        rate = ResidentialRate(location, '2024-12')
+        sweep = SystemSizeOptimizer(rate, pv_system, self.consumption, cost_per_kw=self.cost_per_kw)
+        results = sweep.evaluate(range(1, sweep.max_pv_module_count + 1))
+        self.assertTrue(any(1 <= result["offset"] < 1.1 for result in results))
+        for objective in SystemSizeOptimizer.OBJECTIVES:
+            expected = max(results, key=lambda result: result[objective])
+            actual = SystemSizeOptimizer(rate, pv_system, self.consumption, cost_per_kw=self.cost_per_kw).maximize(objective)
+            self.assertTrue(math.isfinite(actual[objective]))
+            self.assertEqual(actual[objective], expected[objective])
+
+    def test_maximize_skips_non_finite_objectives(self):
+        calculate_roi = BatchSolarSavingsCalculator.calculate_roi
+        def roi_without_full_offset(calculator, *args):
+            return np.where(calculator.calculate_offset() >= 0.9, -np.inf, calculate_roi(calculator, *args))
+
+        with patch.object(BatchSolarSavingsCalculator, 'calculate_roi', roi_without_full_offset):
+            actual = self.optimizer.maximize('roi')
+            results = self.optimizer.evaluate(range(1, self.optimizer.max_pv_module_count + 1))
+        expected = max((result for result in results if math.isfinite(result["roi"])), key=lambda result: result["roi"])
+        self.assertEqual(actual, expected)
+        self.assertTrue(any(result["roi"] == -np.inf for result in results))
+
+        optimizer = SystemSizeOptimizer(self.rate, self.pv_system, self.consumption, cost_per_kw=self.cost_per_kw)
+        with patch.object(BatchSolarSavingsCalculator, 'calculate_npv', lambda calculator, *args: np.full(len(calculator), np.nan)):
+            with self.assertRaises(ValueError):
+                optimizer.maximize('npv')
+
+    def test_find_count_for_offset(self):
+        for target_offset in [0.25, 0.5, 0.8, 1.0]:
+            result = self.optimizer.find_count_for_offset(target_offset)
+            self.assertGreaterEqual(result["offset"], target_offset)
+            if result["pv_module_count"] > 1:
+                previous = self.optimizer.evaluate([result["pv_module_count"] - 1])[0]
+                self.assertLess(previous["offset"], target_offset)
+
+    def test_find_count_for_offset_large_consumption(self):
+        consumption = [25000] * 12
+        optimizer = SystemSizeOptimizer(self.rate, self.pv_system, consumption, cost_per_kw=self.cost_per_kw)
+        for target_offset in [0.25, 0.5, 0.73, 1.0]:
+            result = optimizer.find_count_for_offset(target_offset)
+            self.assertGreaterEqual(result["offset"], target_offset)
+            previous = optimizer.evaluate([result["pv_module_count"] - 1])[0]
+            self.assertLess(previous["offset"], target_offset)
+        self.assertEqual(optimizer.find_count_for_offset(0.5)["pv_module_count"], 191)
+
+    def test_unreachable_offset(self):
+        optimizer = SystemSizeOptimizer(self.rate, self.pv_system, self.consumption, max_pv_module_count=5)
+        with self.assertRaises(ValueError):
+            optimizer.find_count_for_offset(0.8)
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            self.optimizer.maximize('payback')
+        with self.assertRaises(ValueError):
+            self.optimizer.find_count_for_offset(0)
+        with self.assertRaises(ValueError):
+            SystemSizeOptimizer(self.rate, self.pv_system, self.consumption, max_pv_module_count=0)
+
+if __name__ == '__main__':
+    unittest.main()
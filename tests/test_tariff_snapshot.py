@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+from database.tariff_snapshot import TariffSnapshot
+from database.location_data import LocationData
+from database.solar_hours_data import SolarHoursData
+from database.commercial_rates_data import CommercialRatesData
+from database.residential_rates_data import ResidentialRatesData
+from models.location import Location
+from models.pdbt_rate import PdbtRate
+from models.gdmto_rate import GdmtoRate
+from models.residential_rate import ResidentialRate
+import config
+
+class TestTariffSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.snapshot = TariffSnapshot(config.DATABASE_PATH)
+
+    def setUp(self):
+        self.cities = ['San Felipe', 'Mexicali', 'Tijuana', 'Atlantis']
+        self.tilts = [0, 16, 17, 31, 32, 46, 47, 90, 999]
+        self.end_months = ['2023-03', '2024-03', '2024-04', '2024-12', '2030-12']
+
+    def test_location_data(self):
+        location_data = LocationData(config.DATABASE_PATH)
+        for city in self.cities:
+            self.assertEqual(self.snapshot.location_data.get_location(city), location_data.get_location(city))
+            self.assertEqual(self.snapshot.location_data.get_region(city), location_data.get_region(city))
+            self.assertEqual(self.snapshot.location_data.get_region_id(city), location_data.get_region_id(city))
+            self.assertEqual(self.snapshot.location_data.get_residential_rate(city), location_data.get_residential_rate(city))
+            self.assertEqual(self.snapshot.location_data.get_summer_start_month(city), location_data.get_summer_start_month(city))
+
+    def test_solar_hours_data(self):
+        solar_hours_data = SolarHoursData(config.DATABASE_PATH)
+        for city in self.cities:
+            self.assertEqual(self.snapshot.solar_hours_data.get_tilt_angles(city), solar_hours_data.get_tilt_angles(city))
+            for tilt in self.tilts:
+                self.assertEqual(self.snapshot.solar_hours_data.get_solar_hours(city, tilt), solar_hours_data.get_solar_hours(city, tilt))
+
+    def test_commercial_rates_data(self):
+        for rate in ['PDBT', 'GDMTO', 'ABCD']:
+            commercial_rates_data = CommercialRatesData(rate, config.DATABASE_PATH)
+            for region_id in [1, '1', 99]:
+                for end_month in self.end_months:
+                    self.assertEqual(self.snapshot.commercial_rates_data(rate).get_charges(region_id, end_month),
+                                     commercial_rates_data.get_charges(region_id, end_month))
+        with self.assertRaises(ValueError):
+            self.snapshot.commercial_rates_data('GDMTO').get_charges(1, '2024-March')
+
+    def test_residential_rates_data(self):
+        residential_rates_data = ResidentialRatesData(config.DATABASE_PATH)
+        summer_months = [5, 6, 7, 8, 9, 10]
+        winter_months = [11, 12, 1, 2, 3, 4]
+        for rate in ['1A', '1B', '1C', '1D', '1E', '1F']:
+            self.assertEqual(self.snapshot.residential_rates_data.get_charges(rate, summer_months, winter_months, '2024-12'),
+                             residential_rates_data.get_charges(rate, summer_months, winter_months, '2024-12'))
+
+    def test_charges_are_copies(self):
+        charges = self.snapshot.commercial_rates_data('PDBT').get_charges(1, '2024-03')
+        charges[0]['supplier'] = -1
+        self.assertNotEqual(self.snapshot.commercial_rates_data('PDBT').get_charges(1, '2024-03')[0]['supplier'], -1)
+
+    def test_models_run_without_sql(self):
+        with patch('sqlite3.connect', side_effect=AssertionError("unexpected query")):
+            location = Location('Mexicali', self.snapshot.solar_hours_data, self.snapshot.location_data)
+            self.assertEqual(len(location.get_solar_hours(32)), 12)
+            monthly_consumption = [300 + i * 50 for i in range(12)]
+            pdbt_rate = PdbtRate(location, '2024-03', self.snapshot.commercial_rates_data('PDBT'))
+            self.assertEqual(len(pdbt_rate.calculate_monthly_payments(monthly_consumption)), 12)
+            gdmto_rate = GdmtoRate(location, '2024-03', self.snapshot.commercial_rates_data('GDMTO'))
+            self.assertEqual(len(gdmto_rate.calculate_monthly_payments(monthly_consumption, demand=[10] * 12, power_factor=[90] * 12)), 12)
+            residential_rate = ResidentialRate(location, '2024-12', self.snapshot.residential_rates_data)
+            self.assertEqual(len(residential_rate.calculate_monthly_payments(monthly_consumption)), 12)
+
+if __name__ == '__main__':
+    unittest.main()
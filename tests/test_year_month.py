@@ -0,0 +1,58 @@
+import unittest
+from calendar import monthrange
+from datetime import datetime
+from utils.year_month import YearMonth, billing_window, days_in_window, is_leap_year
+
+class TestYearMonth(unittest.TestCase):
+    def test_parse(self):
+        year_month = YearMonth.parse('2024-02')
+        self.assertEqual((year_month.year, year_month.month), (2024, 2))
+        self.assertEqual(YearMonth.parse('2024-2'), year_month)
+        self.assertIs(YearMonth.parse(year_month), year_month)
+        self.assertEqual(str(year_month), '2024-02')
+
+    def test_parse_matches_strptime(self):
+        for value in ['2023-09', '2023-9', '0001-01', '9999-12', '2023-13', '2023-00', '23-09', '2023/09', '2023-Jun', '2023-09-01',
+                      '２０２３-09', '-2023-09', '2023-', '']:
+            try:
+                expected = datetime.strptime(value, '%Y-%m')
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    YearMonth.parse(value)
+            else:
+                year_month = YearMonth.parse(value)
+                self.assertEqual((year_month.year, year_month.month), (expected.year, expected.month))
+
+    def test_parse_non_string(self):
+        with self.assertRaises(TypeError):
+            YearMonth.parse(202409)
+        with self.assertRaises(TypeError):
+            YearMonth('2024', 9)
+
+    def test_arithmetic(self):
+        year_month = YearMonth(2024, 1)
+        self.assertEqual(year_month - 11, YearMonth(2023, 2))
+        self.assertEqual(year_month + 12, YearMonth(2025, 1))
+        self.assertEqual(YearMonth(2024, 12) - YearMonth(2023, 1), 23)
+        self.assertLess(YearMonth(2023, 12), year_month)
+        self.assertEqual(len({YearMonth(2024, 1), YearMonth.parse('2024-01')}), 1)
+
+    def test_days_in_month(self):
+        for year in [1900, 2000, 2023, 2024]:
+            self.assertEqual(is_leap_year(year), monthrange(year, 2)[1] == 29)
+            for month in range(1, 13):
+                self.assertEqual(YearMonth(year, month).days_in_month, monthrange(year, month)[1])
+
+    def test_billing_window(self):
+        window = billing_window('2024-03')
+        self.assertEqual(len(window), 12)
+        self.assertEqual((window[0], window[-1]), (YearMonth(2023, 4), YearMonth(2024, 3)))
+        self.assertIs(billing_window('2024-03'), window)
+        self.assertEqual(YearMonth(2024, 3).window(3), (YearMonth(2024, 1), YearMonth(2024, 2), YearMonth(2024, 3)))
+
+    def test_days_in_window(self):
+        self.assertEqual(days_in_window('2024-12'), (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31))
+        self.assertEqual(days_in_window('2025-02'), (31, 30, 31, 30, 31, 31, 30, 31, 30, 31, 31, 28))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1 +1,2 @@
-from .date_utils import calculate_start_month, format_month, extract_month, extract_year, generate_months, get_winter_start_month
\ No newline at end of file
+from .date_utils import calculate_start_month, format_month, extract_month, extract_year, generate_months, get_winter_start_month
+from .year_month import YearMonth
\ No newline at end of file
@@ -0,0 +1,22 @@
+import numpy as np
+
+# np.round scales by 10**decimals before rounding, which can flip values sitting next to a .5 tie.
+# Those few values are rounded with Python's round() so batch results match the scalar models exactly.
+def round_array(values, decimals=2):
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, decimals)
+    with np.errstate(invalid='ignore'):
+        scaled = values * 10 ** decimals
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded = np.array(rounded)
+        rounded[near_tie] = [round(value, decimals) for value in values[near_tie].tolist()]
+    return rounded
+
+# Python's sum() adds left to right, numpy's sum() doesn't; summing column by column keeps results identical to the scalar path
+def sequential_sum(values):
+    values = np.asarray(values, dtype=float)
+    total = np.zeros(values.shape[:-1])
+    for i in range(values.shape[-1]):
+        total = total + values[..., i]
+    return total
@@ -0,0 +1,74 @@
+from time import perf_counter
+from utils.instrumentation import get_instrumentation, CACHE, STAGE
+
+class CacheGraph:
+    def __init__(self, dependencies, name=None):
+        self._name = name or 'CacheGraph'
+        self._dependencies = self._validate_dependencies(dependencies)
+        self._dependents = {name: set() for name in self._dependencies}
+        for name, upstream in self._dependencies.items():
+            for dependency in upstream:
+                self._dependents[dependency].add(name)
+        self._values = {name: {} for name in self._dependencies}
+
+    def _validate_dependencies(self, value):
+        dependencies = {name: tuple(upstream) for name, upstream in value.items()}
+        for name, upstream in dependencies.items():
+            for dependency in upstream:
+                if dependency not in dependencies:
+                    raise ValueError(f"Stage {name} depends on undefined stage {dependency}")
+        return dependencies
+
+    def _validate_stage(self, value):
+        if value not in self._dependencies:
+            raise ValueError(f"Stage {value} is not defined")
+        return value
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def stages(self):
+        return list(self._dependencies)
+
+    def dependencies(self, stage):
+        return self._dependencies[self._validate_stage(stage)]
+
+    def downstream(self, *stages):
+        pending = [self._validate_stage(stage) for stage in stages]
+        found = set()
+        while pending:
+            for dependent in self._dependents[pending.pop()]:
+                if dependent not in found:
+                    found.add(dependent)
+                    pending.append(dependent)
+        return found
+
+    def is_cached(self, stage, key=None):
+        return key in self._values[self._validate_stage(stage)]
+
+    # Each stage keeps one value per key, the key holds the stage's own parameters (inflation, cost per kW, ...)
+    def get(self, stage, calculate, key=None):
+        values = self._values[self._validate_stage(stage)]
+        instrumentation = get_instrumentation()
+        if instrumentation is None:
+            if key not in values:
+                values[key] = calculate()
+            return values[key]
+
+        # Stage timings include any upstream stage computed on the way
+        event_name = f"{self._name}.{stage}"
+        hit = key in values
+        instrumentation.record(CACHE, event_name, hit)
+        if not hit:
+            start = perf_counter()
+            values[key] = calculate()
+            instrumentation.record(STAGE, event_name, perf_counter() - start)
+        return values[key]
+
+    # Clears the given stages and everything computed from them, upstream values stay cached
+    def invalidate(self, *stages):
+        stages = stages or tuple(self._dependencies)
+        for stage in set(stages) | self.downstream(*stages):
+            self._values[stage].clear()
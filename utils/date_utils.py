@@ -1,25 +1,19 @@
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
-from calendar import monthrange
+from utils.year_month import YearMonth, days_in_window
 
 def calculate_start_month(end_month):
-    end_month_datetime = datetime.strptime(end_month, '%Y-%m')
-    start_month_datetime = end_month_datetime - relativedelta(months=11)
-    start_month = start_month_datetime.strftime('%Y-%m')
-    return start_month
+    start_month = YearMonth.parse(end_month) - 11
+    return str(start_month)
 
 def format_month(year, month):
     year_month = f"{year}-{month:02d}"
     return year_month
 
 def extract_month(year_month):
-    month_datetime = datetime.strptime(year_month, '%Y-%m')
-    month = month_datetime.month
+    month = YearMonth.parse(year_month).month
     return month
     
 def extract_year(year_month):
-    year_datetime = datetime.strptime(year_month, '%Y-%m')
-    year = year_datetime.year
+    year = YearMonth.parse(year_month).year
     return year
 
 def generate_months(start_month):
@@ -39,13 +33,6 @@ def get_winter_start_month(summer_start_month):
     winter_start_month = (summer_start_month + season_duration) % 12 or 12
     return winter_start_month
 
+# Memoized per end month, callers get their own list
 def generate_days_in_month(end_year_month):
-    start_year_month = calculate_start_month(end_year_month)
-    start_month = extract_month(start_year_month)
-    start_year = extract_year(start_year_month)
-    days_in_month = []
-    for i in range(start_month, start_month + 12):
-        month = (i - 1) % 12 + 1
-        year = start_year + (i - 1) // 12
-        days_in_month.append(monthrange(year, month)[1])
-    return days_in_month
\ No newline at end of file
+    return list(days_in_window(end_year_month))
\ No newline at end of file
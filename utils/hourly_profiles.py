@@ -0,0 +1,44 @@
+import numpy as np
+
+HOURS_PER_DAY = 24
+
+def solar_daily_shape(sunrise=6, sunset=18):
+    if not (isinstance(sunrise, int) and isinstance(sunset, int) and 0 <= sunrise < sunset <= HOURS_PER_DAY):
+        raise ValueError("Sunrise and sunset must be whole hours with sunrise before sunset")
+    # Half sine between sunrise and sunset evaluated at the middle of each hour, normalized to add up to one day
+    hours = np.arange(HOURS_PER_DAY) + 0.5
+    shape = np.where((hours > sunrise) & (hours < sunset), np.sin(np.pi * (hours - sunrise) / (sunset - sunrise)), 0)
+    shape = shape / shape.sum()
+    shape.setflags(write=False)
+    return shape
+
+DEFAULT_DAILY_SHAPE = solar_daily_shape()
+
+def validate_daily_shape(daily_shape):
+    daily_shape = np.asarray(daily_shape, dtype=float)
+    if daily_shape.shape != (HOURS_PER_DAY,) or not (daily_shape >= 0).all() or not daily_shape.sum() > 0:
+        raise ValueError("Daily shape must have 24 non-negative values with a positive total")
+    return daily_shape / daily_shape.sum()
+
+def billing_hours(days_in_month):
+    return int(np.sum(days_in_month)) * HOURS_PER_DAY
+
+def month_offsets(days_in_month):
+    return np.concatenate([[0], np.cumsum(days_in_month)[:-1]]).astype(int) * HOURS_PER_DAY
+
+# Spreads a daily total per month over every hour of the billing period, rows are kept for batches
+def expand_daily_totals(daily_totals, days_in_month, daily_shape=DEFAULT_DAILY_SHAPE):
+    daily_totals = np.asarray(daily_totals, dtype=float)
+    days = np.repeat(np.arange(12), days_in_month)
+    return (daily_totals[..., days, None] * daily_shape).reshape(daily_totals.shape[:-1] + (-1,))
+
+def validate_hourly_values(values, days_in_month, name):
+    values = np.asarray(values, dtype=float)
+    if values.ndim not in (1, 2) or values.shape[-1] != billing_hours(days_in_month):
+        raise ValueError(f"{name} must have {billing_hours(days_in_month)} items per row, one per hour of the billing period")
+    if not (values >= 0).all():
+        raise ValueError(f"All items in {name} must be positive numbers")
+    return values
+
+def aggregate_monthly(hourly_values, days_in_month):
+    return np.add.reduceat(np.asarray(hourly_values, dtype=float), month_offsets(days_in_month), axis=-1)
@@ -0,0 +1,193 @@
+import bisect
+import functools
+import threading
+from time import perf_counter
+
+# Event categories: durations in seconds for queries and stages, hit or miss for caches
+QUERY = 'query'
+STAGE = 'stage'
+CACHE = 'cache'
+CATEGORIES = (QUERY, STAGE, CACHE)
+
+class StatsSink:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # name -> [count, total, max] for timings, name -> [hits, misses] for caches
+            self._timings = {QUERY: {}, STAGE: {}}
+            self._caches = {}
+
+    def record(self, category, name, value):
+        with self._lock:
+            if category == CACHE:
+                counts = self._caches.setdefault(name, [0, 0])
+                counts[0 if value else 1] += 1
+                return
+            timing = self._timings[category].get(name)
+            if timing is None:
+                self._timings[category][name] = [1, value, value]
+            else:
+                timing[0] += 1
+                timing[1] += value
+                timing[2] = max(timing[2], value)
+
+    def _summarize_timings(self, timings):
+        return {name: {"count": count, "total": total, "mean": total / count, "max": maximum}
+                for name, (count, total, maximum) in sorted(timings.items())}
+
+    # Caches named 'owner.stage' are also totalled under 'owner'
+    def _summarize_caches(self):
+        totals = {}
+        for name, (hits, misses) in self._caches.items():
+            for key in {name, name.split('.', 1)[0]}:
+                counts = totals.setdefault(key, [0, 0])
+                counts[0] += hits
+                counts[1] += misses
+        return {name: {"hits": hits, "misses": misses, "hit_ratio": hits / (hits + misses)}
+                for name, (hits, misses) in sorted(totals.items())}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queries": self._summarize_timings(self._timings[QUERY]),
+                "stages": self._summarize_timings(self._timings[STAGE]),
+                "caches": self._summarize_caches(),
+            }
+
+class HistogramSink:
+    # Upper bounds in seconds, from 1 microsecond to 10 seconds with 3 buckets per decade
+    DEFAULT_BOUNDS = tuple(multiplier * 10 ** exponent for exponent in range(-6, 1) for multiplier in (1, 2, 5)) + (10,)
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self._bounds = self._validate_bounds(bounds)
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def _validate_bounds(self, value):
+        bounds = tuple(value)
+        if not bounds or any(bound <= 0 for bound in bounds) or list(bounds) != sorted(set(bounds)):
+            raise ValueError("Bounds must be increasing positive numbers")
+        return bounds
+
+    @property
+    def bounds(self):
+        return self._bounds
+
+    def record(self, category, name, value):
+        if category == CACHE:
+            return
+        with self._lock:
+            counts = self._histograms.get((category, name))
+            if counts is None:
+                # The last bucket counts durations above every bound
+                counts = self._histograms[(category, name)] = [0] * (len(self._bounds) + 1)
+            counts[bisect.bisect_left(self._bounds, value)] += 1
+
+    def histogram(self, category, name):
+        with self._lock:
+            counts = list(self._histograms.get((category, name), [0] * (len(self._bounds) + 1)))
+        return list(zip(self._bounds + (float('inf'),), counts))
+
+    # Upper bound of the bucket holding the given percentile
+    def percentile(self, category, name, percentile):
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        histogram = self.histogram(category, name)
+        total = sum(count for _, count in histogram)
+        if total == 0:
+            return None
+        seen = 0
+        for bound, count in histogram:
+            seen += count
+            if seen >= total * percentile / 100 and seen > 0:
+                return bound
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+# logging is only imported when a log sink is created, it is the slowest import on the query path
+class LogSink:
+    def __init__(self, logger=None, level=None, min_duration=0):
+        import logging
+        self._logger = logger or logging.getLogger('solar.instrumentation')
+        self._level = logging.DEBUG if level is None else level
+        self._min_duration = min_duration
+
+    def record(self, category, name, value):
+        if not self._logger.isEnabledFor(self._level):
+            return
+        if category == CACHE:
+            self._logger.log(self._level, "cache %s %s", name, "hit" if value else "miss")
+        elif value >= self._min_duration:
+            self._logger.log(self._level, "%s %s %.3f ms", category, name, value * 1000)
+
+class Instrumentation:
+    def __init__(self, sinks=()):
+        self._stats = StatsSink()
+        self._sinks = (self._stats,) + tuple(sinks)
+
+    @property
+    def sinks(self):
+        return self._sinks
+
+    def record(self, category, name, value):
+        for sink in self._sinks:
+            sink.record(category, name, value)
+
+    def stats(self):
+        return self._stats.stats()
+
+    def reset(self):
+        for sink in self._sinks:
+            if hasattr(sink, 'reset'):
+                sink.reset()
+
+# Instrumentation is off unless enabled, hot paths only read this global before doing any work
+_instrumentation = None
+
+def get_instrumentation():
+    return _instrumentation
+
+def set_instrumentation(instrumentation):
+    global _instrumentation
+    previous = _instrumentation
+    _instrumentation = instrumentation
+    return previous
+
+def enable(*sinks):
+    instrumentation = Instrumentation(sinks)
+    set_instrumentation(instrumentation)
+    return instrumentation
+
+def disable():
+    return set_instrumentation(None)
+
+def get_stats():
+    instrumentation = _instrumentation
+    return instrumentation.stats() if instrumentation is not None else None
+
+def record(category, name, value):
+    instrumentation = _instrumentation
+    if instrumentation is not None:
+        instrumentation.record(category, name, value)
+
+def timed(category, name=None):
+    def decorator(function):
+        event_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            instrumentation = _instrumentation
+            if instrumentation is None:
+                return function(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                instrumentation.record(category, event_name, perf_counter() - start)
+        return wrapper
+    return decorator
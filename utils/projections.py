@@ -0,0 +1,58 @@
+from functools import lru_cache
+import numpy as np
+from utils.array_utils import round_array
+
+@lru_cache(maxsize=256)
+def _cached_growth_factors(annual_growth, years):
+    # Python pow per year keeps the factors bit for bit equal to the per-year loops they replace
+    factors = np.array([(1 + annual_growth) ** year for year in range(years)], dtype=float)
+    factors.setflags(write=False)
+    return factors
+
+# (1 + annual_growth) ** year for year in range(years); scalar rates share one cached read-only vector,
+# an array of rates gives one row of factors per rate
+def growth_factors(annual_growth, years):
+    if np.ndim(annual_growth) == 0:
+        return _cached_growth_factors(float(annual_growth), years)
+    return (1 + np.asarray(annual_growth, dtype=float))[..., None] ** np.arange(years)
+
+def escalation_factors(annual_inflation, years):
+    return growth_factors(annual_inflation, years)
+
+def degradation_factors(annual_degradation, years):
+    if np.ndim(annual_degradation) == 0:
+        return _cached_growth_factors(-float(annual_degradation), years)
+    return growth_factors(-np.asarray(annual_degradation, dtype=float), years)
+
+# Running totals added left to right, same result as sum(values[:i + 1]) for each i
+def accumulate(values):
+    return np.cumsum(np.asarray(values, dtype=float), axis=-1)
+
+def project_lifetime_production(annual_production, annual_degradation, lifespan):
+    annual_production = np.asarray(annual_production, dtype=float)
+    return round_array(annual_production[..., None] * degradation_factors(annual_degradation, lifespan), 2)
+
+def project_current_payments(annual_payment, annual_inflation, years):
+    annual_payment = np.asarray(annual_payment, dtype=float)
+    return annual_payment[..., None] * escalation_factors(annual_inflation, years)
+
+# Year 1 payment is kept as is; later years scale the energy part of the bill with consumption and inflate the whole bill.
+# Years without consumption only pay the fix charge, and so do all years when year 1 has no consumption to scale from:
+# its whole bill is the fix charge, the grid draw that degradation adds later is too small to price without it.
+def project_new_lifetime_payments(year_1_payment, year_1_fix_charge_payment, year_1_consumption, new_lifetime_consumption, annual_inflation):
+    year_1_payment = np.asarray(year_1_payment, dtype=float)[..., None]
+    year_1_fix_charge_payment = np.asarray(year_1_fix_charge_payment, dtype=float)[..., None]
+    year_1_consumption = np.asarray(year_1_consumption, dtype=float)[..., None]
+    new_lifetime_consumption = np.asarray(new_lifetime_consumption, dtype=float)
+    factors = escalation_factors(annual_inflation, new_lifetime_consumption.shape[-1])
+
+    has_year_1_consumption = year_1_consumption != 0
+    consumption_ratio = np.divide(new_lifetime_consumption, year_1_consumption, where=has_year_1_consumption,
+                                  out=np.zeros(np.broadcast(new_lifetime_consumption, year_1_consumption).shape))
+    variable_payment = ((year_1_payment - year_1_fix_charge_payment) * consumption_ratio + year_1_fix_charge_payment) * factors
+    fix_charge_payment = year_1_fix_charge_payment * factors
+
+    fix_charge_only = (new_lifetime_consumption == 0) | ~has_year_1_consumption
+    new_lifetime_payments = round_array(np.where(fix_charge_only, fix_charge_payment, variable_payment), 2)
+    new_lifetime_payments[..., 0] = year_1_payment[..., 0]
+    return new_lifetime_payments
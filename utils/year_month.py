@@ -0,0 +1,108 @@
+from functools import lru_cache, total_ordering
+
+MONTHS_PER_YEAR = 12
+# Days per month for common and leap years, indexed by month - 1
+DAYS_IN_MONTH = (
+    (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+MIN_YEAR = 1
+MAX_YEAR = 9999
+
+def is_leap_year(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+# Stored as a single month count so window arithmetic is one addition instead of datetime and relativedelta calls
+@total_ordering
+class YearMonth:
+    __slots__ = ('_index',)
+
+    def __init__(self, year, month):
+        if not (isinstance(year, int) and isinstance(month, int)):
+            raise TypeError("Year and month must be integers")
+        if not MIN_YEAR <= year <= MAX_YEAR:
+            raise ValueError(f"Year must be between {MIN_YEAR} and {MAX_YEAR}")
+        if not 1 <= month <= MONTHS_PER_YEAR:
+            raise ValueError("Month must be between 1 and 12")
+        self._index = year * MONTHS_PER_YEAR + month - 1
+
+    @classmethod
+    def from_index(cls, index):
+        year, month = divmod(index, MONTHS_PER_YEAR)
+        return cls(year, month + 1)
+
+    @classmethod
+    def parse(cls, value):
+        if isinstance(value, YearMonth):
+            return value
+        if not isinstance(value, str):
+            raise TypeError(f"Year month must be a 'YYYY-MM' string, not {type(value).__name__}")
+        return _parse(value)
+
+    @property
+    def year(self):
+        return self._index // MONTHS_PER_YEAR
+
+    @property
+    def month(self):
+        return self._index % MONTHS_PER_YEAR + 1
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def days_in_month(self):
+        return DAYS_IN_MONTH[is_leap_year(self.year)][self.month - 1]
+
+    def __add__(self, months):
+        if not isinstance(months, int):
+            return NotImplemented
+        return YearMonth.from_index(self._index + months)
+
+    def __sub__(self, other):
+        if isinstance(other, YearMonth):
+            return self._index - other._index
+        if isinstance(other, int):
+            return YearMonth.from_index(self._index - other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if not isinstance(other, YearMonth):
+            return NotImplemented
+        return self._index == other._index
+
+    def __lt__(self, other):
+        if not isinstance(other, YearMonth):
+            return NotImplemented
+        return self._index < other._index
+
+    def __hash__(self):
+        return hash(self._index)
+
+    def __str__(self):
+        return f"{self.year:04d}-{self.month:02d}"
+
+    def __repr__(self):
+        return f"YearMonth({self.year}, {self.month})"
+
+    def window(self, months=MONTHS_PER_YEAR):
+        return billing_window(self, months)
+
+# Same format datetime.strptime(value, '%Y-%m') accepts: a 4 digit year and a 1 or 2 digit month
+@lru_cache(maxsize=4096)
+def _parse(value):
+    year, separator, month = value.partition('-')
+    if not (separator and len(year) == 4 and 1 <= len(month) <= 2 and (year + month).isdecimal()):
+        raise ValueError(f"time data {value!r} does not match format '%Y-%m'")
+    return YearMonth(int(year), int(month))
+
+# The months of a billing window ending at end_year_month, oldest first
+@lru_cache(maxsize=1024)
+def billing_window(end_year_month, months=MONTHS_PER_YEAR):
+    end = YearMonth.parse(end_year_month)
+    return tuple(end + offset for offset in range(1 - months, 1))
+
+@lru_cache(maxsize=1024)
+def days_in_window(end_year_month, months=MONTHS_PER_YEAR):
+    return tuple(year_month.days_in_month for year_month in billing_window(end_year_month, months))